@@ -0,0 +1,4 @@
+import sys
+from app.cli import main
+
+sys.exit(main())
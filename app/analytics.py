@@ -0,0 +1,215 @@
+import numpy as np
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models import MarketData
+from app.queries import _range_conditions
+
+# Structured dtype of the arrays returned by `load_market_data_arrays`
+MARKET_DATA_DTYPE = np.dtype([
+    ('date', np.int64),
+    ('buy', np.float64),
+    ('sell', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('open', np.float64),
+    ('last', np.float64),
+    ('volume', np.float64),
+])
+
+def load_market_data_arrays(symbol, start=None, end=None):
+    """
+    Loads a symbol's market data range straight into a NumPy structured array.
+
+    Rows are fetched as plain tuples from the DBAPI cursor and converted in one
+    `np.array` call, without instantiating ORM objects. Only rows still in
+    SQLite are loaded, not those moved to the Parquet archive.
+
+    Args:
+        symbol (str): The trading pair symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+
+    Returns:
+        numpy.ndarray: One record per row, ordered by date, with the fields of
+                       `MARKET_DATA_DTYPE` (e.g. ``arrays['last']``).
+    """
+    query = (
+        select(*[getattr(MarketData, name) for name in MARKET_DATA_DTYPE.names])
+        .where(*_range_conditions(symbol, start, end))
+        .order_by(MarketData.date)
+    )
+    with SessionLocal() as db:
+        connection = db.connection()
+        compiled = query.compile(connection)
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(str(compiled), params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return np.array(rows, dtype=MARKET_DATA_DTYPE)
+
+def returns(prices, log=False):
+    """
+    Computes tick-to-tick returns.
+
+    Args:
+        prices (numpy.ndarray): The price series.
+        log (bool): Whether to compute log returns instead of simple returns.
+
+    Returns:
+        numpy.ndarray: One return per consecutive pair of prices (length n - 1).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if log:
+        return np.diff(np.log(prices))
+    return prices[1:] / prices[:-1] - 1.0
+
+def rolling_mean(values, window):
+    """
+    Computes the mean of every full window of `window` consecutive values.
+
+    Args:
+        values (numpy.ndarray): The input series.
+        window (int): The window length.
+
+    Returns:
+        numpy.ndarray: The mean of each window, aligned to the window's last value
+                       (length n - window + 1).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    return (sums[window:] - sums[:-window]) / window
+
+def rolling_volatility(prices, window):
+    """
+    Computes the standard deviation of log returns over a rolling window.
+
+    Args:
+        prices (numpy.ndarray): The price series.
+        window (int): The number of returns per window.
+
+    Returns:
+        numpy.ndarray: The population standard deviation of each window of returns
+                       (length n - window).
+    """
+    log_returns = returns(prices, log=True)
+    mean = rolling_mean(log_returns, window)
+    mean_of_squares = rolling_mean(log_returns * log_returns, window)
+    return np.sqrt(np.maximum(mean_of_squares - mean * mean, 0.0))
+
+def vwap(prices, volumes):
+    """
+    Computes the volume-weighted average price.
+
+    Args:
+        prices (numpy.ndarray): The traded prices.
+        volumes (numpy.ndarray): The volume traded at each price.
+
+    Returns:
+        float: The VWAP, or NaN if no volume was traded.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    total = volumes.sum()
+    return float(np.dot(prices, volumes) / total) if total > 0 else float("nan")
+
+def traded_volume(rolling_volumes):
+    """
+    Estimates the volume traded between ticks from the exchange's rolling 24h volume.
+
+    Args:
+        rolling_volumes (numpy.ndarray): The /tickers `vol` series.
+
+    Returns:
+        numpy.ndarray: The non-negative increase of the rolling volume at each tick
+                       (the first tick gets 0).
+    """
+    rolling_volumes = np.asarray(rolling_volumes, dtype=np.float64)
+    return np.maximum(np.diff(rolling_volumes, prepend=rolling_volumes[:1]), 0.0)
+
+def spread_stats(buy, sell):
+    """
+    Computes statistics of the bid/ask spread (`sell - buy`).
+
+    Args:
+        buy (numpy.ndarray): The best buy (bid) prices.
+        sell (numpy.ndarray): The best sell (ask) prices.
+
+    Returns:
+        dict: The mean, standard deviation, min, max and median absolute spread,
+              and the mean spread relative to the mid price in basis points.
+    """
+    buy = np.asarray(buy, dtype=np.float64)
+    sell = np.asarray(sell, dtype=np.float64)
+    spread = sell - buy
+    mid = (sell + buy) / 2.0
+    return {
+        "mean": float(spread.mean()),
+        "std": float(spread.std()),
+        "min": float(spread.min()),
+        "max": float(spread.max()),
+        "median": float(np.median(spread)),
+        "mean_bps": float((spread / mid).mean() * 10000.0),
+    }
+
+def summarize_market_data(symbol, start=None, end=None, window=60):
+    """
+    Loads a symbol's market data range and computes its summary statistics.
+
+    Args:
+        symbol (str): The trading pair symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        window (int): The number of ticks per rolling window.
+
+    Returns:
+        dict: The tick count, VWAP, last rolling mean and volatility, total return
+              and spread statistics, or None if the range is empty.
+    """
+    data = load_market_data_arrays(symbol, start, end)
+    if len(data) == 0:
+        return None
+    last = data['last']
+    window = min(window, len(data) - 1) or 1
+    return {
+        "ticks": len(data),
+        "vwap": vwap(last, traded_volume(data['volume'])),
+        "rolling_mean": float(rolling_mean(last, window)[-1]),
+        "rolling_volatility": float(rolling_volatility(last, window)[-1]) if len(data) > window else 0.0,
+        "total_return": float(last[-1] / last[0] - 1.0),
+        "spread": spread_stats(data['buy'], data['sell']),
+    }
+
+def summarize_quotes(quotes=None):
+    """
+    Computes cross-sectional statistics of the latest quotes, without querying
+    the database.
+
+    Args:
+        quotes (list of Tick, optional): The quotes. Defaults to a snapshot of
+                                         `quotes.quote_book`.
+
+    Returns:
+        dict: The number of symbols, advancers and decliners since the 24h open,
+              the median change, and spread statistics, or None if there are no quotes.
+    """
+    if quotes is None:
+        from app.quotes import quote_book
+        quotes = quote_book.snapshot()
+    if not quotes:
+        return None
+    data = np.array([(tick.date, tick.buy, tick.sell, tick.high, tick.low, tick.open, tick.last, tick.volume)
+                     for tick in quotes], dtype=MARKET_DATA_DTYPE)
+    opened = data['open'] > 0
+    change = np.divide(data['last'], data['open'], out=np.ones(len(data)), where=opened) - 1.0
+    return {
+        "symbols": len(data),
+        "advancers": int((change > 0).sum()),
+        "decliners": int((change < 0).sum()),
+        "median_change": float(np.median(change)),
+        "spread": spread_stats(data['buy'], data['sell']),
+    }
@@ -0,0 +1,266 @@
+import os
+import time
+from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import delete, func, select
+from app.config import Config
+from app.database import SessionLocal
+from app.models import MarketData
+from app.queries import stream_market_data
+
+# Column names of the rows yielded by `stream_market_data`
+ROW_COLUMNS = ("id", "symbol", "buy", "sell", "high", "low", "open", "last", "volume", "date")
+
+# Schema of the archived Parquet files. The symbol and day are encoded in the
+# partition directories (symbol=<symbol>/day=<YYYY-MM-DD>), not in the files.
+FILE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("buy", pa.float64()),
+    ("sell", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("open", pa.float64()),
+    ("last", pa.float64()),
+    ("volume", pa.float64()),
+    ("date", pa.int64()),
+])
+
+# Hive-style partition directories of the archive: symbol=<symbol>/day=<YYYY-MM-DD>
+PARTITIONING = ds.partitioning(pa.schema([("symbol", pa.string()), ("day", pa.string())]), flavor="hive")
+
+# Schema of the archive as a dataset. Declaring it up front means opening the
+# archive never reads a file footer to infer it.
+DATASET_SCHEMA = pa.schema(list(FILE_SCHEMA) + list(PARTITIONING.schema))
+
+# Schema of the tables returned by `read_market_data_range`
+RANGE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("symbol", pa.dictionary(pa.int32(), pa.string())),
+    ("buy", pa.float64()),
+    ("sell", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("open", pa.float64()),
+    ("last", pa.float64()),
+    ("volume", pa.float64()),
+    ("date", pa.int64()),
+])
+
+def day_of(date):
+    """
+    Returns the UTC day partition of a market data date.
+
+    Args:
+        date (int): A market data date, in seconds since epoch.
+
+    Returns:
+        str: The day in YYYY-MM-DD format.
+    """
+    return datetime.fromtimestamp(date, tz=timezone.utc).strftime("%Y-%m-%d")
+
+# File holding all the archived rows of a (symbol, day) partition
+PARTITION_FILE = "data.parquet"
+
+def _write_partitions(rows, archive_dir):
+    """
+    Merges rows into the Parquet file of each (symbol, day) partition.
+
+    Each partition has one file, `PARTITION_FILE`. Its current rows are read,
+    rows with the same date as a new row are replaced by it, and the result is
+    written to a temporary file that atomically replaces the old one, so
+    archiving the same rows again leaves the partition unchanged. Files from
+    older archive layouts in the directory are merged and removed.
+
+    Args:
+        rows (list of tuple): Rows in `ROW_COLUMNS` order.
+        archive_dir (str): The root directory of the archive.
+
+    Returns:
+        int: The number of partitions written.
+    """
+    partitions = {}
+    for row in rows:
+        partitions.setdefault((row[1], day_of(row[9])), []).append(row)
+
+    for (symbol, day), partition_rows in partitions.items():
+        directory = os.path.join(archive_dir, f"symbol={symbol}", f"day={day}")
+        os.makedirs(directory, exist_ok=True)
+        columns = list(zip(*partition_rows))
+        table = pa.Table.from_arrays(
+            [pa.array(columns[ROW_COLUMNS.index(field.name)], type=field.type) for field in FILE_SCHEMA],
+            schema=FILE_SCHEMA
+        )
+        existing = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+        if existing:
+            stored = pa.concat_tables([pq.read_table(os.path.join(directory, name), schema=FILE_SCHEMA)
+                                       for name in existing])
+            stored = stored.filter(pc.invert(pc.is_in(stored.column("date"), value_set=table.column("date"))))
+            table = pa.concat_tables([stored, table])
+        table = table.take(pc.sort_indices(table, sort_keys=[("date", "ascending")]))
+
+        path = os.path.join(directory, PARTITION_FILE)
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        for name in existing:
+            if name != PARTITION_FILE:
+                os.remove(os.path.join(directory, name))
+    return len(partitions)
+
+def _delete_rows(ids, chunk_size=500):
+    """
+    Deletes archived rows from the market_data table by id.
+    """
+    with SessionLocal() as db:
+        for index in range(0, len(ids), chunk_size):
+            db.execute(delete(MarketData.__table__).where(MarketData.id.in_(ids[index:index + chunk_size])))
+        db.commit()
+
+def _oldest_date(end):
+    """
+    Returns the oldest market data date before `end`, or None if there is none.
+    """
+    with SessionLocal() as db:
+        return db.execute(select(func.min(MarketData.date)).where(MarketData.date < end)).scalar()
+
+def archive_market_data(max_age_days=None, archive_dir=None, now=None, page_size=10000):
+    """
+    Moves market data older than `max_age_days` from SQLite into the Parquet archive.
+
+    Old rows are moved one UTC day at a time, oldest first: the day is streamed
+    from the date index, written to one Parquet file per symbol under
+    `archive_dir`, and only then deleted from SQLite. Memory use is bounded by
+    one day of data, and an interrupted run never loses rows. Rerunning after an
+    interruption is safe: the partitions are rewritten with the same rows (see
+    `_write_partitions`), and rows still in SQLite are deduplicated against the
+    archive on (symbol, date) when reading.
+
+    Args:
+        max_age_days (float, optional): The age in days after which rows are archived.
+                                        Defaults to `Config.ARCHIVE_AFTER_DAYS`.
+        archive_dir (str, optional): The root directory of the archive.
+                                     Defaults to `Config.ARCHIVE_DIR`.
+        now (float, optional): The current time in seconds. Defaults to `time.time()`.
+        page_size (int): The number of rows read from SQLite at a time.
+
+    Returns:
+        int: The number of rows archived.
+    """
+    max_age_days = Config.ARCHIVE_AFTER_DAYS if max_age_days is None else max_age_days
+    archive_dir = archive_dir or Config.ARCHIVE_DIR
+    now = time.time() if now is None else now
+    cutoff = int(now - max_age_days * 86400)
+
+    archived = 0
+    oldest = _oldest_date(cutoff)
+    while oldest is not None:
+        day_start = oldest - oldest % 86400
+        day_end = min(day_start + 86400, cutoff)
+        rows = [row for page in stream_market_data(start=day_start, end=day_end, page_size=page_size) for row in page]
+        _write_partitions(rows, archive_dir)
+        _delete_rows([row[0] for row in rows])
+        archived += len(rows)
+        oldest = _oldest_date(cutoff)
+
+    print(f"Archived {archived} market data rows older than {max_age_days} days.")
+    return archived
+
+def _archive_filter(symbol, start, end):
+    """
+    Builds the dataset filter for a range, including predicates on the partition keys
+    so that non-matching symbol and day directories are pruned without being read.
+    """
+    conditions = []
+    if symbol is not None:
+        conditions.append(ds.field("symbol") == symbol)
+    if start is not None:
+        conditions.append(ds.field("day") >= day_of(start))
+        conditions.append(ds.field("date") >= start)
+    if end is not None:
+        conditions.append(ds.field("day") <= day_of(end))
+        conditions.append(ds.field("date") < end)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def _rows_to_table(rows):
+    """
+    Converts rows in `ROW_COLUMNS` order into an Arrow table with `RANGE_SCHEMA`.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(ROW_COLUMNS)
+    arrays = []
+    for name, values in zip(ROW_COLUMNS, columns):
+        if name == "symbol":
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=RANGE_SCHEMA.field(name).type))
+    return pa.Table.from_arrays(arrays, schema=RANGE_SCHEMA)
+
+def read_archived_market_data(symbol=None, start=None, end=None, archive_dir=None):
+    """
+    Reads a market data range from the Parquet archive.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        archive_dir (str, optional): The root directory of the archive.
+                                     Defaults to `Config.ARCHIVE_DIR`.
+
+    Returns:
+        pyarrow.Table: The archived rows, with the columns of `RANGE_SCHEMA`.
+    """
+    archive_dir = archive_dir or Config.ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return RANGE_SCHEMA.empty_table()
+    dataset = ds.dataset(archive_dir, schema=DATASET_SCHEMA, format="parquet", partitioning=PARTITIONING)
+    table = dataset.to_table(columns=list(RANGE_SCHEMA.names), filter=_archive_filter(symbol, start, end))
+    symbols = pc.dictionary_encode(table.column("symbol"))
+    return table.set_column(1, "symbol", symbols).cast(RANGE_SCHEMA)
+
+def _row_keys(table):
+    """
+    Returns the unique (symbol, date) key of every row of a range table, as
+    "<symbol>|<date>" strings.
+    """
+    symbols = pc.cast(table.column("symbol"), pa.string())
+    dates = pc.cast(table.column("date"), pa.string())
+    return pc.binary_join_element_wise(symbols, dates, "|").combine_chunks()
+
+def read_market_data_range(symbol=None, start=None, end=None, archive_dir=None, page_size=10000):
+    """
+    Reads a market data range from both the SQLite table and the Parquet archive.
+
+    This is the only reader that combines the two tiers; the paging queries of
+    `app.queries`, `analytics.load_market_data_arrays` and the menu read SQLite
+    alone, so rows moved by `archive_market_data` are only seen here, e.g. by
+    `python -m app export --archive`. Unlike `stream_market_data`, the whole
+    range is loaded into memory.
+
+    Archived and live rows are combined into one Arrow table ordered by (date, id).
+    A row present in both (from an interrupted archive run) is returned once, from
+    SQLite: the tiers are matched on the unique (symbol, date) key, since SQLite
+    may reuse the ids of archived rows.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        archive_dir (str, optional): The root directory of the archive.
+                                     Defaults to `Config.ARCHIVE_DIR`.
+        page_size (int): The number of rows read from SQLite at a time.
+
+    Returns:
+        pyarrow.Table: The rows of the range, with the columns of `RANGE_SCHEMA`.
+    """
+    archived = read_archived_market_data(symbol, start, end, archive_dir)
+    hot = _rows_to_table([row for page in stream_market_data(symbol, start, end, page_size=page_size) for row in page])
+
+    if archived.num_rows and hot.num_rows:
+        archived = archived.filter(pc.invert(pc.is_in(_row_keys(archived), value_set=_row_keys(hot))))
+    table = pa.concat_tables([archived, hot])
+    order = pc.sort_indices(table, sort_keys=[("date", "ascending"), ("id", "ascending")])
+    return table.take(order)
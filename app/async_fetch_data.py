@@ -0,0 +1,179 @@
+import asyncio
+import aiohttp
+import requests
+from . import fetch_data
+from .decoding import decode_json
+from .fetch_data import API_URL, RETRYABLE_STATUSES, RATE_LIMIT_SECONDS, retry_delay
+
+class AsyncMarketDataClient:
+    """
+    Asynchronous counterpart of the functions in `fetch_data.py`.
+
+    The client keeps one pooled, keep-alive `aiohttp` connector for its whole
+    lifetime and bounds the number of requests in flight with a semaphore, so
+    many chunked /tickers requests can run concurrently on a single event loop.
+    Return shapes and exceptions match the synchronous API: responses are the
+    parsed JSON payloads, and failures are raised as `requests.RequestException`
+    (or `requests.HTTPError` for HTTP error statuses). Requests follow the same
+    policy as `fetch_data.send_request`, sharing its rate limiter and circuit
+    breaker with the synchronous fetchers.
+
+    Attributes:
+        api_url (str): The base URL for the API.
+        max_concurrency (int): The maximum number of requests in flight at once.
+        timeout (float): The total timeout of a single request, in seconds.
+
+    Example:
+        async with AsyncMarketDataClient(max_concurrency=8) as client:
+            market_data = await client.fetch_market_data(["BTC-BRL", "ETH-BRL"])
+    """
+
+    def __init__(self, api_url=API_URL, max_concurrency=10, timeout=10):
+        self.api_url = api_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Creates the pooled HTTP session. Called automatically by `async with`.
+        """
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ssl=False)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def close(self):
+        """
+        Closes the HTTP session and its pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_json(self, url, params=None):
+        """
+        Performs a GET request and returns the parsed JSON response.
+
+        Attempts wait for the shared rate limiter, outside the concurrency bound,
+        and transient failures are retried with backoff like `fetch_data.send_request`,
+        whose waits `fetch_data.stop_retries_on` also interrupts.
+        An attempt that ends in any other way, including a cancellation, is
+        reported to the circuit breaker with `abandon`.
+
+        Args:
+            url (str): The URL to request.
+            params (dict, optional): Query string parameters.
+
+        Returns:
+            dict or list: The parsed JSON response.
+
+        Raises:
+            fetch_data.CircuitOpenError: If the circuit breaker is open.
+            requests.HTTPError: If the server responds with an HTTP error status.
+            requests.RequestException: If the request fails for any other reason.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            fetch_data.circuit_breaker.allow()
+            try:
+                RATE_LIMIT_SECONDS.inc(await fetch_data.rate_limiter.acquire_async())
+                async with self._semaphore:
+                    try:
+                        async with self._session.get(url, params=params) as response:
+                            error = f"{response.status} Error: {response.reason} for url: {response.url}"
+                            if response.status not in RETRYABLE_STATUSES:
+                                fetch_data.circuit_breaker.record_success()
+                                if response.status >= 400:
+                                    raise requests.HTTPError(error)
+                                return decode_json(await response.read())
+                            failure = requests.HTTPError(error)
+                            delay = retry_delay(attempt, response.status, response.headers.get("Retry-After"))
+                            if delay is None:
+                                raise failure
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        failure = requests.RequestException(str(e) or type(e).__name__)
+                        delay = retry_delay(attempt)
+                        if delay is None:
+                            raise failure from e
+                    except ValueError as e:
+                        raise requests.RequestException(str(e) or type(e).__name__) from e
+            except BaseException:
+                fetch_data.circuit_breaker.abandon()
+                raise
+            if await fetch_data.wait_to_retry_async(delay):
+                raise failure
+
+    async def fetch_symbols(self):
+        """
+        Fetches the list of available trading symbols from the API.
+
+        Returns:
+            dict: A dictionary containing the symbol data fetched from the API.
+
+        Raises:
+            requests.RequestException: If there is an error during the HTTP request.
+        """
+        try:
+            return await self._get_json(f"{self.api_url}symbols")
+        except requests.RequestException as e:
+            print(f"Error fetching symbols: {e}")
+            raise
+
+    async def fetch_market_data(self, symbols):
+        """
+        Fetches market data for the given list of symbols from the API.
+
+        Args:
+            symbols (list): A list of symbol strings (e.g., ["BTC-BRL", "ETH-BRL"]).
+
+        Returns:
+            list: A list of dictionaries containing market data for each symbol.
+
+        Raises:
+            requests.RequestException: If there is an error during the HTTP request.
+        """
+        params = {"symbols": ",".join(symbols)}
+        try:
+            return await self._get_json(f"{self.api_url}tickers", params=params)
+        except requests.RequestException as e:
+            print(f"Error fetching market data for symbols {symbols}: {e}")
+            raise
+
+    async def fetch_market_data_chunks(self, chunks):
+        """
+        Fetches market data for every chunk of a watchlist concurrently.
+
+        All chunks are requested at once, up to `max_concurrency` in flight. A failing
+        chunk is reported once and skipped, mirroring `workers.fetch_market_data_chunks`.
+
+        Args:
+            chunks (list of list): Symbol chunks, as returned by `chunk_symbols`.
+
+        Returns:
+            list of dict: The combined market data of every chunk that was fetched.
+        """
+        results = await asyncio.gather(
+            *(self.fetch_market_data(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        market_data = []
+        for result in results:
+            if isinstance(result, requests.RequestException):
+                continue  # Already reported by `fetch_market_data`
+            if isinstance(result, Exception):
+                print(f"An error occurred: {result}")
+            else:
+                market_data.extend(result)
+        return market_data
@@ -0,0 +1,171 @@
+import time
+from app.database import SessionLocal
+from app.queries import stream_market_data
+from app.storage import storage_backend
+
+# Supported candle intervals and their length in seconds
+CANDLE_INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+
+class CandleAggregator:
+    """
+    Incrementally aggregates a tick stream into OHLCV candles.
+
+    One open candle is kept in memory per symbol and interval. A candle is
+    closed, and returned to the caller for persistence, when a tick for a later
+    interval arrives or when `close_expired` is called after its interval ended.
+    Ticks must arrive in chronological order per symbol.
+
+    The /tickers volume is a rolling 24h total, so a candle's volume is
+    estimated as the sum of the increases of that total between consecutive
+    ticks of the symbol.
+
+    Attributes:
+        intervals (dict): The interval names and lengths in seconds to aggregate.
+
+    Example:
+        aggregator = CandleAggregator(["1m", "5m"])
+        closed = aggregator.add("BTC-BRL", 31000.5, 10.2, 1720182706)
+    """
+
+    def __init__(self, intervals=tuple(CANDLE_INTERVALS)):
+        self.intervals = {name: CANDLE_INTERVALS[name] for name in intervals}
+        self._open = {}
+        self._last_volume = {}
+
+    def add(self, symbol, price, volume, date):
+        """
+        Adds one tick to the open candles of its symbol.
+
+        Args:
+            symbol (str): The trading pair symbol.
+            price (float): The last traded price.
+            volume (float): The exchange's rolling 24h volume.
+            date (int): The tick's date, in seconds since epoch.
+
+        Returns:
+            list of dict: The candles closed by this tick, as `Candle` column values.
+        """
+        previous_volume = self._last_volume.get(symbol)
+        self._last_volume[symbol] = volume
+        traded = max(0.0, volume - previous_volume) if previous_volume is not None else 0.0
+
+        closed = []
+        for name, length in self.intervals.items():
+            start = date - date % length
+            candle = self._open.get((symbol, name))
+            if candle is not None and candle['start'] != start:
+                if start < candle['start']:
+                    continue
+                closed.append(candle)
+                candle = None
+            if candle is None:
+                self._open[(symbol, name)] = {
+                    'symbol': symbol,
+                    'interval': name,
+                    'start': start,
+                    'open': price,
+                    'high': price,
+                    'low': price,
+                    'close': price,
+                    'volume': traded,
+                    'ticks': 1
+                }
+            else:
+                candle['high'] = max(candle['high'], price)
+                candle['low'] = min(candle['low'], price)
+                candle['close'] = price
+                candle['volume'] += traded
+                candle['ticks'] += 1
+        return closed
+
+    def close_expired(self, now=None):
+        """
+        Closes every open candle whose interval ended before `now`.
+
+        This closes the candles of symbols that stopped receiving ticks, e.g.
+        idle pairs whose repeated snapshots were deduplicated.
+
+        Args:
+            now (float, optional): The current time in seconds. Defaults to `time.time()`.
+
+        Returns:
+            list of dict: The candles that were closed.
+        """
+        now = time.time() if now is None else now
+        closed = []
+        for key, candle in list(self._open.items()):
+            if candle['start'] + self.intervals[candle['interval']] <= now:
+                closed.append(self._open.pop(key))
+        return closed
+
+    def open_candles(self):
+        """
+        Returns the candles still being aggregated.
+
+        Returns:
+            list of dict: The open candles, as `Candle` column values.
+        """
+        return list(self._open.values())
+
+def store_candles(candles, merge=True):
+    """
+    Stores closed candles, merging them into any stored candle with the same
+    symbol, interval and start.
+
+    A candle closed by `close_expired` can be followed by a partial candle of
+    the same interval, opened by a late tick or after a restart. Merging keeps
+    the stored open and combines the rest (see `storage.merge_candle`), so the
+    partial candle completes the stored one rather than overwriting it.
+
+    Args:
+        candles (list of dict): The candles to store, as returned by `CandleAggregator`.
+        merge (bool): Whether to merge into stored candles, or replace them, e.g.
+                      with candles rebuilt from every tick of their interval.
+
+    Returns:
+        int: The number of candles written.
+    """
+    if not candles:
+        return 0
+    with SessionLocal() as db:
+        storage_backend(db.get_bind()).upsert_candles(db, candles, merge=merge)
+        db.commit()
+    return len(candles)
+
+def backfill_candles(intervals=tuple(CANDLE_INTERVALS), symbol=None, batch_size=1000, page_size=10000):
+    """
+    Builds candles from the market data already stored, in one streaming pass.
+
+    Market data is streamed in (date, id) order through `stream_market_data`, so
+    memory use is bounded by the number of open candles and the write batch,
+    regardless of the size of the table. The rebuilt candles replace stored
+    ones, so backfilling again is idempotent. Candles whose interval has not ended
+    yet are left out, as the live aggregator will close them.
+
+    Args:
+        intervals (iterable): The interval names to build.
+        symbol (str, optional): Only build candles for this symbol.
+        batch_size (int): The number of closed candles written per statement.
+        page_size (int): The number of market data rows read at a time.
+
+    Returns:
+        int: The number of candles written.
+    """
+    aggregator = CandleAggregator(intervals)
+    pending = []
+    written = 0
+    for page in stream_market_data(symbol=symbol, page_size=page_size):
+        for row in page:
+            # Rows follow queries.MARKET_DATA_COLUMNS: id, symbol, ..., last, volume, date
+            pending.extend(aggregator.add(row[1], row[7], row[8], row[9]))
+        if len(pending) >= batch_size:
+            written += store_candles(pending, merge=False)
+            pending = []
+    pending.extend(aggregator.close_expired())
+    written += store_candles(pending, merge=False)
+    print(f"Backfilled {written} candles.")
+    return written
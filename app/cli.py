@@ -0,0 +1,387 @@
+"""
+Headless command-line entry point: `python -m app <command> [options]`.
+
+Unlike `main.py`, which drives an interactive menu, every command here runs
+non-interactively, so collection can run as a service or be scripted for load
+tests. The application modules (SQLAlchemy, requests, NumPy, pyarrow) are only
+imported inside the command that needs them, so `--help` and argument errors
+return without loading them.
+"""
+import argparse
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+# Exit status of a run interrupted by a second signal, as for SIGINT
+EXIT_INTERRUPTED = 130
+
+def parse_symbols(value):
+    """
+    Parses a comma-separated symbol list.
+
+    Args:
+        value (str): The list, e.g. "BTC-BRL,ETH-BRL".
+
+    Returns:
+        list of str: The symbols, without blanks.
+    """
+    return [symbol.strip() for symbol in value.split(",") if symbol.strip()]
+
+def parse_date(value):
+    """
+    Parses a date given in seconds since epoch or as an ISO 8601 date or time (UTC
+    unless it carries an offset).
+
+    Args:
+        value (str): The date, e.g. "1720182706", "2024-07-05" or "2024-07-05T12:00".
+
+    Returns:
+        int: The date in seconds since epoch.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is neither.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}; expected epoch seconds or YYYY-MM-DD[THH:MM[:SS]]")
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp())
+
+def positive_float(value):
+    """
+    Parses a strictly positive number, e.g. a rate or an interval.
+
+    Args:
+        value (str): The number.
+
+    Returns:
+        float: The number.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a number greater than zero.
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number {value!r}")
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value!r}")
+    return number
+
+def positive_int(value):
+    """
+    Parses a strictly positive integer, e.g. a count or a number of workers.
+
+    Args:
+        value (str): The integer.
+
+    Returns:
+        int: The integer.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not an integer greater than zero.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value!r}")
+    return number
+
+def install_signal_handlers(stop_event):
+    """
+    Makes SIGTERM and SIGINT drain the running command instead of killing it.
+
+    The first signal sets `stop_event`, so the command stops polling, flushes its
+    queues and returns normally. A second signal aborts immediately.
+
+    Args:
+        stop_event (threading.Event): The event the running command stops on.
+    """
+    def handle(signum, frame):
+        if stop_event.is_set():
+            print(f"\nReceived {signal.Signals(signum).name} again; exiting without draining.", file=sys.stderr)
+            raise SystemExit(EXIT_INTERRUPTED)
+        print(f"\nReceived {signal.Signals(signum).name}; draining. Send it again to exit immediately.", file=sys.stderr)
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+def stop_after(stop_event, duration):
+    """
+    Sets `stop_event` after `duration` seconds, if a duration is given.
+    """
+    if duration:
+        timer = threading.Timer(duration, stop_event.set)
+        timer.daemon = True
+        timer.start()
+
+def init_db():
+    """
+    Creates the tables that do not exist yet, like `main.init_db`.
+    """
+    from app.database import get_engine
+    from app.models import Base
+    from app.storage import storage_backend
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    storage_backend(engine).prepare(engine)
+
+def configure_metrics(args):
+    """
+    Applies the --metrics-port and --metrics-path options to `Config`.
+    """
+    from app.config import Config
+    if args.metrics_port is not None:
+        Config.METRICS_PORT = args.metrics_port
+    if args.metrics_path is not None:
+        Config.METRICS_PATH = args.metrics_path
+
+def command_collect(args, stop_event):
+    """
+    Collects market data until stopped: one subscription for a watchlist, or the
+    sharded multi-process collector with --workers, whose supervisor then serves
+    the collector's metrics (workers alive, restarts) on --metrics-port/--metrics-path.
+    """
+    configure_metrics(args)
+    init_db()
+    interval = 1.0 / args.rate if args.rate else args.interval
+    stop_after(stop_event, args.duration)
+
+    if args.workers:
+        from app.collector import ShardedCollector
+        from app.workers import start_metrics_exporter
+        collector = ShardedCollector(workers=args.workers, symbols=args.symbols, interval=interval)
+        exporter = start_metrics_exporter()
+        try:
+            collector.run(stop_event)
+        finally:
+            if exporter is not None:
+                exporter.close()
+        print(f"Collector: {collector.summary()}")
+        return 0
+
+    symbols = args.symbols
+    if symbols is None:
+        from app.collector import load_symbol_universe
+        symbols = load_symbol_universe()
+    if not symbols:
+        print("No symbols to collect; pass --symbols or run sync-symbols first.", file=sys.stderr)
+        return 1
+
+    if args.use_async:
+        import asyncio
+        from app.workers import subscribe_market_data_async
+        asyncio.run(subscribe_market_data_async(symbols, stop_event, max_concurrency=args.concurrency,
+                                                interval=interval, display=args.display))
+    else:
+        from app.workers import subscribe_market_data
+        subscribe_market_data(symbols, stop_event, interval=interval, display=args.display)
+    return 0
+
+def command_sync_symbols(args, stop_event):
+    """
+    Fetches the symbol list and stores new and changed symbols.
+    """
+    init_db()
+    from app.symbol_cache import symbol_cache
+    from app.workers import store_symbols_bulk
+
+    symbols_data = symbol_cache.refresh() if args.force else symbol_cache.get()
+    store_symbols_bulk(symbols_data)
+    print(f"Symbol cache: {symbol_cache.summary()}")
+    return 0
+
+def _export_rows(args):
+    """
+    Yields the pages of rows to export, from SQLite alone or, with --archive,
+    from SQLite and the Parquet archive.
+    """
+    if args.archive:
+        from app.archive import read_market_data_range
+        from app.queries import MARKET_DATA_COLUMNS
+        table = read_market_data_range(args.symbol, args.start, args.end)
+        if args.limit is not None:
+            table = table.slice(0, args.limit)
+        columns = [table.column(column.name).to_pylist() for column in MARKET_DATA_COLUMNS]
+        yield list(zip(*columns))
+    else:
+        from app.queries import stream_market_data
+        yield from stream_market_data(args.symbol, args.start, args.end, limit=args.limit)
+
+def command_export(args, stop_event):
+    """
+    Exports stored market data as CSV, JSON lines or Parquet.
+    """
+    import csv
+    import json
+    from app.queries import MARKET_DATA_COLUMNS
+
+    names = [column.name for column in MARKET_DATA_COLUMNS]
+    if args.format == "parquet":
+        if args.output == "-":
+            print("Parquet cannot be written to stdout; pass --output.", file=sys.stderr)
+            return 2
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(name, pa.int64() if name in ("id", "date") else pa.string() if name == "symbol" else pa.float64())
+                            for name in names])
+        exported = 0
+        with pq.ParquetWriter(args.output, schema) as writer:
+            for page in _export_rows(args):
+                writer.write_table(pa.Table.from_pylist([dict(zip(names, row)) for row in page], schema=schema))
+                exported += len(page)
+        print(f"Exported {exported} rows to {args.output}.", file=sys.stderr)
+        return 0
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        exported = 0
+        if args.format == "csv":
+            writer = csv.writer(output)
+            writer.writerow(names)
+            for page in _export_rows(args):
+                writer.writerows(page)
+                exported += len(page)
+        else:
+            for page in _export_rows(args):
+                output.writelines(json.dumps(dict(zip(names, row))) + "\n" for row in page)
+                exported += len(page)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Exported {exported} rows.", file=sys.stderr)
+    return 0
+
+def command_bench(args, stop_event):
+    """
+    Runs a subscription against replayed API responses and reports its throughput
+    and stage latencies.
+    """
+    init_db()
+    from contextlib import nullcontext
+    from app.metrics import metrics
+    from app.replay import ReplayAdapter, replay, load_recordings, synthetic_recordings
+    from app.workers import subscribe_market_data, TICKS
+
+    symbols = args.symbols or [f"B{index:05d}-BRL" for index in range(args.count)]
+    if args.live:
+        context = nullcontext()
+    else:
+        recordings = load_recordings(args.recordings) or synthetic_recordings(symbols)
+        context = replay(ReplayAdapter(recordings, latency=args.latency, error_rate=args.error_rate, seed=0))
+
+    stop_after(stop_event, args.duration)
+    ticks_before = TICKS.value()
+    start = time.perf_counter()
+    with context:
+        subscribe_market_data(symbols, stop_event, interval=1.0 / args.rate, display=False)
+    elapsed = time.perf_counter() - start
+
+    tickers = TICKS.value() - ticks_before
+    print(f"Bench: {len(symbols)} symbols at {args.rate:g} Hz for {elapsed:.1f}s, "
+          f"{tickers} tickers ({tickers / elapsed:.0f}/s)")
+    if args.metrics_path:
+        metrics.write(args.metrics_path)
+    return 0
+
+def build_parser():
+    """
+    Builds the argument parser of every command.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="python -m app", description="Collect, export and benchmark market data without the interactive menu.")
+    parser.add_argument("--database-url", help="database to use instead of DATABASE_URL")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    collect = commands.add_parser("collect", help="poll and store market data until stopped")
+    collect.add_argument("--symbols", type=parse_symbols, help="comma-separated watchlist (default: the symbols table)")
+    pacing = collect.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=positive_float, help="polls per second")
+    pacing.add_argument("--interval", type=positive_float, help="seconds between polls (default: POLL_INTERVAL)")
+    collect.add_argument("--workers", type=positive_int, help="shard the symbols across this many processes")
+    collect.add_argument("--async", dest="use_async", action="store_true", help="use the asyncio engine")
+    collect.add_argument("--concurrency", type=positive_int, default=10, help="requests in flight with --async")
+    collect.add_argument("--duration", type=positive_float, help="stop after this many seconds")
+    collect.add_argument("--display", action="store_true", help="print every tick")
+    collect.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    collect.add_argument("--metrics-path", help="dump Prometheus metrics to this file")
+    collect.set_defaults(handler=command_collect)
+
+    sync_symbols = commands.add_parser("sync-symbols", help="fetch and store the symbol list")
+    sync_symbols.add_argument("--force", action="store_true", help="revalidate even if the cached list is fresh")
+    sync_symbols.set_defaults(handler=command_sync_symbols)
+
+    export = commands.add_parser("export", help="export stored market data")
+    export.add_argument("--symbol", help="only export this symbol")
+    export.add_argument("--start", type=parse_date, help="first date to include (epoch seconds or ISO 8601)")
+    export.add_argument("--end", type=parse_date, help="first date to exclude (epoch seconds or ISO 8601)")
+    export.add_argument("--limit", type=positive_int, help="export at most this many rows")
+    export.add_argument("--archive", action="store_true", help="include rows moved to the Parquet archive (loads the range into memory)")
+    export.add_argument("--format", choices=("csv", "jsonl", "parquet"), default="csv")
+    export.add_argument("--output", default="-", help="file to write (default: stdout)")
+    export.set_defaults(handler=command_export)
+
+    bench = commands.add_parser("bench", help="benchmark a subscription against replayed responses")
+    bench.add_argument("--symbols", type=parse_symbols, help="comma-separated watchlist")
+    bench.add_argument("--count", type=positive_int, default=100, help="number of synthetic symbols without --symbols")
+    bench.add_argument("--rate", type=positive_float, default=1.0, help="polls per second")
+    bench.add_argument("--duration", type=positive_float, default=10.0, help="seconds to run")
+    bench.add_argument("--latency", type=float, default=0.0, help="replayed response latency, in seconds")
+    bench.add_argument("--error-rate", type=float, default=0.0, help="fraction of replayed requests that fail")
+    bench.add_argument("--recordings", default=os.path.join("tests", "recordings"), help="recorded responses to replay")
+    bench.add_argument("--live", action="store_true", help="poll the live API instead of replaying")
+    bench.add_argument("--metrics-path", help="dump Prometheus metrics to this file when done")
+    bench.set_defaults(handler=command_bench)
+    return parser
+
+def main(argv=None):
+    """
+    Runs one command.
+
+    Args:
+        argv (list, optional): The arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status.
+    """
+    args = build_parser().parse_args(argv)
+    database_url = args.database_url
+    if database_url is None and args.command == "bench":
+        # Benchmarks write to a throwaway database unless one is given
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+
+    stop_event = threading.Event()
+    install_signal_handlers(stop_event)
+    if database_url is None:
+        return args.handler(args, stop_event)
+
+    from app.config import Config
+    from app.database import dispose_engines
+    previous = Config.DATABASE_URL, os.environ.get("DATABASE_URL")
+    # The environment variable is what spawned collector processes read
+    Config.DATABASE_URL = os.environ["DATABASE_URL"] = database_url
+    dispose_engines()
+    try:
+        return args.handler(args, stop_event)
+    finally:
+        dispose_engines()
+        Config.DATABASE_URL = previous[0]
+        if previous[1] is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = previous[1]
@@ -0,0 +1,412 @@
+import multiprocessing
+import signal
+import time
+import numpy as np
+from sqlalchemy import select
+from app.config import Config
+from app.metrics import metrics
+from app.ticks import Tick
+
+# Tick fields of a packed batch, after the symbol column
+BATCH_FIELDS = [
+    ('buy', np.float64),
+    ('sell', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('open', np.float64),
+    ('last', np.float64),
+    ('volume', np.float64),
+    ('date', np.int64),
+]
+
+def batch_dtype(symbol_width):
+    """
+    Returns the record layout of a packed batch whose symbols fit in `symbol_width` bytes.
+    """
+    return np.dtype([('symbol', f'S{symbol_width}')] + BATCH_FIELDS)
+
+def pack_ticks(ticks):
+    """
+    Packs ticks into a compact binary batch for the writer process.
+
+    The batch is one fixed-width record per tick, prefixed with the width of
+    the symbol column (two bytes), so it crosses the process boundary as a
+    single bytes object instead of a pickled list of objects.
+
+    Args:
+        ticks (list of Tick): The ticks to send.
+
+    Returns:
+        bytes: The packed batch.
+    """
+    symbols = np.array([tick.symbol.encode() for tick in ticks], dtype='S')
+    records = np.empty(len(ticks), dtype=batch_dtype(max(symbols.dtype.itemsize, 1)))
+    records['symbol'] = symbols
+    for name, _ in BATCH_FIELDS:
+        records[name] = [getattr(tick, name) for tick in ticks]
+    return records.dtype['symbol'].itemsize.to_bytes(2, "little") + records.tobytes()
+
+def unpack_ticks(data):
+    """
+    Unpacks a batch written by `pack_ticks`.
+
+    Args:
+        data (bytes): The packed batch.
+
+    Returns:
+        list of Tick: The ticks, in their original order.
+    """
+    records = np.frombuffer(data, dtype=batch_dtype(int.from_bytes(data[:2], "little")), offset=2)
+    return [
+        Tick(symbol.decode(), buy, sell, high, low, open, last, volume, date)
+        for symbol, buy, sell, high, low, open, last, volume, date in records.tolist()
+    ]
+
+def shard_symbols(symbols, shards):
+    """
+    Splits a symbol universe into `shards` disjoint, evenly sized shards.
+
+    Symbols are sorted and dealt round-robin, so shard sizes differ by at most
+    one and the assignment only depends on the universe and the shard count.
+
+    Args:
+        symbols (list): The symbols to distribute.
+        shards (int): The number of shards.
+
+    Returns:
+        list of list: One list of symbols per shard (empty if there are more
+                      shards than symbols).
+    """
+    universe = sorted(set(symbols))
+    return [universe[index::shards] for index in range(shards)]
+
+def load_symbol_universe():
+    """
+    Returns every symbol stored in the `symbols` table.
+
+    Returns:
+        list of str: The symbols, sorted.
+    """
+    from app.database import SessionLocal
+    from app.models import Symbol
+
+    with SessionLocal() as db:
+        return list(db.execute(select(Symbol.symbol).order_by(Symbol.symbol)).scalars())
+
+def _ignore_interrupts():
+    """
+    Lets Ctrl+C reach only the supervisor, which stops the children in order.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def poll_shard(shard, batches, stop_event, interval, rate_limit, fetch=None):
+    """
+    Entry point of a worker process: polls one shard and sends its changed ticks.
+
+    The shard is fetched in URL-length-safe chunks on a `FixedRateScheduler`,
+    deduplicated, packed with `pack_ticks` and put on the `batches` queue of
+    the writer process. The process keeps `rate_limit`, its share of the
+    collector's request budget, in its own rate limiter.
+
+    Args:
+        shard (list): The symbols to poll.
+        batches (multiprocessing.Queue): The writer's queue of packed batches.
+        stop_event (multiprocessing.Event): Set by the supervisor to stop the worker.
+        interval (float): The polling period, in seconds.
+        rate_limit (float): The worker's request rate, per second, or None for no limit.
+        fetch (callable, optional): Fetches the ticks of a list of chunks. Defaults to
+                                    `workers.fetch_market_data_chunks`.
+    """
+    _ignore_interrupts()
+    from app import fetch_data
+    from app.dedup import TickDeduplicator
+    from app.scheduler import FixedRateScheduler
+    from app.workers import fetch_market_data_chunks
+
+    fetch_data.rate_limiter = fetch_data.TokenBucket(rate_limit, Config.FETCH_BURST)
+    fetch = fetch or fetch_market_data_chunks
+    chunks = fetch_data.chunk_symbols(shard)
+    scheduler = FixedRateScheduler(interval, on_overrun=Config.POLL_OVERRUN)
+    deduplicator = TickDeduplicator()
+    with fetch_data.stop_retries_on(stop_event):
+        for _ in scheduler.run(stop_event):
+            changed = deduplicator.filter(fetch(chunks))
+            if changed:
+                batches.put(pack_ticks(changed))
+
+def write_batches(batches):
+    """
+    Entry point of the writer process: the only process that writes the database.
+
+    Packed batches from every worker feed the same write-behind queues, candle
+    aggregation and ring buffer as a single-process subscription, until the
+    supervisor sends None.
+
+    Args:
+        batches (multiprocessing.Queue): The queue of packed batches.
+    """
+    _ignore_interrupts()
+    from app.candles import CandleAggregator, store_candles
+    from app.workers import aggregate_candles, create_write_queue, open_ring_buffer
+
+    aggregator = CandleAggregator(Config.CANDLE_INTERVALS)
+    write_queue = create_write_queue()
+    candle_queue = create_write_queue(store_candles, f"{Config.WRITE_SPILL_PATH}.candles", "candles")
+    ring = open_ring_buffer()
+    try:
+        while True:
+            data = batches.get()
+            if data is None:
+                break
+            ticks = unpack_ticks(data)
+            write_queue.put(ticks)
+            candle_queue.put(aggregate_candles(aggregator, ticks))
+            if ring is not None:
+                ring.extend(ticks)
+    finally:
+        write_queue.close()
+        candle_queue.close()
+        if ring is not None:
+            ring.close()
+
+class WorkerSlot:
+    """
+    One worker position of the collector: its shard, process and crash history.
+    """
+
+    def __init__(self, index, shard):
+        self.index = index
+        self.shard = shard
+        self.process = None
+        self.stop_event = None
+        self.crashes = []
+
+class ShardedCollector:
+    """
+    Supervisor of a multi-process market data collector.
+
+    The symbol universe (by default the `symbols` table) is split with
+    `shard_symbols` across `workers` processes running `poll_shard`, so fetching,
+    parsing and deduplication use one core per worker. All workers send packed
+    tick batches over one bounded `multiprocessing.Queue` to a single writer
+    process running `write_batches`, which keeps SQLite to one writer.
+
+    `check` runs every `check_interval` seconds while the collector runs:
+
+    - A worker that exits without being asked to is restarted on its shard.
+      When a slot crashes more than `max_restarts` times within
+      `restart_window` seconds, it is retired and its symbols are rebalanced
+      across the remaining workers.
+    - A writer that dies is restarted on the same queue.
+    - Every `refresh_interval` seconds the universe is reloaded; if it changed,
+      the shards are rebalanced.
+
+    Processes are started with the "spawn" method, so workers never inherit
+    the supervisor's threads, sockets or database connections.
+
+    Attributes:
+        workers (int): The number of worker slots.
+        restarts (int): The number of crashed workers restarted.
+        writer_restarts (int): The number of times the writer was restarted.
+        rebalances (int): The number of times the shards were redistributed.
+        retired (int): The number of worker slots retired after repeated crashes.
+
+    Example:
+        collector = ShardedCollector(workers=4)
+        collector.run(stop_event)  # Returns once stop_event is set
+    """
+
+    def __init__(self, workers=None, symbols=None, interval=None, fetch=None, max_restarts=None,
+                 restart_window=None, refresh_interval=None, check_interval=0.5, clock=time.monotonic):
+        self.workers = workers or Config.COLLECTOR_WORKERS
+        self.symbols = symbols
+        self.interval = interval or Config.POLL_INTERVAL
+        self.fetch = fetch
+        self.max_restarts = Config.COLLECTOR_MAX_RESTARTS if max_restarts is None else max_restarts
+        self.restart_window = restart_window or Config.COLLECTOR_RESTART_WINDOW
+        self.refresh_interval = refresh_interval or Config.COLLECTOR_REFRESH_INTERVAL
+        self.check_interval = check_interval
+        self.clock = clock
+        self.restarts = 0
+        self.writer_restarts = 0
+        self.rebalances = 0
+        self.retired = 0
+        self.universe = []
+        self.slots = []
+        self._context = multiprocessing.get_context("spawn")
+        self._batches = None
+        self._writer = None
+        self._refreshed_at = None
+        metrics.gauge("collector_workers_alive", "Collector worker processes currently running.",
+                      function=lambda: sum(slot.process is not None and slot.process.is_alive() for slot in self.slots))
+        metrics.counter("collector_worker_restarts_total", "Crashed collector workers restarted.",
+                        function=lambda: self.restarts)
+
+    def _load_universe(self):
+        """
+        Returns the symbols to collect: the configured list or the `symbols` table.
+        """
+        return sorted(set(self.symbols)) if self.symbols is not None else load_symbol_universe()
+
+    def _start_writer(self):
+        """
+        Starts the writer process on the batch queue.
+        """
+        self._writer = self._context.Process(target=write_batches, args=(self._batches,),
+                                             name="collector-writer", daemon=True)
+        self._writer.start()
+
+    def _start_worker(self, slot):
+        """
+        Starts the worker process of a slot on its current shard.
+        """
+        rate_limit = Config.FETCH_RATE_LIMIT / len(self.slots) if Config.FETCH_RATE_LIMIT else None
+        slot.stop_event = self._context.Event()
+        slot.process = self._context.Process(
+            target=poll_shard,
+            args=(slot.shard, self._batches, slot.stop_event, self.interval, rate_limit, self.fetch),
+            name=f"collector-worker-{slot.index}",
+            daemon=True
+        )
+        slot.process.start()
+
+    def _stop_worker(self, slot, timeout=10):
+        """
+        Asks a slot's worker to stop and waits for it, terminating it if it hangs.
+        """
+        if slot.process is None:
+            return
+        slot.stop_event.set()
+        slot.process.join(timeout)
+        if slot.process.is_alive():
+            slot.process.terminate()
+            slot.process.join()
+        slot.process = None
+
+    def start(self):
+        """
+        Loads the universe and starts the writer and one worker per slot.
+        """
+        self._batches = self._context.Queue(maxsize=Config.COLLECTOR_QUEUE_SIZE)
+        self._start_writer()
+        self.universe = self._load_universe()
+        self._refreshed_at = self.clock()
+        self.slots = [WorkerSlot(index, shard) for index, shard in enumerate(shard_symbols(self.universe, self.workers))]
+        for slot in self.slots:
+            self._start_worker(slot)
+        print(f"Collector started: {len(self.universe)} symbols across {len(self.slots)} workers.")
+        if not self.universe:
+            print("No symbols to collect yet; store the symbol list first.")
+
+    def rebalance(self):
+        """
+        Redistributes the universe across the active slots and restarts their workers.
+        """
+        for slot in self.slots:
+            self._stop_worker(slot)
+        for slot, shard in zip(self.slots, shard_symbols(self.universe, len(self.slots))):
+            slot.shard = shard
+            self._start_worker(slot)
+        self.rebalances += 1
+        print(f"Collector rebalanced: {len(self.universe)} symbols across {len(self.slots)} workers.")
+
+    def check(self):
+        """
+        Restarts dead processes, retires failing slots and picks up universe changes.
+
+        Raises:
+            RuntimeError: If every worker slot has been retired.
+        """
+        if not self._writer.is_alive():
+            print(f"Collector writer exited with code {self._writer.exitcode}; restarting it.")
+            self.writer_restarts += 1
+            self._start_writer()
+
+        now = self.clock()
+        retire = []
+        for slot in self.slots:
+            if slot.process.is_alive():
+                continue
+            print(f"Collector worker {slot.index} exited with code {slot.process.exitcode}.")
+            slot.crashes = [at for at in slot.crashes if now - at < self.restart_window] + [now]
+            if len(slot.crashes) > self.max_restarts:
+                retire.append(slot)
+            else:
+                self.restarts += 1
+                self._start_worker(slot)
+
+        if retire:
+            self.slots = [slot for slot in self.slots if slot not in retire]
+            self.retired += len(retire)
+            if not self.slots:
+                raise RuntimeError("Every collector worker crashed repeatedly and was retired.")
+            self.rebalance()
+        elif now - self._refreshed_at >= self.refresh_interval:
+            self._refreshed_at = now
+            universe = self._load_universe()
+            if universe != self.universe:
+                self.universe = universe
+                self.rebalance()
+
+    def stop(self, timeout=30):
+        """
+        Stops every worker, then lets the writer flush everything they sent.
+        """
+        for slot in self.slots:
+            self._stop_worker(slot)
+        if self._writer is not None:
+            if self._writer.is_alive():
+                self._batches.put(None)
+                self._writer.join(timeout)
+            if self._writer.is_alive():
+                self._writer.terminate()
+                self._writer.join()
+            self._writer = None
+        if self._batches is not None:
+            self._batches.close()
+            self._batches.join_thread()
+            self._batches = None
+
+    def run(self, stop_event):
+        """
+        Runs the collector until `stop_event` is set, then stops it.
+
+        Args:
+            stop_event (threading.Event): The event that signals when to stop.
+        """
+        self.start()
+        try:
+            while not stop_event.wait(self.check_interval):
+                self.check()
+        finally:
+            self.stop()
+
+    def stats(self):
+        """
+        Returns the collector's supervision statistics.
+
+        Returns:
+            dict: Symbol, worker, restart, rebalance and retirement counts.
+        """
+        return {
+            "symbols": len(self.universe),
+            "workers": len(self.slots),
+            "restarts": self.restarts,
+            "writer_restarts": self.writer_restarts,
+            "rebalances": self.rebalances,
+            "retired": self.retired
+        }
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of `stats`.
+
+        Returns:
+            str: The summary line.
+        """
+        stats = self.stats()
+        return (
+            f"{stats['symbols']} symbols on {stats['workers']} workers, {stats['restarts']} restarts, "
+            f"{stats['writer_restarts']} writer restarts, {stats['rebalances']} rebalances, "
+            f"{stats['retired']} retired"
+        )
@@ -17,6 +17,97 @@ class Config:
                             the environment variable "DATABASE_URL".
         API_URL (str): The base URL for the API, loaded from the environment
                        variable "API_URL".
+        POLL_INTERVAL (float): The market data polling period in seconds, loaded
+                               from "POLL_INTERVAL" (default 1.0). May be sub-second.
+        POLL_OVERRUN (str): What the polling scheduler does with ticks missed by a
+                            slow iteration, "skip" or "coalesce", loaded from
+                            "POLL_OVERRUN" (default "skip").
+        WRITE_QUEUE_SIZE (int): The capacity of the write-behind queue, in tickers.
+        WRITE_BATCH_SIZE (int): The maximum number of tickers committed at once.
+        WRITE_FLUSH_INTERVAL (float): The maximum age of a pending batch, in seconds.
+        WRITE_BACKPRESSURE (str): What happens when the queue is full: "block",
+                                  "drop-oldest" or "spill".
+        WRITE_SPILL_PATH (str): The file that receives overflow in "spill" mode.
+        CANDLE_INTERVALS (list): The candle intervals aggregated while subscribing,
+                                 loaded from the comma-separated "CANDLE_INTERVALS"
+                                 (default "1m,5m,1h").
+        SQLITE_PROFILE (str): The SQLite connection profile applied to new
+                              connections: "default", "safe" or "fast"
+                              (default "default"). "fast" trades durability for
+                              write throughput and must be opted into.
+                              See `database.SQLITE_PROFILES`.
+        SQLITE_PRAGMAS (dict): Per-pragma overrides of the profile, loaded from
+                               "SQLITE_JOURNAL_MODE", "SQLITE_SYNCHRONOUS",
+                               "SQLITE_CACHE_SIZE", "SQLITE_MMAP_SIZE",
+                               "SQLITE_TEMP_STORE" and "SQLITE_BUSY_TIMEOUT".
+        ARCHIVE_DIR (str): The root directory of the Parquet market data archive,
+                           loaded from "ARCHIVE_DIR" (default "archive").
+        ARCHIVE_AFTER_DAYS (float): The age in days after which market data is moved
+                                    to the archive, loaded from "ARCHIVE_AFTER_DAYS"
+                                    (default 30).
+        RING_BUFFER_PATH (str): The memory-mapped file the subscription publishes its
+                                latest ticks to, loaded from "RING_BUFFER_PATH".
+                                Publishing is disabled when empty (the default).
+        RING_BUFFER_CAPACITY (int): The number of ticks kept in the ring buffer,
+                                    loaded from "RING_BUFFER_CAPACITY" (default 65536).
+        SYMBOLS_CACHE_TTL (float): How long the symbol list is served from cache
+                                   before it is revalidated, in seconds, loaded from
+                                   "SYMBOLS_CACHE_TTL" (default 3600).
+        SYMBOLS_CACHE_PATH (str): The file the cached symbol list is persisted to,
+                                  loaded from "SYMBOLS_CACHE_PATH" (default
+                                  "symbols_cache.json"). Persistence is disabled when empty.
+        JSON_DECODER (str): The decoder for API responses, loaded from "JSON_DECODER":
+                            "auto" (default; the fastest installed), "msgspec",
+                            "orjson" or "json".
+        METRICS_PORT (int): The port of the Prometheus-format metrics endpoint served
+                            while subscribing, loaded from "METRICS_PORT". The
+                            endpoint is disabled when unset (the default).
+        METRICS_PATH (str): The file the metrics are dumped to while subscribing, for
+                            file-based scrapers, loaded from "METRICS_PATH".
+                            Dumping is disabled when empty (the default).
+        METRICS_DUMP_INTERVAL (float): The period between metrics dumps, in seconds,
+                                       loaded from "METRICS_DUMP_INTERVAL" (default 5).
+        FETCH_TIMEOUT (float): The timeout of a single API request, in seconds,
+                               loaded from "FETCH_TIMEOUT" (default 10).
+        FETCH_RATE_LIMIT (float): The API request rate shared by all fetchers, per
+                                  second, loaded from "FETCH_RATE_LIMIT" (default 10).
+                                  0 disables rate limiting.
+        FETCH_BURST (int): The number of requests that may be sent back to back,
+                           loaded from "FETCH_BURST" (default 10).
+        FETCH_MAX_RETRIES (int): The retries of a failed request, loaded from
+                                 "FETCH_MAX_RETRIES" (default 3).
+        FETCH_BACKOFF_BASE (float): The backoff ceiling of the first retry, in seconds,
+                                    loaded from "FETCH_BACKOFF_BASE" (default 0.5).
+        FETCH_BACKOFF_MAX (float): The largest backoff ceiling, in seconds, loaded from
+                                   "FETCH_BACKOFF_MAX" (default 30).
+        CIRCUIT_FAILURE_THRESHOLD (int): The consecutive failures that open the circuit
+                                         breaker, loaded from "CIRCUIT_FAILURE_THRESHOLD"
+                                         (default 5).
+        CIRCUIT_RESET_TIMEOUT (float): How long the open circuit refuses requests, in
+                                       seconds, loaded from "CIRCUIT_RESET_TIMEOUT"
+                                       (default 30).
+        COLLECTOR_WORKERS (int): The worker processes of the sharded collector, loaded
+                                 from "COLLECTOR_WORKERS" (default one per CPU).
+        COLLECTOR_QUEUE_SIZE (int): The capacity of the collector's batch queue, in
+                                    batches, loaded from "COLLECTOR_QUEUE_SIZE" (default 1000).
+        COLLECTOR_MAX_RESTARTS (int): The restarts of a crashing worker within the restart
+                                      window before its slot is retired, loaded from
+                                      "COLLECTOR_MAX_RESTARTS" (default 3).
+        COLLECTOR_RESTART_WINDOW (float): The window over which worker crashes are counted,
+                                          in seconds, loaded from "COLLECTOR_RESTART_WINDOW"
+                                          (default 60).
+        COLLECTOR_REFRESH_INTERVAL (float): How often the symbol universe is reloaded
+                                            from the database, in seconds, loaded from
+                                            "COLLECTOR_REFRESH_INTERVAL" (default 300).
+        STORAGE_BACKEND (str): How ticks and candles are written, loaded from
+                               "STORAGE_BACKEND": "auto" (default; by the database
+                               URL's dialect), "sqlite", "postgresql" or "default"
+                               (portable SQL). See `storage.BACKENDS`.
+        TIMESCALE_HYPERTABLE (bool): Whether the PostgreSQL backend turns `market_data`
+                                     into a TimescaleDB hypertable on `date`, loaded
+                                     from "TIMESCALE_HYPERTABLE" (default false).
+        TIMESCALE_CHUNK_INTERVAL (int): The hypertable's chunk size, in seconds, loaded
+                                        from "TIMESCALE_CHUNK_INTERVAL" (default 86400).
     """
 
     # The URL for the database connection.
@@ -25,6 +116,72 @@ class Config:
     # The base URL for the API.
     API_URL = os.getenv("API_URL")
 
+    # The market data polling period, in seconds.
+    POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "1.0"))
+
+    # How the polling scheduler handles missed ticks ("skip" or "coalesce").
+    POLL_OVERRUN = os.getenv("POLL_OVERRUN", "skip")
+
+    # Write-behind queue settings for persisting polled market data.
+    WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "10000"))
+    WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "500"))
+    WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "1.0"))
+    WRITE_BACKPRESSURE = os.getenv("WRITE_BACKPRESSURE", "block")
+    WRITE_SPILL_PATH = os.getenv("WRITE_SPILL_PATH", "market_data.spill.jsonl")
+
+    # Candle intervals aggregated from the subscription's tick stream.
+    CANDLE_INTERVALS = [name.strip() for name in os.getenv("CANDLE_INTERVALS", "1m,5m,1h").split(",") if name.strip()]
+
+    # SQLite connection profile and per-pragma overrides.
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+    SQLITE_PRAGMAS = {
+        pragma: os.getenv(f"SQLITE_{pragma.upper()}")
+        for pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+        if os.getenv(f"SQLITE_{pragma.upper()}") is not None
+    }
+
+    # Parquet archive of old market data.
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+    # Memory-mapped ring buffer of the latest ticks, shared with other processes.
+    RING_BUFFER_PATH = os.getenv("RING_BUFFER_PATH", "")
+    RING_BUFFER_CAPACITY = int(os.getenv("RING_BUFFER_CAPACITY", "65536"))
+
+    # Cache of the /symbols payload.
+    SYMBOLS_CACHE_TTL = float(os.getenv("SYMBOLS_CACHE_TTL", "3600"))
+    SYMBOLS_CACHE_PATH = os.getenv("SYMBOLS_CACHE_PATH", "symbols_cache.json")
+
+    # Decoder for API responses.
+    JSON_DECODER = os.getenv("JSON_DECODER", "auto")
+
+    # Exposure of the subscription metrics, over HTTP and/or as a file dump.
+    METRICS_PORT = int(os.getenv("METRICS_PORT")) if os.getenv("METRICS_PORT") else None
+    METRICS_PATH = os.getenv("METRICS_PATH", "")
+    METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "5"))
+
+    # Retry, backoff, rate limiting and circuit breaking of API requests.
+    FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+    FETCH_RATE_LIMIT = float(os.getenv("FETCH_RATE_LIMIT", "10"))
+    FETCH_BURST = int(os.getenv("FETCH_BURST", "10"))
+    FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", "3"))
+    FETCH_BACKOFF_BASE = float(os.getenv("FETCH_BACKOFF_BASE", "0.5"))
+    FETCH_BACKOFF_MAX = float(os.getenv("FETCH_BACKOFF_MAX", "30"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # Multi-process sharded collector.
+    COLLECTOR_WORKERS = int(os.getenv("COLLECTOR_WORKERS", str(os.cpu_count() or 1)))
+    COLLECTOR_QUEUE_SIZE = int(os.getenv("COLLECTOR_QUEUE_SIZE", "1000"))
+    COLLECTOR_MAX_RESTARTS = int(os.getenv("COLLECTOR_MAX_RESTARTS", "3"))
+    COLLECTOR_RESTART_WINDOW = float(os.getenv("COLLECTOR_RESTART_WINDOW", "60"))
+    COLLECTOR_REFRESH_INTERVAL = float(os.getenv("COLLECTOR_REFRESH_INTERVAL", "300"))
+
+    # Storage backend of ticks and candles, and TimescaleDB partitioning.
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "auto")
+    TIMESCALE_HYPERTABLE = os.getenv("TIMESCALE_HYPERTABLE", "false").lower() in ("1", "true", "yes")
+    TIMESCALE_CHUNK_INTERVAL = int(os.getenv("TIMESCALE_CHUNK_INTERVAL", "86400"))
+
 class TestConfig(Config):
     """
     Configuration class to hold environment variables for the test environment.
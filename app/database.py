@@ -1,21 +1,165 @@
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import Config, TestConfig
 
 # Create a base class for declarative class definitions
 Base = declarative_base()
 
-# Create a new SQLAlchemy engine instance for the main database
-engine = create_engine(Config.DATABASE_URL, connect_args={"check_same_thread": False})
+# SQLite connection profiles, applied as PRAGMAs to every new connection.
+# - "default" keeps SQLite's rollback journal and synchronous=FULL.
+# - "safe" switches to write-ahead logging, so readers no longer block the
+#   writer, while keeping a full fsync on every commit.
+# - "fast" additionally relaxes synchronous to NORMAL (WAL stays consistent
+#   after a crash, only the latest commits may be lost on power failure) and
+#   enlarges the page cache and memory map.
+SQLITE_PROFILES = {
+    "default": {},
+    "safe": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+    },
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
 
-# Create a new SQLAlchemy engine instance for the test database
-test_engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
+def sqlite_pragmas(profile=None, overrides=None):
+    """
+    Resolves the PRAGMAs of a SQLite connection profile.
+
+    Args:
+        profile (str, optional): A key of `SQLITE_PROFILES`. Defaults to `Config.SQLITE_PROFILE`.
+        overrides (dict, optional): Per-pragma values that replace the profile's.
+                                    Defaults to `Config.SQLITE_PRAGMAS`.
+
+    Returns:
+        dict: The PRAGMA names and values to apply, in order.
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    profile = profile or Config.SQLITE_PROFILE
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}; expected one of {', '.join(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(Config.SQLITE_PRAGMAS if overrides is None else overrides)
+    return pragmas
+
+def create_database_engine(url, profile=None, overrides=None):
+    """
+    Creates a SQLAlchemy engine, applying the SQLite connection profile to SQLite URLs.
+
+    SQLite connections may be used from any thread, since the write-behind queue
+    commits from its own; other databases get their driver's defaults.
+
+    Args:
+        url (str): The database URL.
+        profile (str, optional): The SQLite connection profile. Defaults to `Config.SQLITE_PROFILE`.
+        overrides (dict, optional): Per-pragma overrides. Defaults to `Config.SQLITE_PRAGMAS`.
+
+    Returns:
+        sqlalchemy.engine.Engine: The new engine.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url)
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    pragmas = sqlite_pragmas(profile, overrides)
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+# Engines created so far, one per database URL, by `get_engine`
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(url=None):
+    """
+    Returns the engine of a database URL, creating it on first use.
+
+    Engines are created lazily, so importing this module opens no connection
+    pool, and every caller asking for the same URL shares one engine.
+
+    Args:
+        url (str, optional): The database URL. Defaults to `Config.DATABASE_URL`,
+                             read at call time.
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine of the URL.
+
+    Example:
+        >>> get_engine() is get_engine(Config.DATABASE_URL)
+        True
+    """
+    url = url or Config.DATABASE_URL
+    engine = _engines.get(url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = _engines[url] = create_database_engine(url)
+    return engine
+
+def dispose_engines():
+    """
+    Disposes of every engine created by `get_engine` and forgets them, e.g. in a
+    forked process, which must not reuse its parent's connections.
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+
+class LazySessionMaker(sessionmaker):
+    """
+    A session factory bound to the engine of a database URL on first use.
+
+    Unlike a plain `sessionmaker(bind=engine)`, it needs no engine when it is
+    created, so it can be defined at import time. A `bind` passed to the
+    factory, its `configure` method or a session overrides the URL's engine.
+
+    Args:
+        url (callable): Returns the database URL, e.g. `lambda: Config.DATABASE_URL`.
+        **kwargs: The `sessionmaker` options.
+    """
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+
+    def __call__(self, **local_kwargs):
+        if self.kw.get("bind") is None and local_kwargs.get("bind") is None:
+            local_kwargs["bind"] = get_engine(self.url())
+        return super().__call__(**local_kwargs)
 
 # Create a configured "Session" class for the main database
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionMaker(lambda: Config.DATABASE_URL, autocommit=False, autoflush=False)
 
 # Create a configured "Session" class for the test database
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+TestSessionLocal = LazySessionMaker(lambda: TestConfig.DATABASE_URL, autocommit=False, autoflush=False)
+
+def __getattr__(name):
+    """
+    Resolves the `engine` and `test_engine` module attributes lazily.
+    """
+    if name == "engine":
+        return get_engine(Config.DATABASE_URL)
+    if name == "test_engine":
+        return get_engine(TestConfig.DATABASE_URL)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db():
     """
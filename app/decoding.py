@@ -0,0 +1,100 @@
+import json
+from app.config import Config
+from app.ticks import Tick, parse_ticks
+
+# Optional accelerated decoders; the standard library is used when neither is installed
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Decoders in order of preference for "auto"
+DECODERS = ("msgspec", "orjson", "json")
+
+if msgspec is not None:
+    # `Tick` is a msgspec Struct when msgspec is installed. Decoded in lax mode,
+    # so the exchange's numeric strings become floats while the document is parsed
+    _TICKERS_DECODER = msgspec.json.Decoder(list[Tick], strict=False)
+    _JSON_DECODER = msgspec.json.Decoder()
+
+def available_decoders():
+    """
+    Returns the decoders that can be used in this environment.
+
+    Returns:
+        list of str: The available decoder names, fastest first.
+    """
+    installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in DECODERS if installed[name]]
+
+def resolve_decoder(name=None):
+    """
+    Resolves a decoder setting to an available decoder.
+
+    Args:
+        name (str, optional): "auto", "msgspec", "orjson" or "json".
+                              Defaults to `Config.JSON_DECODER`.
+
+    Returns:
+        str: The decoder to use. "auto" picks the fastest available one.
+
+    Raises:
+        ValueError: If the decoder is unknown or its package is not installed.
+    """
+    name = name or Config.JSON_DECODER
+    available = available_decoders()
+    if name == "auto":
+        return available[0]
+    if name not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder {name!r}; expected 'auto' or one of {', '.join(DECODERS)}")
+    if name not in available:
+        raise ValueError(f"The {name!r} JSON decoder is not installed")
+    return name
+
+def decode_json(content, decoder=None):
+    """
+    Decodes a JSON document with the configured decoder.
+
+    Args:
+        content (bytes or str): The raw response body.
+        decoder (str, optional): The decoder setting, see `resolve_decoder`.
+
+    Returns:
+        dict or list: The decoded document, as `json.loads` would return it.
+    """
+    decoder = resolve_decoder(decoder)
+    if decoder == "msgspec":
+        return _JSON_DECODER.decode(content)
+    if decoder == "orjson":
+        return orjson.loads(content)
+    return json.loads(content)
+
+def decode_ticks(content, decoder=None):
+    """
+    Decodes a /tickers response body straight into ticks.
+
+    With msgspec, the body is decoded straight into `Tick` Structs, validated
+    against their typed fields, with every price converted to float in the same
+    pass as the parsing and no intermediate object per ticker. The other decoders parse
+    the document first and convert the fields with `parse_ticks`. If a ticker
+    does not fit the schema (e.g. an empty price), the body is decoded again the
+    generic way, whose conversion turns unparseable prices into 0.0.
+
+    Args:
+        content (bytes or str): The raw /tickers response body.
+        decoder (str, optional): The decoder setting, see `resolve_decoder`.
+
+    Returns:
+        list of Tick: One tick per ticker, in payload order.
+    """
+    decoder = resolve_decoder(decoder)
+    if decoder == "msgspec":
+        try:
+            return _TICKERS_DECODER.decode(content)
+        except msgspec.ValidationError:
+            return parse_ticks(_JSON_DECODER.decode(content))
+    return parse_ticks(decode_json(content, decoder))
@@ -0,0 +1,52 @@
+class TickDeduplicator:
+    """
+    Drops ticker snapshots that repeat the previous snapshot of the same symbol.
+
+    The /tickers `date` field often stays the same between polls of an idle
+    pair, so consecutive snapshots are frequently identical. This stage keeps
+    the last seen key of every symbol in memory and only lets a ticker through
+    when its (`date`, `last`, `buy`, `sell`, `vol`) key changed.
+
+    Attributes:
+        seen (int): The number of tickers inspected.
+        suppressed (int): The number of tickers dropped as duplicates.
+
+    Example:
+        deduplicator = TickDeduplicator()
+        changed = deduplicator.filter(parse_ticks(fetch_market_data(["BTC-BRL"])))
+    """
+
+    def __init__(self):
+        self.seen = 0
+        self.suppressed = 0
+        self._last_keys = {}
+
+    def filter(self, market_data):
+        """
+        Returns the ticks whose key differs from the symbol's previous tick.
+
+        Args:
+            market_data (list of Tick): The ticks of one poll.
+
+        Returns:
+            list of Tick: The ticks that changed, in their original order.
+        """
+        changed = []
+        for tick in market_data:
+            key = tick.key()
+            if self._last_keys.get(tick.symbol) == key:
+                self.suppressed += 1
+            else:
+                self._last_keys[tick.symbol] = key
+                changed.append(tick)
+        self.seen += len(market_data)
+        return changed
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of the suppressed writes.
+
+        Returns:
+            str: The summary line.
+        """
+        return f"{self.suppressed} of {self.seen} tickers suppressed as duplicates"
@@ -1,8 +1,18 @@
+import asyncio
+import contextlib
 import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
 import requests
 from urllib3.exceptions import InsecureRequestWarning
 from urllib3 import disable_warnings
 from .config import Config
+from .decoding import decode_json, decode_ticks
+from .metrics import metrics, stage_histogram
 
 # Disable security warnings for unverified HTTPS requests
 disable_warnings(InsecureRequestWarning)
@@ -10,9 +20,403 @@ disable_warnings(InsecureRequestWarning)
 # API URL configuration using environment variables, with a fallback to the Config class
 API_URL = os.getenv("API_URL", Config.API_URL)
 
+# Conservative upper bound for request URLs; servers and proxies commonly accept at least this many characters
+MAX_URL_LENGTH = 2000
+
 # Create a global session to reuse connections and improve performance
 session = requests.Session()
 
+# Latency of the /tickers request and of decoding its body, see `app.metrics`
+FETCH_SECONDS = stage_histogram("fetch")
+PARSE_SECONDS = stage_histogram("parse")
+
+# Requests sent again after a transient failure
+RETRIES = metrics.counter("market_data_retries_total", "API requests retried after a transient failure.")
+
+# Responses that are worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter shared by every fetcher.
+
+    Tokens accrue at `rate` per second up to `burst`; each request takes one.
+    `reserve` claims the next token and returns how long the caller must wait
+    for it, so blocking (`acquire`) and asyncio (`acquire_async`) callers share
+    one bucket. A server-imposed pause (a 429's Retry-After) holds back every
+    caller until it ends.
+
+    Attributes:
+        rate (float): The sustained request rate, per second, or None for no limit.
+        burst (int): The number of requests that may be sent back to back.
+
+    Example:
+        limiter = TokenBucket(rate=5, burst=10)
+        limiter.acquire()  # Blocks until a request may be sent
+    """
+
+    def __init__(self, rate=None, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Claims a token, possibly one that has not accrued yet.
+
+        Returns:
+            float: How long to wait before sending the request, in seconds.
+        """
+        with self._lock:
+            now = self.clock()
+            delay = max(self._paused_until - now, 0.0)
+            if not self.rate:
+                return delay
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def pause(self, seconds):
+        """
+        Holds back every caller for `seconds`, e.g. as requested by Retry-After.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+
+        Returns:
+            float: The time spent waiting, in seconds.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        """
+        Waits, without blocking the event loop, until a request may be sent.
+
+        Returns:
+            float: The time spent waiting, in seconds.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops calling the API while it is failing.
+
+    After `failure_threshold` consecutive failed attempts the circuit opens and
+    requests fail fast with `CircuitOpenError`, instead of adding load to an API
+    that is down. Once `reset_timeout` seconds have passed, a single trial
+    request is let through (half-open): its success closes the circuit and
+    its failure opens it again.
+
+    Attributes:
+        failure_threshold (int): The consecutive failures that open the circuit.
+        reset_timeout (float): How long the circuit stays open, in seconds.
+        opened (int): The number of times the circuit opened.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.opened = 0
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        Returns the circuit's state: "closed", "open" or "half-open".
+        """
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        Checks that a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its trial
+                              request already in flight.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return
+            retry_in = max(self.reset_timeout - (self.clock() - self._opened_at), 0.0)
+            raise CircuitOpenError(f"Circuit open after {self._failures} consecutive failures; retrying in {retry_in:.1f}s")
+
+    def record_success(self):
+        """
+        Records a request the API answered, closing the circuit.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """
+        Records a failed request, opening the circuit past the threshold.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+    def abandon(self):
+        """
+        Records a request that ended without an outcome, e.g. on an unexpected
+        error or a cancellation.
+
+        A half-open circuit waits for the outcome of its trial request, so an
+        abandoned trial counts as failed and opens the circuit again; otherwise
+        nothing changes.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._failures += 1
+                self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    The n-th retry waits a random delay between 0 and `min(cap, base * 2**n)`
+    seconds, which spreads the retries of concurrent fetchers instead of
+    synchronizing them, or the server's Retry-After if that is longer. No
+    delay exceeds `cap`, whatever the server asks for.
+
+    Attributes:
+        max_retries (int): The number of retries after the first attempt.
+        base (float): The backoff ceiling of the first retry, in seconds.
+        cap (float): The largest backoff ceiling, in seconds.
+    """
+
+    def __init__(self, max_retries=3, base=0.5, cap=30.0, random=random.random):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self.random = random
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns how long to wait before a retry.
+
+        Args:
+            attempt (int): The number of attempts already made, from 1.
+            retry_after (float, optional): The server's requested delay, in seconds.
+
+        Returns:
+            float: The delay in seconds, at most `cap`.
+        """
+        backoff = self.random() * min(self.cap, self.base * 2 ** (attempt - 1))
+        return min(max(backoff, retry_after or 0.0), self.cap)
+
+def retry_after_seconds(value, now=None):
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value, or None.
+        now (datetime, optional): The current time. Defaults to now in UTC.
+
+    Returns:
+        float: The requested delay in seconds, or None if absent or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now or datetime.now(timezone.utc)
+    return max((date - now).total_seconds(), 0.0)
+
+# Fetch policy shared by every synchronous and asynchronous fetcher
+rate_limiter = TokenBucket(Config.FETCH_RATE_LIMIT, Config.FETCH_BURST)
+circuit_breaker = CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_TIMEOUT)
+retry_policy = RetryPolicy(Config.FETCH_MAX_RETRIES, Config.FETCH_BACKOFF_BASE, Config.FETCH_BACKOFF_MAX)
+
+# Set to stop waiting between retries, see `stop_retries_on`
+_stop_event = threading.Event()
+
+# Time spent waiting before requests, by cause
+THROTTLE_HELP = "Time spent waiting before API requests, by cause."
+RATE_LIMIT_SECONDS = metrics.counter("market_data_throttled_seconds_total", THROTTLE_HELP, reason="rate_limit")
+BACKOFF_SECONDS = metrics.counter("market_data_throttled_seconds_total", THROTTLE_HELP, reason="backoff")
+RATE_LIMITED = metrics.counter("market_data_rate_limited_total", "API responses with status 429 Too Many Requests.")
+metrics.gauge("market_data_circuit_open", "1 while the API circuit breaker is open or half-open.",
+              function=lambda: int(circuit_breaker.state != CircuitBreaker.CLOSED))
+
+def retry_delay(attempt, status=None, retry_after=None):
+    """
+    Applies the fetch policy to a failed attempt.
+
+    Records the failure with the circuit breaker, except for 429s, which mean
+    the API is up and count as a success, and, for a 429, pauses the shared
+    rate limiter until the server's Retry-After. A Retry-After longer than
+    `retry_policy.cap` is not waited for: the pause is cut to the cap and the
+    request is not retried. Retries and their backoff are counted in the metrics.
+
+    Args:
+        attempt (int): The number of attempts made so far, from 1.
+        status (int, optional): The HTTP status, or None for a connection error.
+        retry_after (str, optional): The response's Retry-After header.
+
+    Returns:
+        float: How long to wait before retrying, or None if no retry is left.
+    """
+    retry_after = retry_after_seconds(retry_after)
+    if status == 429:
+        RATE_LIMITED.inc()
+        circuit_breaker.record_success()
+        if retry_after:
+            rate_limiter.pause(min(retry_after, retry_policy.cap))
+    else:
+        circuit_breaker.record_failure()
+    if attempt > retry_policy.max_retries or (retry_after or 0.0) > retry_policy.cap:
+        return None
+    RETRIES.inc()
+    delay = retry_policy.delay(attempt, retry_after)
+    BACKOFF_SECONDS.inc(delay)
+    return delay
+
+@contextlib.contextmanager
+def stop_retries_on(stop_event):
+    """
+    Interrupts the waits between retries when `stop_event` is set.
+
+    Within the context, `send_request` and `AsyncMarketDataClient` wait for
+    their backoff on `stop_event` instead of sleeping, and give up retrying
+    once it is set, so a stopping subscription is never held up by a backoff.
+
+    Args:
+        stop_event (threading.Event): The event that signals when to stop.
+
+    Example:
+        with stop_retries_on(stop_event):
+            for _ in scheduler.run(stop_event):
+                fetch_ticks(["BTC-BRL"])
+    """
+    global _stop_event
+    previous, _stop_event = _stop_event, stop_event
+    try:
+        yield
+    finally:
+        _stop_event = previous
+
+def wait_to_retry(delay):
+    """
+    Waits `delay` seconds before a retry, unless stopped by `stop_retries_on`.
+
+    Args:
+        delay (float): The backoff, in seconds.
+
+    Returns:
+        bool: True if the wait was interrupted and the request should not be retried.
+    """
+    return _stop_event.wait(delay)
+
+async def wait_to_retry_async(delay):
+    """
+    Asynchronous variant of `wait_to_retry`, which polls the stop event so as
+    not to block the event loop.
+    """
+    deadline = time.monotonic() + delay
+    while not _stop_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(remaining, 0.1))
+    return True
+
+def send_request(url, params=None, headers=None):
+    """
+    Sends a GET request to the API under the shared fetch policy.
+
+    Each attempt waits for the shared `rate_limiter` and is refused while the
+    `circuit_breaker` is open. Connection errors, timeouts, 429s and transient
+    5xx responses are retried up to `retry_policy.max_retries` times with
+    exponential backoff and jitter, honoring Retry-After up to the backoff cap;
+    `stop_retries_on` interrupts the waits between them. An attempt that fails
+    in any other way is reported to the circuit breaker with `abandon`, so a
+    half-open circuit never waits for a trial request that is gone.
+
+    Args:
+        url (str): The URL to request.
+        params (dict, optional): Query string parameters.
+        headers (dict, optional): Request headers.
+
+    Returns:
+        requests.Response: The response, whose status is below 400 (e.g. 200 or 304).
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open.
+        requests.HTTPError: If the final response has an HTTP error status.
+        requests.RequestException: If the request fails for any other reason.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        circuit_breaker.allow()
+        try:
+            RATE_LIMIT_SECONDS.inc(rate_limiter.acquire())
+            response = session.get(url, params=params, headers=headers, verify=False, timeout=Config.FETCH_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            delay = retry_delay(attempt)
+            if delay is None or wait_to_retry(delay):
+                raise
+        except BaseException:
+            circuit_breaker.abandon()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUSES:
+                circuit_breaker.record_success()
+                response.raise_for_status()  # Raise an error for HTTP error responses
+                return response
+            delay = retry_delay(attempt, response.status_code, response.headers.get("Retry-After"))
+            if delay is None or wait_to_retry(delay):
+                response.raise_for_status()
+
 def fetch_symbols():
     """
     Fetches the list of available trading symbols from the API.
@@ -35,13 +439,35 @@ def fetch_symbols():
     """
     url = f"{API_URL}symbols"
     try:
-        response = session.get(url, verify=False)
-        response.raise_for_status()  # Raise an error for HTTP error responses
-        return response.json()  # Parse and return the JSON response
+        response = send_request(url)
+        return decode_json(response.content)  # Parse and return the JSON response
     except requests.RequestException as e:
         print(f"Error fetching symbols: {e}")
         raise
 
+def _get_tickers(symbols):
+    """
+    Requests the /tickers endpoint for the given symbols.
+
+    Args:
+        symbols (list): A list of symbol strings (e.g., ["BTC-BRL", "ETH-BRL"]).
+
+    Returns:
+        requests.Response: The successful response.
+
+    Raises:
+        requests.RequestException: If there is an error during the HTTP request.
+    """
+    url = f"{API_URL}tickers"
+    params = {
+        "symbols": ",".join(symbols)  # Join the list of symbols into a single comma-separated string
+    }
+    try:
+        return send_request(url, params=params)
+    except requests.RequestException as e:
+        print(f"Error fetching market data for symbols {symbols}: {e}")
+        raise
+
 def fetch_market_data(symbols):
     """
     Fetches market data for the given list of symbols from the API.
@@ -65,14 +491,68 @@ def fetch_market_data(symbols):
         market_data = fetch_market_data(["BTC-BRL", "ETH-BRL"])
         print(market_data)  # Output: [{'symbol': 'BTC-BRL', 'price': 50000, 'volume': 1000}, ...]
     """
-    url = f"{API_URL}tickers"
-    params = {
-        "symbols": ",".join(symbols)  # Join the list of symbols into a single comma-separated string
-    }
-    try:
-        response = session.get(url, params=params, verify=False)
-        response.raise_for_status()  # Raise an error for HTTP error responses
-        return response.json()  # Parse and return the JSON response
-    except requests.RequestException as e:
-        print(f"Error fetching market data for symbols {symbols}: {e}")
-        raise
+    return decode_json(_get_tickers(symbols).content)  # Parse and return the JSON response
+
+def fetch_ticks(symbols):
+    """
+    Fetches market data for the given list of symbols, decoded straight into ticks.
+
+    The response body is decoded by `decoding.decode_ticks`, which converts the
+    numeric-string prices to floats while parsing when msgspec is available. The
+    request and the decoding are timed separately in the "fetch" and "parse"
+    stages of `market_data_stage_seconds`.
+
+    Args:
+        symbols (list): A list of symbol strings (e.g., ["BTC-BRL", "ETH-BRL"]).
+
+    Returns:
+        list of Tick: One tick per returned ticker.
+
+    Raises:
+        requests.RequestException: If there is an error during the HTTP request.
+
+    Example:
+        ticks = fetch_ticks(["BTC-BRL", "ETH-BRL"])
+        print(ticks[0].last)  # Output: 31000.5
+    """
+    with FETCH_SECONDS.time():
+        response = _get_tickers(symbols)
+    with PARSE_SECONDS.time():
+        return decode_ticks(response.content)
+
+def chunk_symbols(symbols, max_url_length=MAX_URL_LENGTH):
+    """
+    Splits a watchlist into chunks that each fit in a single /tickers request.
+
+    `fetch_market_data` sends all requested symbols in one comma-separated
+    `symbols=` query parameter, so large watchlists must be split to keep the
+    request URL under `max_url_length` characters once percent-encoded. Duplicate
+    symbols are dropped and the original order is preserved.
+
+    Args:
+        symbols (list): A list of symbol strings (e.g., ["BTC-BRL", "ETH-BRL"]).
+        max_url_length (int): The maximum length of a /tickers request URL.
+
+    Returns:
+        list of list: The symbols grouped into URL-length-safe chunks.
+
+    Example:
+        chunks = chunk_symbols(["BTC-BRL", "ETH-BRL", "LTC-BRL"], max_url_length=75)
+        print(chunks)  # Output: [['BTC-BRL', 'ETH-BRL'], ['LTC-BRL']]
+    """
+    budget = max_url_length - len(f"{API_URL}tickers?symbols=")
+    separator = len(quote(","))
+    chunks = []
+    current = []
+    used = 0
+    for symbol in dict.fromkeys(symbols):
+        cost = len(quote(symbol))
+        if current and used + separator + cost > budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        used += cost + (separator if current else 0)
+        current.append(symbol)
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,447 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    """
+    Escapes a label value for the text exposition format.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    """
+    Renders a label set as `{name="value",...}`.
+    """
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    """
+    Renders a sample value the way Prometheus expects it.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """
+    Monotonically increasing count, e.g. of ticks or errors.
+
+    A counter either counts its own increments or, when created with `function`,
+    reports the value of a count kept elsewhere (e.g. `WriteBehindQueue.dropped`).
+
+    Attributes:
+        labels (tuple): The (name, value) label pairs of this series.
+    """
+
+    kind = "counter"
+
+    def __init__(self, labels=(), function=None):
+        self.labels = labels
+        self.function = function
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """
+        Increments the counter.
+
+        Args:
+            amount (int or float): The increment, which must not be negative.
+        """
+        with self._lock:
+            self._value += amount
+
+    def value(self):
+        """
+        Returns the current count.
+        """
+        return self.function() if self.function is not None else self._value
+
+    def samples(self, name):
+        """
+        Yields the exposition lines of this series.
+        """
+        yield f"{name}{_format_labels(self.labels)} {_format_value(self.value())}"
+
+class Gauge(Counter):
+    """
+    Value that goes up and down, e.g. a queue depth.
+
+    Gauges are usually created with `function`, so they are sampled when the
+    metrics are rendered rather than updated on the hot path.
+    """
+
+    kind = "gauge"
+
+    def set(self, value):
+        """
+        Sets the gauge to `value`.
+        """
+        with self._lock:
+            self._value = value
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets.
+
+    Observations are counted in cumulative buckets, as in a Prometheus histogram,
+    so recording costs a binary search and an increment regardless of how many
+    values were observed. Quantiles are estimated from the buckets by linear
+    interpolation, like PromQL's `histogram_quantile`.
+
+    Attributes:
+        labels (tuple): The (name, value) label pairs of this series.
+        buckets (tuple): The bucket upper bounds, in increasing order.
+        count (int): The number of observations.
+        sum (float): The sum of the observed values.
+        max (float): The largest observed value.
+
+    Example:
+        histogram = Histogram()
+        with histogram.time():
+            fetch_ticks(["BTC-BRL"])
+        print(histogram.quantile(0.99))
+    """
+
+    kind = "histogram"
+
+    def __init__(self, labels=(), buckets=LATENCY_BUCKETS):
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value, e.g. a duration in seconds.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    @contextlib.contextmanager
+    def time(self):
+        """
+        Context manager that observes the duration of its block, in seconds.
+        The duration is recorded even if the block raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """
+        Estimates a quantile of the observed values.
+
+        Args:
+            q (float): The quantile, between 0 and 1 (e.g. 0.99 for p99).
+
+        Returns:
+            float: The estimate, or 0.0 if nothing was observed. Values beyond the
+                   last bucket are reported as the largest observation.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self.count
+            largest = self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return largest
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = min(self.buckets[index], largest)
+                return lower + (upper - lower) * max(rank - cumulative, 0) / count
+            cumulative += count
+        return largest
+
+    def samples(self, name):
+        """
+        Yields the exposition lines of this series: cumulative buckets, sum and count.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self.count
+            observed = self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels(self.labels, [('le', _format_value(float(bound)))])} {cumulative}"
+        yield f"{name}_sum{_format_labels(self.labels)} {_format_value(observed)}"
+        yield f"{name}_count{_format_labels(self.labels)} {total}"
+
+class MetricsRegistry:
+    """
+    Collection of named metrics, rendered in the Prometheus text format.
+
+    Metrics are created on first use and returned again on later calls with the
+    same name and labels, so modules can look up their series at import time and
+    keep the hot path to a single `inc` or `observe`.
+
+    Example:
+        registry = MetricsRegistry()
+        fetch_seconds = registry.histogram("fetch_seconds", "Time spent fetching.", stage="fetch")
+        with fetch_seconds.time():
+            ...
+        print(registry.render())
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        """
+        Returns the series of a family for a label set, creating it if needed.
+
+        Raises:
+            ValueError: If `name` is already registered with another metric type.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = {"kind": cls.kind, "help": help, "series": {}}
+            elif family["kind"] != cls.kind:
+                raise ValueError(f"Metric {name!r} is already registered as a {family['kind']}")
+            series = family["series"].get(key)
+            if series is None:
+                series = family["series"][key] = cls(key, **kwargs)
+            return series
+
+    def counter(self, name, help, function=None, **labels):
+        """
+        Returns the counter `name` for the given labels.
+
+        Args:
+            name (str): The metric name, conventionally ending in `_total`.
+            help (str): The description rendered as `# HELP`.
+            function (callable, optional): Reports the count instead of `inc`.
+                                           Replaces the function of an existing series.
+            **labels: The label values of the series.
+
+        Returns:
+            Counter: The series.
+        """
+        counter = self._get(Counter, name, help, labels)
+        if function is not None:
+            counter.function = function
+        return counter
+
+    def gauge(self, name, help, function=None, **labels):
+        """
+        Returns the gauge `name` for the given labels.
+
+        Args:
+            name (str): The metric name.
+            help (str): The description rendered as `# HELP`.
+            function (callable, optional): Sampled at render time instead of `set`.
+                                           Replaces the function of an existing series.
+            **labels: The label values of the series.
+
+        Returns:
+            Gauge: The series.
+        """
+        gauge = self._get(Gauge, name, help, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS, **labels):
+        """
+        Returns the histogram `name` for the given labels.
+
+        Args:
+            name (str): The metric name, conventionally ending in the unit (`_seconds`).
+            help (str): The description rendered as `# HELP`.
+            buckets (tuple): The bucket upper bounds of a new series.
+            **labels: The label values of the series.
+
+        Returns:
+            Histogram: The series.
+        """
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, one sample per line.
+        """
+        with self._lock:
+            families = [(name, dict(family, series=list(family["series"].values())))
+                        for name, family in self._families.items()]
+        lines = []
+        for name, family in families:
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for series in family["series"]:
+                lines.extend(series.samples(name))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Dumps the rendered metrics to a file, for node_exporter's textfile
+        collector or any scraper reading files.
+
+        The file is replaced atomically, so readers never see a partial dump.
+
+        Args:
+            path (str): The file to write.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as dump:
+            dump.write(self.render())
+        os.replace(temporary, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serves the rendered metrics over HTTP from a background thread.
+
+        Every GET request (conventionally `/metrics`) is answered with `render()`.
+
+        Args:
+            port (int): The port to listen on; 0 picks a free port.
+            host (str): The interface to listen on. Defaults to localhost.
+
+        Returns:
+            ThreadingHTTPServer: The running server; call `shutdown()` and
+                                 `server_close()` to stop it.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        return server
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of the latency histograms.
+
+        Returns:
+            str: The p50 and p99 of every histogram series that observed a value.
+        """
+        with self._lock:
+            series = [(name, item) for name, family in self._families.items() if family["kind"] == "histogram"
+                      for item in family["series"].values()]
+        parts = [
+            f"{','.join(str(value) for _, value in item.labels) or name} "
+            f"p50 {item.quantile(0.5) * 1000:.1f} ms p99 {item.quantile(0.99) * 1000:.1f} ms"
+            for name, item in series if item.count
+        ]
+        return ", ".join(parts) or "no observations"
+
+class MetricsExporter:
+    """
+    Exposes a registry while a subscription runs, over HTTP and/or as a file dump.
+
+    Attributes:
+        registry (MetricsRegistry): The metrics to expose.
+        port (int): The HTTP port, or None to disable the endpoint.
+        path (str): The dump file, or None to disable dumping.
+        interval (float): The period between dumps, in seconds.
+    """
+
+    def __init__(self, registry, port=None, path=None, interval=5.0):
+        self.registry = registry
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.server = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the HTTP endpoint and the dump thread, whichever are enabled.
+        """
+        if self.port is not None:
+            self.server = self.registry.serve(self.port)
+        if self.path:
+            self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        """
+        Dumps the metrics every `interval` seconds until stopped.
+        """
+        while not self._stop.wait(self.interval):
+            self.registry.write(self.path)
+
+    def close(self):
+        """
+        Stops the endpoint and the dump thread, writing a final dump.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.path:
+            self.registry.write(self.path)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Process-wide registry shared by the fetch functions and the subscription loops
+metrics = MetricsRegistry()
+
+def stage_histogram(stage):
+    """
+    Returns the latency histogram of one stage of a subscription tick.
+
+    Args:
+        stage (str): The stage, e.g. "fetch", "parse", "render" or "store_market_data".
+
+    Returns:
+        Histogram: The `market_data_stage_seconds` series of the stage.
+    """
+    return metrics.histogram("market_data_stage_seconds", "Time spent in each stage of a subscription tick.", stage=stage)
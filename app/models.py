@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float
+from sqlalchemy import Column, Integer, String, Boolean, Float, Index
 from .database import Base
 
 class MarketData(Base):
@@ -20,11 +20,19 @@ class MarketData(Base):
         last (float): Last traded price.
         volume (float): Trading volume.
         date (int): Date of the market data (in nanoseconds since epoch).
+
+    A unique index on (symbol, date) guarantees at most one snapshot per symbol
+    and exchange timestamp and serves per-symbol time range queries; a second
+    index on date serves time range queries across all symbols.
     """
     __tablename__ = "market_data"
+    __table_args__ = (
+        Index("ix_market_data_symbol_date", "symbol", "date", unique=True),
+        Index("ix_market_data_date", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True)
+    symbol = Column(String)
     buy = Column(Float)
     sell = Column(Float)
     high = Column(Float)
@@ -77,3 +85,40 @@ class Symbol(Base):
     deposit_minimum = Column(Float)
     withdraw_minimum = Column(Float)
     withdrawal_fee = Column(Float)
+
+class Candle(Base):
+    """
+    SQLAlchemy model for storing OHLCV candles aggregated from market data.
+
+    Candles are built from the ticker snapshots of a symbol over a fixed
+    interval. Only closed candles are stored, at most one per symbol, interval
+    and start time.
+
+    Attributes:
+        id (int): Primary key of the table.
+        symbol (str): Trading pair symbol (e.g., BTC-BRL).
+        interval (str): Candle interval (e.g., 1m, 5m, 1h).
+        start (int): Start of the interval, in the same unit as `MarketData.date`.
+        open (float): First traded price of the interval.
+        high (float): Highest traded price of the interval.
+        low (float): Lowest traded price of the interval.
+        close (float): Last traded price of the interval.
+        volume (float): Volume traded during the interval, estimated from the
+                        increases of the exchange's rolling volume.
+        ticks (int): Number of snapshots aggregated into the candle.
+    """
+    __tablename__ = "candles"
+    __table_args__ = (
+        Index("ix_candles_symbol_interval_start", "symbol", "interval", "start", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    interval = Column(String, nullable=False)
+    start = Column(Integer, nullable=False)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    ticks = Column(Integer)
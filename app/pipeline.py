@@ -0,0 +1,251 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+
+# Marker queued by `WriteBehindQueue.close` to wake the writer for its final flush
+_CLOSE = object()
+
+def _to_json(item):
+    """
+    Serializes spilled items that JSON does not support natively, such as ticks,
+    through their `as_payload` method. The writer reads them back as dicts.
+    """
+    if hasattr(item, "as_payload"):
+        return item.as_payload()
+    raise TypeError(f"Object of type {type(item).__name__} is not JSON serializable")
+
+class WriteBehindQueue:
+    """
+    Bounded write-behind queue that decouples fetching from persistence.
+
+    Producers (the polling loops) `put` parsed tickers and return immediately;
+    a dedicated writer thread drains the queue in batches and hands each batch
+    to `writer`, which commits it once. A batch is written as soon as it holds
+    `batch_size` items or `flush_interval` seconds after its first item
+    arrived, whichever comes first.
+
+    When the queue is full, `backpressure` decides what happens to new items:
+
+    - ``"block"`` waits for the writer to free up space.
+    - ``"drop-oldest"`` discards the oldest queued item to make room.
+    - ``"spill"`` appends the new items to a JSON-lines file at `spill_path`;
+      the writer ingests the spill file whenever the queue runs dry and on close.
+      Spilled ticks are read back as /tickers dicts, which `store_market_data`
+      accepts as well. A batch whose write fails is spilled (again) rather
+      than lost, and retried by the next drain, so the spill file survives a
+      database outage and is picked up by the next run if the outage outlasts
+      this one.
+
+    In the other modes, a batch whose write fails is reported and discarded.
+
+    Attributes:
+        batch_size (int): The maximum number of items per write.
+        flush_interval (float): The maximum age of a pending batch, in seconds.
+        backpressure (str): One of "block", "drop-oldest" or "spill".
+        spill_path (str): The file that receives items in "spill" mode.
+        written (int): The number of items `writer` wrote successfully.
+        batches (int): The number of batches `writer` wrote successfully.
+        failed (int): The number of items whose write raised an error.
+        dropped (int): The number of items discarded in "drop-oldest" mode.
+        spilled (int): The number of items written to the spill file.
+
+    Example:
+        write_queue = WriteBehindQueue(store_market_data, batch_size=500)
+        write_queue.start()
+        write_queue.put(fetch_market_data(["BTC-BRL"]))
+        write_queue.close()  # Flushes everything still queued
+    """
+
+    BACKPRESSURE_MODES = ("block", "drop-oldest", "spill")
+
+    def __init__(self, writer, max_size=10000, batch_size=500, flush_interval=1.0,
+                 backpressure="block", spill_path="market_data.spill.jsonl"):
+        if backpressure not in self.BACKPRESSURE_MODES:
+            raise ValueError(f"backpressure must be one of {', '.join(self.BACKPRESSURE_MODES)}")
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.spill_path = spill_path
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._queue = queue.Queue(maxsize=max_size)
+        self._spill_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the writer thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def qsize(self):
+        """
+        Returns the approximate number of items waiting to be written.
+        """
+        return self._queue.qsize()
+
+    def put(self, items):
+        """
+        Queues items for writing, applying the configured backpressure when full.
+
+        Args:
+            items (list): The items to write, e.g. the tickers of one poll.
+        """
+        for index, item in enumerate(items):
+            if self.backpressure == "block":
+                self._queue.put(item)
+                continue
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if self.backpressure == "spill":
+                    self._spill(items[index:])
+                    return
+                self._put_dropping_oldest(item)
+
+    def _put_dropping_oldest(self, item):
+        """
+        Discards queued items, oldest first, until `item` fits.
+        """
+        while True:
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                continue
+
+    def _spill(self, items):
+        """
+        Appends items to the spill file, one JSON document per line.
+        """
+        with self._spill_lock:
+            with open(self.spill_path, "a") as spill_file:
+                for item in items:
+                    spill_file.write(json.dumps(item, default=_to_json) + "\n")
+        self.spilled += len(items)
+
+    def _drain_spill(self):
+        """
+        Writes back every item in the spill file, in batches, then removes the file.
+
+        Draining stops at the first batch that fails: its lines and every line
+        after it are appended back to the spill file for the next drain, so only
+        items that were written are removed.
+        """
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            draining_path = f"{self.spill_path}.draining"
+            os.replace(self.spill_path, draining_path)
+        with open(draining_path) as spill_file:
+            while True:
+                lines = list(itertools.islice(spill_file, self.batch_size))
+                if not lines:
+                    break
+                if not self._write([json.loads(line) for line in lines]):
+                    with self._spill_lock:
+                        with open(self.spill_path, "a") as respill_file:
+                            respill_file.writelines(lines)
+                            respill_file.writelines(spill_file)
+                    break
+        os.remove(draining_path)
+
+    def _write(self, batch):
+        """
+        Hands one batch to the writer, reporting rather than propagating failures.
+
+        Returns:
+            bool: Whether the batch was written.
+        """
+        try:
+            self.writer(batch)
+        except Exception as e:
+            print(f"Error writing batch of {len(batch)} items: {e}")
+            self.failed += len(batch)
+            return False
+        self.written += len(batch)
+        self.batches += 1
+        return True
+
+    def _next_batch(self):
+        """
+        Collects the next batch, waiting at most `flush_interval` after its first item.
+
+        Returns:
+            tuple: The batch (empty if nothing arrived within `flush_interval`) and
+                   whether the queue was closed after it.
+        """
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], False
+        if item is _CLOSE:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _CLOSE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        """
+        Writer thread body: drains batches until the queue is closed.
+        """
+        closed = False
+        while not closed:
+            batch, closed = self._next_batch()
+            if batch:
+                if not self._write(batch) and self.backpressure == "spill":
+                    self._spill(batch)
+            elif self.backpressure == "spill":
+                self._drain_spill()
+        if self.backpressure == "spill":
+            self._drain_spill()
+
+    def close(self, timeout=None):
+        """
+        Flushes every queued (and spilled) item and stops the writer thread.
+
+        Args:
+            timeout (float, optional): The maximum time to wait for the flush, in seconds.
+        """
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        """
+        Returns the queue's counters.
+
+        Returns:
+            dict: The queue depth plus written, batch, failed, dropped and spilled counts.
+        """
+        return {
+            "queued": self.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spilled": self.spilled
+        }
@@ -0,0 +1,182 @@
+from collections import namedtuple
+from sqlalchemy import select, and_, or_
+from app.database import SessionLocal
+from app.models import MarketData
+
+# Columns returned by the market data queries, in display order
+MARKET_DATA_COLUMNS = (
+    MarketData.id,
+    MarketData.symbol,
+    MarketData.buy,
+    MarketData.sell,
+    MarketData.high,
+    MarketData.low,
+    MarketData.open,
+    MarketData.last,
+    MarketData.volume,
+    MarketData.date
+)
+
+# One page of market data rows and the cursor to pass back for the next page
+# (None once the range is exhausted).
+MarketDataPage = namedtuple("MarketDataPage", ["rows", "next_cursor"])
+
+def _range_conditions(symbol=None, start=None, end=None):
+    """
+    Builds the WHERE conditions shared by the market data range queries.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+
+    Returns:
+        list: The SQL conditions to combine with AND.
+    """
+    conditions = []
+    if symbol is not None:
+        conditions.append(MarketData.symbol == symbol)
+    if start is not None:
+        conditions.append(MarketData.date >= start)
+    if end is not None:
+        conditions.append(MarketData.date < end)
+    return conditions
+
+def market_data_range_query(symbol=None, start=None, end=None, cursor=None, limit=500, descending=False):
+    """
+    Builds the SELECT for one page of a market data range.
+
+    Pages are ordered by (date, id) and continue after `cursor` (keyset
+    pagination), so every page is an index range scan of
+    `ix_market_data_symbol_date` (with a symbol) or `ix_market_data_date`
+    (without), no matter how deep into the range it is.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        cursor (tuple, optional): The (date, id) of the last row of the previous page.
+        limit (int): The maximum number of rows per page, or None for no limit.
+        descending (bool): Whether to walk the range from the newest row backwards.
+
+    Returns:
+        sqlalchemy.sql.Select: The query for the page.
+    """
+    conditions = _range_conditions(symbol, start, end)
+    if cursor is not None:
+        cursor_date, cursor_id = cursor
+        if descending:
+            conditions.append(or_(
+                MarketData.date < cursor_date,
+                and_(MarketData.date == cursor_date, MarketData.id < cursor_id)
+            ))
+        else:
+            conditions.append(or_(
+                MarketData.date > cursor_date,
+                and_(MarketData.date == cursor_date, MarketData.id > cursor_id)
+            ))
+
+    if descending:
+        order = (MarketData.date.desc(), MarketData.id.desc())
+    else:
+        order = (MarketData.date, MarketData.id)
+
+    return select(*MARKET_DATA_COLUMNS).where(*conditions).order_by(*order).limit(limit)
+
+def query_market_data(symbol=None, start=None, end=None, cursor=None, limit=500, descending=False):
+    """
+    Fetches one page of market data for a symbol and time range.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        cursor (tuple, optional): The `next_cursor` of the previous page.
+        limit (int): The maximum number of rows per page.
+        descending (bool): Whether to walk the range from the newest row backwards.
+
+    Returns:
+        MarketDataPage: The rows, as plain tuples in `MARKET_DATA_COLUMNS` order, and
+                        the cursor of the next page.
+
+    Example:
+        page = query_market_data("BTC-BRL", limit=100, descending=True)
+        older = query_market_data("BTC-BRL", cursor=page.next_cursor, limit=100, descending=True)
+    """
+    query = market_data_range_query(symbol, start, end, cursor, limit, descending)
+    with SessionLocal() as db:
+        rows = [tuple(row) for row in db.execute(query)]
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = (last[-1], last[0])
+    return MarketDataPage(rows, next_cursor)
+
+def iter_market_data(symbol=None, start=None, end=None, page_size=500, descending=False):
+    """
+    Iterates over a whole market data range, one keyset page at a time.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        page_size (int): The number of rows fetched per query.
+        descending (bool): Whether to walk the range from the newest row backwards.
+
+    Yields:
+        tuple: One row per market data entry, in `MARKET_DATA_COLUMNS` order.
+    """
+    cursor = None
+    while True:
+        page = query_market_data(symbol, start, end, cursor, page_size, descending)
+        yield from page.rows
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+def stream_market_data(symbol=None, start=None, end=None, limit=None, tail=False, page_size=1000):
+    """
+    Streams a market data range in pages of plain tuples with constant memory.
+
+    Rows are read through a single forward cursor with `yield_per`, so only one
+    page is held in memory at a time regardless of the size of the range. With
+    `tail=True`, the (date, id) of the row just before the last `limit` rows is
+    located first with an index-only descending scan, and the stream starts right
+    after it, so viewing the latest ticks never loads the older ones.
+
+    Args:
+        symbol (str, optional): Restrict the range to one symbol.
+        start (int, optional): The smallest date to include.
+        end (int, optional): The first date to exclude.
+        limit (int, optional): The maximum number of rows to return.
+        tail (bool): Whether `limit` selects the newest rows instead of the oldest.
+        page_size (int): The number of rows per yielded page.
+
+    Yields:
+        list of tuple: Pages of rows in `MARKET_DATA_COLUMNS` order, oldest first.
+                       Like every query of this module, only rows still in SQLite
+                       are read; see `archive.read_market_data_range` for archived ones.
+
+    Raises:
+        ValueError: If `tail` is requested without a `limit`.
+    """
+    if tail and limit is None:
+        raise ValueError("tail requires a limit")
+
+    with SessionLocal() as db:
+        cursor = None
+        if tail:
+            boundary = db.execute(
+                select(MarketData.date, MarketData.id)
+                .where(*_range_conditions(symbol, start, end))
+                .order_by(MarketData.date.desc(), MarketData.id.desc())
+                .offset(limit)
+                .limit(1)
+            ).first()
+            cursor = tuple(boundary) if boundary is not None else None
+
+        query = market_data_range_query(symbol, start, end, cursor, limit=limit)
+        result = db.execute(query.execution_options(stream_results=True))
+        for partition in result.yield_per(page_size).partitions():
+            yield [tuple(row) for row in partition]
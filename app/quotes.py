@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import threading
+
+def change(tick):
+    """
+    Returns a tick's relative change from its 24h opening price.
+
+    Args:
+        tick (Tick): The tick.
+
+    Returns:
+        float: `last / open - 1`, or 0.0 if the opening price is unknown.
+    """
+    return tick.last / tick.open - 1.0 if tick.open else 0.0
+
+# Scores of the rankings kept by a `QuoteBook`; a higher score ranks first
+RANKINGS = {
+    "movers": lambda tick: abs(change(tick)),
+    "gainers": change,
+    "losers": lambda tick: -change(tick),
+    "volume": lambda tick: tick.volume,
+}
+
+class QuoteBook:
+    """
+    In-memory book of the latest tick of every symbol.
+
+    The subscription feeds it every changed tick, so the current quote of a pair
+    is a dictionary lookup instead of a new /tickers request or a `market_data`
+    query ordered by date. A tick older than the symbol's quote is ignored.
+
+    Every ranking of `RANKINGS` is kept in a max-heap that is updated
+    incrementally: an update pushes the symbol's new score in O(log n) and leaves
+    its previous entry behind as stale. `top` pops entries until it has found `n`
+    current ones, discarding the stale ones it meets and pushing the current ones
+    back, so a top-N query costs O((n + stale) log size) rather than a sort of
+    the whole book. When stale entries outnumber current ones, the heap is rebuilt.
+
+    The book is safe to update from the subscription thread while the menu or
+    analytics read it from another.
+
+    Attributes:
+        updates (int): The number of ticks that replaced a symbol's quote.
+
+    Example:
+        book = QuoteBook()
+        book.update(parse_ticks(fetch_market_data(["BTC-BRL", "ETH-BRL"])))
+        print(book.get("BTC-BRL").last)
+        for tick in book.top("movers", 5):
+            print(tick.symbol, change(tick))
+    """
+
+    def __init__(self, rankings=tuple(RANKINGS)):
+        self.updates = 0
+        self._quotes = {}
+        self._versions = {}
+        self._counter = itertools.count()
+        self._heaps = {name: [] for name in rankings}
+        self._scores = {name: RANKINGS[name] for name in rankings}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._quotes)
+
+    def __contains__(self, symbol):
+        return symbol in self._quotes
+
+    def update(self, market_data):
+        """
+        Records the latest tick of every symbol in a poll.
+
+        Args:
+            market_data (list of Tick): The ticks, e.g. the changed ticks of a poll.
+
+        Returns:
+            int: The number of quotes replaced.
+        """
+        updated = 0
+        with self._lock:
+            for tick in market_data:
+                current = self._quotes.get(tick.symbol)
+                if current is not None and tick.date < current.date:
+                    continue
+                version = next(self._counter)
+                self._quotes[tick.symbol] = tick
+                self._versions[tick.symbol] = version
+                for name, heap in self._heaps.items():
+                    heapq.heappush(heap, (-self._scores[name](tick), version, tick.symbol))
+                updated += 1
+            for name, heap in self._heaps.items():
+                if len(heap) > 2 * len(self._quotes) + 64:
+                    self._rebuild(name)
+            self.updates += updated
+        return updated
+
+    def get(self, symbol):
+        """
+        Returns the latest tick of a symbol.
+
+        Args:
+            symbol (str): The trading pair symbol.
+
+        Returns:
+            Tick: The latest tick, or None if the symbol has not been seen.
+        """
+        return self._quotes.get(symbol)
+
+    def last_prices(self):
+        """
+        Returns the last traded price of every symbol.
+
+        Returns:
+            dict: The last price, keyed by symbol.
+        """
+        with self._lock:
+            return {symbol: tick.last for symbol, tick in self._quotes.items()}
+
+    def snapshot(self, sort=False):
+        """
+        Returns the latest tick of every symbol, e.g. to display the book.
+
+        Ticks are never modified once recorded, so the snapshot is a shallow copy
+        of the book taken under its lock, and stays consistent while it is updated.
+
+        Args:
+            sort (bool): Whether to order the ticks by symbol.
+
+        Returns:
+            list of Tick: The ticks.
+        """
+        with self._lock:
+            ticks = list(self._quotes.values())
+        if sort:
+            ticks.sort(key=lambda tick: tick.symbol)
+        return ticks
+
+    def top(self, ranking, n=10):
+        """
+        Returns the `n` highest-ranked quotes.
+
+        Args:
+            ranking (str): A ranking of the book: "movers" (largest absolute change
+                           from the open), "gainers", "losers" or "volume".
+            n (int): The number of quotes to return.
+
+        Returns:
+            list of Tick: The ticks, highest score first.
+
+        Raises:
+            KeyError: If the book does not keep the ranking.
+        """
+        with self._lock:
+            heap = self._heaps[ranking]
+            entries = []
+            while heap and len(entries) < n:
+                entry = heapq.heappop(heap)
+                if self._versions.get(entry[2]) == entry[1]:
+                    entries.append(entry)
+            for entry in entries:
+                heapq.heappush(heap, entry)
+            return [self._quotes[symbol] for _, _, symbol in entries]
+
+    def top_movers(self, n=10):
+        """
+        Returns the `n` quotes that moved the most from their 24h open, either way.
+        """
+        return self.top("movers", n)
+
+    def top_volume(self, n=10):
+        """
+        Returns the `n` quotes with the highest 24h volume.
+        """
+        return self.top("volume", n)
+
+    def clear(self):
+        """
+        Removes every quote.
+        """
+        with self._lock:
+            self._quotes.clear()
+            self._versions.clear()
+            for heap in self._heaps.values():
+                heap.clear()
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of the book.
+
+        Returns:
+            str: The summary line.
+        """
+        return f"{len(self._quotes)} symbols quoted, {self.updates} updates"
+
+    def _rebuild(self, ranking):
+        """
+        Rebuilds a ranking's heap from the current quotes, dropping stale entries.
+        """
+        score = self._scores[ranking]
+        heap = [(-score(tick), self._versions[symbol], symbol) for symbol, tick in self._quotes.items()]
+        heapq.heapify(heap)
+        self._heaps[ranking] = heap
+
+# Book of the latest quotes, fed by the subscriptions of this process
+quote_book = QuoteBook()
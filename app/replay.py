@@ -0,0 +1,238 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from app.fetch_data import API_URL, chunk_symbols, session
+
+# Recorded API responses: the /symbols payload and its response headers, and the
+# /tickers payload (one ticker per recorded symbol).
+Recordings = namedtuple("Recordings", ["symbols", "symbols_headers", "tickers"])
+
+# Default directory of the recorded fixtures
+RECORDINGS_DIR = os.path.join("tests", "recordings")
+
+# Response headers kept in recordings, for conditional requests
+RECORDED_HEADERS = ("ETag", "Last-Modified", "Content-Type")
+
+# /tickers item used by `synthetic_recordings`
+SAMPLE_TICKER = {
+    "pair": "BTC-BRL", "buy": "350000.10", "sell": "350120.90", "high": "356000.00", "low": "348000.00",
+    "open": "351000.00", "last": "350100.50", "vol": "12.34567890", "date": 1720182706
+}
+
+def record(directory=RECORDINGS_DIR, symbols=None):
+    """
+    Captures live /symbols and /tickers responses into fixture files.
+
+    Writes `symbols.json` and `tickers.json` to `directory`, each holding the
+    request URL, status, selected headers and the decoded body.
+
+    Args:
+        directory (str): The directory to write the fixtures to.
+        symbols (list, optional): The symbols whose tickers to record. Defaults to
+                                  every symbol listed by /symbols.
+
+    Returns:
+        Recordings: The recorded responses.
+
+    Raises:
+        requests.RequestException: If a request fails.
+    """
+    os.makedirs(directory, exist_ok=True)
+    response = session.get(f"{API_URL}symbols", verify=False)
+    response.raise_for_status()
+    symbols_payload = response.json()
+    headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+    _write_fixture(os.path.join(directory, "symbols.json"), response.url, response.status_code, headers, symbols_payload)
+
+    tickers = []
+    for chunk in chunk_symbols(symbols or symbols_payload['symbol']):
+        response = session.get(f"{API_URL}tickers", params={"symbols": ",".join(chunk)}, verify=False)
+        response.raise_for_status()
+        tickers.extend(response.json())
+    _write_fixture(os.path.join(directory, "tickers.json"), f"{API_URL}tickers", 200, {}, tickers)
+
+    print(f"Recorded {len(symbols_payload['symbol'])} symbols and {len(tickers)} tickers to {directory}.")
+    return Recordings(symbols_payload, headers, tickers)
+
+def _write_fixture(path, url, status, headers, body):
+    """
+    Writes one recorded response to a fixture file.
+    """
+    with open(path, "w", encoding="utf-8") as fixture:
+        json.dump({"url": url, "status": status, "headers": headers, "body": body}, fixture, indent=1)
+
+def load_recordings(directory=RECORDINGS_DIR):
+    """
+    Loads the fixtures written by `record`.
+
+    Args:
+        directory (str): The directory holding the fixtures.
+
+    Returns:
+        Recordings: The recorded responses, or None if the directory has no recordings.
+    """
+    symbols_path = os.path.join(directory, "symbols.json")
+    tickers_path = os.path.join(directory, "tickers.json")
+    if not (os.path.exists(symbols_path) and os.path.exists(tickers_path)):
+        return None
+    with open(symbols_path, encoding="utf-8") as fixture:
+        symbols = json.load(fixture)
+    with open(tickers_path, encoding="utf-8") as fixture:
+        tickers = json.load(fixture)
+    return Recordings(symbols["body"], symbols.get("headers", {}), tickers["body"])
+
+def synthetic_recordings(symbols):
+    """
+    Builds recordings for arbitrary symbols, for benchmarks run before any
+    recording was captured.
+
+    Every symbol gets a copy of `SAMPLE_TICKER`. The /symbols payload only has
+    its `symbol` column, so it is not suitable for `store_symbols`.
+
+    Args:
+        symbols (list): The symbols to record.
+
+    Returns:
+        Recordings: The synthetic responses.
+    """
+    return Recordings({"symbol": list(symbols)}, {}, [dict(SAMPLE_TICKER, pair=symbol) for symbol in symbols])
+
+class ReplayAdapter(BaseAdapter):
+    """
+    `requests` transport adapter that serves recorded API responses offline.
+
+    Mounted on the API URL of a session, the adapter answers /symbols with the
+    recorded payload and /tickers with the recorded ticker of every requested
+    symbol. Symbols missing from the recording get a copy of a recorded ticker
+    under their own name, so any watchlist size can be replayed. Conditional
+    /symbols requests matching the recorded ETag are answered with 304.
+
+    Attributes:
+        recordings (Recordings): The responses to serve.
+        latency (float): The delay added to every response, in seconds.
+        error_rate (float): The probability that a request fails with 503.
+        requests (int): The number of requests served.
+        errors (int): The number of injected 503 responses.
+
+    Example:
+        adapter = ReplayAdapter(load_recordings(), latency=0.05, error_rate=0.01)
+        with replay(adapter):
+            fetch_market_data(["BTC-BRL"])
+    """
+
+    def __init__(self, recordings, latency=0.0, error_rate=0.0, seed=None):
+        super().__init__()
+        self.recordings = recordings
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._symbols_body = json.dumps(recordings.symbols).encode()
+        self._recorded_tickers = {item['pair']: item for item in recordings.tickers}
+        # Encoded tickers are cached so serving a response costs a join, not a dump
+        self._ticker_bodies = {}
+
+    def _ticker_body(self, symbol, index):
+        """
+        Returns the encoded ticker of a symbol, cloning a recorded one if needed.
+        """
+        body = self._ticker_bodies.get(symbol)
+        if body is None:
+            item = self._recorded_tickers.get(symbol)
+            if item is None:
+                item = dict(self.recordings.tickers[index % len(self.recordings.tickers)], pair=symbol)
+            body = self._ticker_bodies[symbol] = json.dumps(item)
+        return body
+
+    def send(self, request, **kwargs):
+        """
+        Serves one request from the recordings.
+        """
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(request.url)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return self._response(request, 503, b'{"error": "replayed failure"}')
+        if endpoint == "symbols":
+            etag = self.recordings.symbols_headers.get("ETag")
+            if etag and request.headers.get("If-None-Match") == etag:
+                return self._response(request, 304, b"", self.recordings.symbols_headers)
+            return self._response(request, 200, self._symbols_body, self.recordings.symbols_headers)
+        if endpoint == "tickers":
+            symbols = parse_qs(url.query).get("symbols", [""])[0].split(",")
+            bodies = [self._ticker_body(symbol, index) for index, symbol in enumerate(symbols) if symbol]
+            return self._response(request, 200, ("[" + ",".join(bodies) + "]").encode())
+        return self._response(request, 404, b'{"error": "not recorded"}')
+
+    def _response(self, request, status, body, headers=None):
+        """
+        Builds a `requests.Response` for a replayed answer.
+        """
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response._content = body
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json", **(headers or {})})
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+@contextlib.contextmanager
+def replay(adapter, target=session, prefix=API_URL):
+    """
+    Routes a session's API requests to a replay adapter for the duration of the block.
+
+    Args:
+        adapter (ReplayAdapter): The adapter serving the recordings.
+        target (requests.Session): The session to patch. Defaults to `fetch_data.session`.
+        prefix (str): The URL prefix to route. Defaults to the API URL.
+
+    Yields:
+        ReplayAdapter: The mounted adapter.
+    """
+    previous = target.adapters.copy()
+    target.mount(prefix, adapter)
+    try:
+        yield adapter
+    finally:
+        target.adapters = previous
+
+def main(argv=None):
+    """
+    Command-line entry point: `python -m app.replay record [directory] [--symbols ...]`.
+
+    Args:
+        argv (list, optional): The arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.replay", description="Record live API responses for offline replay.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+    record_command = commands.add_parser("record", help="capture /symbols and /tickers fixtures")
+    record_command.add_argument("directory", nargs="?", default=RECORDINGS_DIR, help="where to write the fixtures")
+    record_command.add_argument("--symbols", help="comma-separated symbols to record tickers for (default: all)")
+    args = parser.parse_args(argv)
+    record(args.directory, args.symbols.split(",") if args.symbols else None)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
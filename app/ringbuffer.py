@@ -0,0 +1,345 @@
+import mmap
+import os
+import numpy as np
+
+# Identifies ring buffer files and their layout version
+MAGIC = b"MDRING01"
+
+# Fixed-size header at the start of the file. `head` is the number of records
+# ever appended; the record for sequence number `seq` lives in slot
+# `seq % capacity`.
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('capacity', np.int64),
+    ('max_symbols', np.int64),
+    ('symbol_count', np.int64),
+    ('head', np.int64),
+    ('reserved', np.int64, (3,)),
+])
+
+# Width of a symbol name in the symbol table
+SYMBOL_DTYPE = np.dtype('S16')
+
+# One fixed-width record per tick. `seq` is written last, after the fields,
+# and set to -1 while the slot is being rewritten.
+RECORD_DTYPE = np.dtype([
+    ('seq', np.int64),
+    ('symbol_id', np.int64),
+    ('buy', np.float64),
+    ('sell', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('open', np.float64),
+    ('last', np.float64),
+    ('volume', np.float64),
+    ('date', np.int64),
+])
+
+def _file_size(capacity, max_symbols):
+    """
+    Returns the size in bytes of a ring buffer file.
+    """
+    return HEADER_DTYPE.itemsize + max_symbols * SYMBOL_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize
+
+class TickRingBuffer:
+    """
+    Fixed-size, memory-mapped ring buffer of the latest ticks.
+
+    The file holds a header, a table of symbol names and `capacity` fixed-width
+    records. A single writer (the subscription) appends ticks, overwriting the
+    oldest ones once the buffer is full; any number of readers, in this process
+    or others, map the same file read-only and see the records through NumPy
+    views without copying or locking: `window` returns the records held as a
+    read-only view of the mapping.
+
+    The ticks of one symbol are scattered across slots, so `latest` gathers them
+    into a copy, which is what makes its consistency check possible: a view of
+    the mapping could still be overwritten by the writer after it was checked.
+
+    Consistency is kept with sequence numbers instead of locks. The writer marks
+    a slot with seq -1, writes the fields, stores the slot's sequence number and
+    only then advances `head`. A reader copies the records it selected and keeps
+    those whose seq still matches the expected sequence number, so a slot
+    overwritten mid-read is detected and retried rather than returned torn.
+
+    Attributes:
+        path (str): The file backing the buffer.
+        capacity (int): The number of records kept.
+        header (numpy.ndarray): A view of the header record.
+        symbol_names (numpy.ndarray): A view of the symbol table.
+        records (numpy.ndarray): A view of the records, with `RECORD_DTYPE` fields.
+
+    Example:
+        with TickRingBuffer.create("market_data.ring") as ring:
+            ring.append("BTC-BRL", 31000.0, 31010.0, 31500.0, 30500.0, 30800.0, 31005.0, 12.5, 1720182706)
+
+        with TickRingBuffer.open("market_data.ring") as ring:
+            ring.latest("BTC-BRL", 10)['last']
+    """
+
+    def __init__(self, path, file, buffer, writable):
+        self.path = path
+        self._file = file
+        self._mmap = buffer
+        self.writable = writable
+
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buffer)
+        if bytes(self.header['magic']) != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a tick ring buffer")
+        self.capacity = int(self.header['capacity'])
+        max_symbols = int(self.header['max_symbols'])
+        self.symbol_names = np.ndarray(
+            (max_symbols,), dtype=SYMBOL_DTYPE, buffer=buffer, offset=HEADER_DTYPE.itemsize
+        )
+        self.records = np.ndarray(
+            (self.capacity,), dtype=RECORD_DTYPE, buffer=buffer,
+            offset=HEADER_DTYPE.itemsize + max_symbols * SYMBOL_DTYPE.itemsize
+        )
+        self._symbol_ids = {}
+
+    @classmethod
+    def create(cls, path, capacity=65536, max_symbols=1024):
+        """
+        Creates, or reinitializes, a ring buffer file and opens it for writing.
+
+        Args:
+            path (str): The file backing the buffer.
+            capacity (int): The number of records kept.
+            max_symbols (int): The number of distinct symbols the buffer can hold.
+
+        Returns:
+            TickRingBuffer: The buffer, opened for writing.
+        """
+        file = open(path, "w+b")
+        file.truncate(_file_size(capacity, max_symbols))
+        buffer = mmap.mmap(file.fileno(), 0)
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buffer)
+        header['capacity'] = capacity
+        header['max_symbols'] = max_symbols
+        header['magic'] = MAGIC
+        return cls(path, file, buffer, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False):
+        """
+        Opens an existing ring buffer file.
+
+        Args:
+            path (str): The file backing the buffer.
+            writable (bool): Whether to open it for appending. Readers should leave
+                             this False so their views are read-only.
+
+        Returns:
+            TickRingBuffer: The opened buffer.
+        """
+        file = open(path, "r+b" if writable else "rb")
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        return cls(path, file, mmap.mmap(file.fileno(), 0, access=access), writable)
+
+    @classmethod
+    def open_or_create(cls, path, capacity=65536, max_symbols=1024):
+        """
+        Opens a ring buffer for writing, creating it if it does not exist or has a
+        different capacity, so a restarted writer keeps the ticks already published.
+
+        Returns:
+            TickRingBuffer: The buffer, opened for writing.
+        """
+        if os.path.exists(path) and os.path.getsize(path) == _file_size(capacity, max_symbols):
+            try:
+                return cls.open(path, writable=True)
+            except ValueError:
+                pass
+        return cls.create(path, capacity, max_symbols)
+
+    def close(self):
+        """
+        Releases the mapping and the file. Views taken from the buffer must not be
+        used afterwards.
+        """
+        self.header = self.symbol_names = self.records = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def head(self):
+        """
+        Returns the number of records appended since the buffer was created.
+        """
+        return int(self.header['head'])
+
+    def symbols(self):
+        """
+        Returns the symbols published in the buffer, in order of their ids.
+
+        Returns:
+            list of str: The symbol names.
+        """
+        count = int(self.header['symbol_count'])
+        return [name.decode() for name in self.symbol_names[:count]]
+
+    def symbol_id(self, symbol):
+        """
+        Returns the id of a symbol, or None if it has never been published.
+        """
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            # Symbols are only ever added, so a miss means the cache is stale
+            self._symbol_ids = {name: index for index, name in enumerate(self.symbols())}
+            symbol_id = self._symbol_ids.get(symbol)
+        return symbol_id
+
+    def _register_symbol(self, symbol):
+        """
+        Adds a symbol to the symbol table and returns its id.
+
+        Raises:
+            ValueError: If the symbol table is full or the name is too long.
+        """
+        name = symbol.encode()
+        if len(name) > SYMBOL_DTYPE.itemsize:
+            raise ValueError(f"Symbol {symbol!r} is longer than {SYMBOL_DTYPE.itemsize} bytes")
+        count = int(self.header['symbol_count'])
+        if count == len(self.symbol_names):
+            raise ValueError("The ring buffer's symbol table is full")
+        # The name is written before the count is published
+        self.symbol_names[count] = name
+        self.header['symbol_count'] = count + 1
+        self._symbol_ids[symbol] = count
+        return count
+
+    def append(self, symbol, buy, sell, high, low, open, last, volume, date):
+        """
+        Appends one tick, overwriting the oldest record once the buffer is full.
+
+        Args:
+            symbol (str): The trading pair symbol.
+            buy, sell, high, low, open, last, volume (float): The ticker fields.
+            date (int): The tick's date, in seconds since epoch.
+
+        Returns:
+            int: The sequence number of the record.
+        """
+        symbol_id = self.symbol_id(symbol)
+        if symbol_id is None:
+            symbol_id = self._register_symbol(symbol)
+
+        seq = int(self.header['head'])
+        record = self.records[seq % self.capacity]
+        record['seq'] = -1
+        record['symbol_id'] = symbol_id
+        record['buy'] = buy
+        record['sell'] = sell
+        record['high'] = high
+        record['low'] = low
+        record['open'] = open
+        record['last'] = last
+        record['volume'] = volume
+        record['date'] = date
+        record['seq'] = seq
+        self.header['head'] = seq + 1
+        return seq
+
+    def extend(self, market_data):
+        """
+        Appends a batch of ticks.
+
+        Args:
+            market_data (list of Tick): The ticks to publish.
+
+        Returns:
+            int: The number of records appended.
+        """
+        for tick in market_data:
+            self.append(
+                tick.symbol, tick.buy, tick.sell, tick.high, tick.low,
+                tick.open, tick.last, tick.volume, tick.date
+            )
+        return len(market_data)
+
+    def window(self):
+        """
+        Returns the records currently held, oldest first, and their sequence numbers.
+
+        The records are a read-only, zero-copy view of the mapping when they do
+        not wrap around the end of the buffer, and a copy when they do. A view
+        may be overwritten by the writer at any time; compare each record's
+        `seq` with its expected sequence number, or use `latest` for a
+        consistent copy.
+
+        Returns:
+            tuple: The records (numpy.ndarray) and the sequence number of the first one.
+        """
+        head = self.head()
+        first = max(0, head - self.capacity)
+        start, end = first % self.capacity, head % self.capacity
+        if head - first < self.capacity or start == 0:
+            view = self.records[start:start + head - first]
+            view.flags.writeable = False
+            return view, first
+        return np.concatenate((self.records[start:], self.records[:end])), first
+
+    def latest(self, symbol=None, n=1, retries=10):
+        """
+        Returns a consistent copy of the latest `n` ticks, optionally for one symbol.
+
+        Unlike `window`, this always copies: the selected records are gathered
+        from their slots, then kept only if their sequence numbers show that the
+        writer did not touch them during the copy.
+
+        Args:
+            symbol (str, optional): Restrict the ticks to one symbol.
+            n (int): The maximum number of ticks to return.
+            retries (int): How many times to retry when the writer overwrote a
+                           selected record while it was being copied.
+
+        Returns:
+            numpy.ndarray: Up to `n` records with `RECORD_DTYPE` fields, oldest first.
+
+        Raises:
+            RuntimeError: If no consistent copy could be taken within `retries` attempts.
+        """
+        symbol_id = None
+        if symbol is not None:
+            symbol_id = self.symbol_id(symbol)
+            if symbol_id is None:
+                return np.empty(0, dtype=RECORD_DTYPE)
+
+        for _ in range(retries):
+            head = self.head()
+            seqs = np.arange(max(0, head - self.capacity), head, dtype=np.int64)
+            if symbol_id is not None:
+                seqs = seqs[self.records['symbol_id'][seqs % self.capacity] == symbol_id]
+            seqs = seqs[len(seqs) - min(n, len(seqs)):]
+            slots = seqs % self.capacity
+
+            copy = self.records[slots]
+            # A record is consistent if its slot held the expected sequence number
+            # both in the copy and after the copy was taken: the writer marks a slot
+            # with -1 before touching its fields
+            valid = (copy['seq'] == seqs) & (self.records['seq'][slots] == seqs)
+            if symbol_id is not None:
+                valid &= copy['symbol_id'] == symbol_id
+            if valid.all():
+                return copy
+        raise RuntimeError("The ring buffer was overwritten faster than it could be read")
+
+    def last_prices(self):
+        """
+        Returns the latest tick of every symbol in the buffer.
+
+        Returns:
+            dict: The latest record for each symbol name.
+        """
+        records = self.latest(n=self.capacity)
+        latest = {}
+        for record in records:
+            latest[int(record['symbol_id'])] = record
+        names = self.symbols()
+        return {names[symbol_id]: record for symbol_id, record in latest.items()}
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import namedtuple
+
+# Timing of a single scheduled tick: its sequence number, the grid point it was
+# scheduled for (monotonic seconds) and how late it actually started (seconds).
+ScheduledTick = namedtuple("ScheduledTick", ["index", "scheduled", "jitter"])
+
+class FixedRateScheduler:
+    """
+    Drift-free fixed-rate scheduler for polling loops.
+
+    Ticks are placed on a grid of the monotonic clock (`start + n * interval`)
+    instead of sleeping a fixed delay after each iteration, so request and
+    database latency do not stretch the period. When an iteration overruns one
+    or more grid points, the missed ticks are never queued up:
+
+    - ``"skip"`` drops every missed tick and waits for the next grid point.
+    - ``"coalesce"`` runs one catch-up tick immediately for all missed ticks,
+      then continues on the grid.
+
+    Attributes:
+        interval (float): The tick period in seconds; may be sub-second.
+        on_overrun (str): Either "skip" or "coalesce".
+        ticks (int): The number of ticks run so far.
+        overruns (int): The number of iterations that ran past the next grid point.
+        skipped (int): The number of grid points that were dropped.
+        last_jitter (float): The start delay of the latest tick, in seconds.
+        max_jitter (float): The largest start delay observed, in seconds.
+
+    Example:
+        scheduler = FixedRateScheduler(interval=0.5)
+        for tick in scheduler.run(stop_event):
+            poll()
+        print(scheduler.stats())
+    """
+
+    def __init__(self, interval=1.0, on_overrun="skip", clock=time.monotonic):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if on_overrun not in ("skip", "coalesce"):
+            raise ValueError("on_overrun must be 'skip' or 'coalesce'")
+        self.interval = interval
+        self.on_overrun = on_overrun
+        self.clock = clock
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self._total_jitter = 0.0
+        self._next = None
+
+    def _start_tick(self):
+        """
+        Records the timing of a tick that is starting now.
+
+        Returns:
+            ScheduledTick: The timing of the tick.
+        """
+        jitter = max(0.0, self.clock() - self._next)
+        tick = ScheduledTick(self.ticks, self._next, jitter)
+        self.ticks += 1
+        self.last_jitter = jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+        self._total_jitter += jitter
+        return tick
+
+    def _finish_tick(self):
+        """
+        Advances the grid after a tick, dropping or coalescing missed grid points.
+        """
+        self._next += self.interval
+        late = self.clock() - self._next
+        if late > 0:
+            missed = int(late // self.interval) + 1
+            self.overruns += 1
+            if self.on_overrun == "skip":
+                self.skipped += missed
+                self._next += missed * self.interval
+            else:
+                self.skipped += missed - 1
+                self._next += (missed - 1) * self.interval
+
+    def run(self, stop_event):
+        """
+        Yields once per tick until `stop_event` is set.
+
+        Waiting is done with `stop_event.wait`, so setting the event interrupts
+        the wait immediately.
+
+        Args:
+            stop_event (threading.Event): The event that signals when to stop.
+
+        Yields:
+            ScheduledTick: The timing of each tick.
+        """
+        self._next = self.clock()
+        while not stop_event.is_set():
+            delay = self._next - self.clock()
+            if delay > 0 and stop_event.wait(delay):
+                break
+            yield self._start_tick()
+            self._finish_tick()
+
+    async def run_async(self, stop_event):
+        """
+        Asynchronous variant of `run` for use on an event loop.
+
+        Args:
+            stop_event (threading.Event): The event that signals when to stop.
+
+        Yields:
+            ScheduledTick: The timing of each tick.
+        """
+        self._next = self.clock()
+        while not stop_event.is_set():
+            delay = self._next - self.clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if stop_event.is_set():
+                    break
+            yield self._start_tick()
+            self._finish_tick()
+
+    def stats(self):
+        """
+        Returns the scheduler's timing statistics.
+
+        Returns:
+            dict: Tick, overrun and skipped counts plus mean and max jitter in seconds.
+        """
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "mean_jitter": self._total_jitter / self.ticks if self.ticks else 0.0,
+            "max_jitter": self.max_jitter
+        }
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of `stats`.
+
+        Returns:
+            str: The summary line.
+        """
+        stats = self.stats()
+        return (
+            f"{stats['ticks']} ticks at {self.interval:g}s, {stats['overruns']} overruns, "
+            f"{stats['skipped']} skipped, jitter mean {stats['mean_jitter'] * 1000:.1f} ms "
+            f"max {stats['max_jitter'] * 1000:.1f} ms"
+        )
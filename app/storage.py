@@ -0,0 +1,346 @@
+import io
+import threading
+from sqlalchemy import and_, bindparam, case, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.config import Config
+from app.models import Candle, MarketData
+
+# Columns written for every tick; `id` is assigned by the database
+MARKET_DATA_COLUMNS = ("symbol", "buy", "sell", "high", "low", "open", "last", "volume", "date")
+
+# Columns that identify a candle, and the ones replaced when it is stored again
+CANDLE_KEY = ("symbol", "interval", "start")
+CANDLE_VALUES = ("open", "high", "low", "close", "volume", "ticks")
+
+# Session-local table that COPY loads into before the deduplicating INSERT
+STAGING_TABLE = "market_data_staging"
+
+class StorageBackend:
+    """
+    Writes ticks and candles to a database through portable SQLAlchemy Core.
+
+    The backend is picked by `storage_backend` from the engine's dialect; the
+    dialect-specific subclasses replace the portable statements with faster,
+    single-statement ones. This base class works with any database: it looks up
+    which keys of a batch are already stored, then skips (ticks) or updates
+    (candles) those rows and inserts the others. The lookup and the writes are
+    separate statements, so two processes writing the same new key at once can
+    still conflict on the unique index.
+    """
+    name = "default"
+
+    def insert_market_data(self, db, rows):
+        """
+        Inserts ticks, as parameter sets keyed by `MarketData` column names,
+        skipping ticks whose (symbol, date) is already stored or repeated in the batch.
+
+        Args:
+            db (sqlalchemy.orm.Session): The session; the caller commits.
+            rows (list of dict): The ticks, e.g. from `Tick.as_row`.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        batch = {}
+        for row in rows:
+            batch.setdefault((row["symbol"], row["date"]), row)
+        stored = _stored_keys(db, MarketData.__table__, ("symbol", "date"), batch)
+        new_rows = [row for key, row in batch.items() if key not in stored]
+        if new_rows:
+            db.execute(MarketData.__table__.insert(), new_rows)
+        return len(new_rows)
+
+    def upsert_candles(self, db, candles, merge=False):
+        """
+        Stores candles, replacing any candle with the same symbol, interval and start,
+        or merging into it with `merge_candle`.
+
+        Merging keeps a complete stored candle intact when a partial candle of
+        the same interval is stored after it, e.g. one opened by a late tick or
+        after a restart.
+
+        Args:
+            db (sqlalchemy.orm.Session): The session; the caller commits.
+            candles (list of dict): The candles, as `Candle` column values.
+            merge (bool): Whether to merge into stored candles instead of replacing them.
+        """
+        table = Candle.__table__
+        batch = _candle_batch(candles, merge)
+        stored = _stored_keys(db, table, CANDLE_KEY, batch)
+        new_candles = [candle for key, candle in batch.items() if key not in stored]
+        if new_candles:
+            db.execute(table.insert(), new_candles)
+        if stored:
+            if merge:
+                high, low = bindparam("high"), bindparam("low")
+                values = {
+                    "high": case((table.c.high > high, table.c.high), else_=high),
+                    "low": case((table.c.low < low, table.c.low), else_=low),
+                    "close": bindparam("close"),
+                    "volume": table.c.volume + bindparam("volume"),
+                    "ticks": table.c.ticks + bindparam("ticks"),
+                }
+            else:
+                values = {name: bindparam(name) for name in CANDLE_VALUES}
+            statement = table.update().where(
+                and_(*(table.c[name] == bindparam(f"key_{name}") for name in CANDLE_KEY))
+            ).values(values)
+            # Only the updated values are passed, as any other column would be SET as well
+            changed = [dict({f"key_{name}": candle[name] for name in CANDLE_KEY},
+                            **{name: candle[name] for name in values})
+                       for key, candle in batch.items() if key in stored]
+            db.execute(statement, changed)
+
+    def prepare(self, engine):
+        """
+        Applies the backend's schema changes once the tables exist.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine of the database.
+        """
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite storage: a single INSERT OR IGNORE executemany per batch, so ticks
+    that are already stored are skipped, and INSERT OR REPLACE for candles, or
+    INSERT ... ON CONFLICT DO UPDATE when they are merged.
+    """
+    name = "sqlite"
+
+    def insert_market_data(self, db, rows):
+        statement = MarketData.__table__.insert().prefix_with("OR IGNORE")
+        return db.execute(statement, rows).rowcount
+
+    def upsert_candles(self, db, candles, merge=False):
+        if not merge:
+            db.execute(Candle.__table__.insert().prefix_with("OR REPLACE"), candles)
+            return
+        statement = sqlite.insert(Candle.__table__)
+        # SQLite's two-argument max() and min() are scalar functions
+        statement = statement.on_conflict_do_update(
+            index_elements=list(CANDLE_KEY),
+            set_=_merged_candle_values(statement.excluded, func.max, func.min)
+        )
+        db.execute(statement, list(_candle_batch(candles, merge).values()))
+
+class PostgresBackend(StorageBackend):
+    """
+    PostgreSQL and TimescaleDB storage.
+
+    A batch of ticks is bulk-loaded with COPY into a temporary staging table and
+    moved into `market_data` with one INSERT ... ON CONFLICT DO NOTHING, so it
+    costs two round trips however large it is, and already stored ticks are
+    skipped as with SQLite. Drivers without COPY support fall back to an
+    executemany of the same INSERT. Candles are upserted with ON CONFLICT DO UPDATE,
+    which replaces or merges the stored candle.
+
+    With `hypertable`, `prepare` turns `market_data` into a TimescaleDB
+    hypertable partitioned on `date`, in chunks of `chunk_interval` seconds.
+
+    Args:
+        hypertable (bool, optional): Whether to create the hypertable. Defaults to
+                                     `Config.TIMESCALE_HYPERTABLE`.
+        chunk_interval (int, optional): The hypertable's chunk size, in seconds.
+                                        Defaults to `Config.TIMESCALE_CHUNK_INTERVAL`.
+    """
+    name = "postgresql"
+
+    def __init__(self, hypertable=None, chunk_interval=None):
+        self.hypertable = Config.TIMESCALE_HYPERTABLE if hypertable is None else hypertable
+        self.chunk_interval = chunk_interval or Config.TIMESCALE_CHUNK_INTERVAL
+
+    def insert_market_data(self, db, rows):
+        connection = db.connection()
+        cursor = connection.connection.cursor()
+        if not hasattr(cursor, "copy_expert") and not hasattr(cursor, "copy"):
+            cursor.close()
+            statement = postgresql.insert(MarketData.__table__).on_conflict_do_nothing(index_elements=["symbol", "date"])
+            return db.execute(statement, rows).rowcount
+
+        columns = ", ".join(MARKET_DATA_COLUMNS)
+        try:
+            cursor.execute(self._staging_ddl(connection.dialect))
+            copy = f"COPY {STAGING_TABLE} ({columns}) FROM STDIN"
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2
+                cursor.copy_expert(copy, io.StringIO(copy_text(rows)))
+            else:
+                # psycopg 3
+                with cursor.copy(copy) as loader:
+                    loader.write(copy_text(rows))
+            cursor.execute(
+                f"INSERT INTO {MarketData.__tablename__} ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+                f"ON CONFLICT (symbol, date) DO NOTHING"
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def upsert_candles(self, db, candles, merge=False):
+        statement = postgresql.insert(Candle.__table__)
+        if merge:
+            values = _merged_candle_values(statement.excluded, func.greatest, func.least)
+        else:
+            values = {name: statement.excluded[name] for name in CANDLE_VALUES}
+        statement = statement.on_conflict_do_update(index_elements=list(CANDLE_KEY), set_=values)
+        # One batch must not conflict with itself, so repeated keys are merged first
+        db.execute(statement, list(_candle_batch(candles, merge).values()))
+
+    def prepare(self, engine):
+        if not self.hypertable:
+            return
+        table = MarketData.__tablename__
+        with engine.begin() as connection:
+            connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS timescaledb")
+            exists = connection.execute(
+                text("SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = :table"),
+                {"table": table}
+            ).first()
+            if exists:
+                return
+            # Unique indexes of a hypertable must include its partitioning column
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_pkey, ADD PRIMARY KEY (id, date)"
+            )
+            connection.exec_driver_sql(
+                f"SELECT create_hypertable('{table}', 'date', chunk_time_interval => {int(self.chunk_interval)}, "
+                f"migrate_data => TRUE)"
+            )
+
+    @staticmethod
+    def _staging_ddl(dialect):
+        """
+        Returns the statements that create the staging table on first use in a
+        connection and empty it.
+        """
+        table = MarketData.__table__
+        columns = ", ".join(f"{name} {table.c[name].type.compile(dialect=dialect)}" for name in MARKET_DATA_COLUMNS)
+        return (f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ({columns}) ON COMMIT DELETE ROWS; "
+                f"TRUNCATE {STAGING_TABLE}")
+
+def copy_text(rows, columns=MARKET_DATA_COLUMNS):
+    """
+    Encodes rows in PostgreSQL's COPY text format.
+
+    Args:
+        rows (list of dict): The rows.
+        columns (tuple of str): The keys to write, in column order.
+
+    Returns:
+        str: One tab-separated line per row, NULL written as \\N.
+
+    Example:
+        >>> copy_text([{"symbol": "BTC-BRL", "last": None}], columns=("symbol", "last"))
+        'BTC-BRL\\t\\\\N\\n'
+    """
+    lines = []
+    for row in rows:
+        fields = []
+        for name in columns:
+            value = row.get(name)
+            if value is None:
+                fields.append("\\N")
+            elif isinstance(value, str):
+                fields.append(value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r"))
+            else:
+                fields.append(repr(value))
+        lines.append("\t".join(fields))
+    return "\n".join(lines) + "\n" if lines else ""
+
+def merge_candle(stored, candle):
+    """
+    Merges a candle into an earlier one of the same symbol, interval and start.
+
+    Args:
+        stored (dict): The earlier candle, e.g. the one already stored.
+        candle (dict): The later candle, e.g. opened by a late tick.
+
+    Returns:
+        dict: The stored candle's open, the widest high and low, the later close,
+              and the sum of the volumes and tick counts.
+    """
+    return dict(stored, high=max(stored["high"], candle["high"]), low=min(stored["low"], candle["low"]),
+                close=candle["close"], volume=stored["volume"] + candle["volume"],
+                ticks=stored["ticks"] + candle["ticks"])
+
+def _candle_batch(candles, merge):
+    """
+    Returns candles keyed by symbol, interval and start, with repeated keys
+    merged with `merge_candle`, or replaced by the last one.
+    """
+    batch = {}
+    for candle in candles:
+        key = tuple(candle[name] for name in CANDLE_KEY)
+        batch[key] = merge_candle(batch[key], candle) if merge and key in batch else candle
+    return batch
+
+def _merged_candle_values(excluded, greatest, least):
+    """
+    Returns the ON CONFLICT DO UPDATE values that merge the proposed candle
+    (`excluded`) into the stored one, like `merge_candle`.
+    """
+    table = Candle.__table__
+    return {
+        "high": greatest(table.c.high, excluded.high),
+        "low": least(table.c.low, excluded.low),
+        "close": excluded.close,
+        "volume": table.c.volume + excluded.volume,
+        "ticks": table.c.ticks + excluded.ticks,
+    }
+
+def _stored_keys(db, table, columns, keys):
+    """
+    Returns which of the given keys are already stored in a table.
+
+    Args:
+        db (sqlalchemy.orm.Session): The session.
+        table (sqlalchemy.Table): The table.
+        columns (tuple of str): The columns of the table's unique key.
+        keys (iterable of tuple): The keys to look up, in `columns` order.
+
+    Returns:
+        set of tuple: The stored keys among `keys`.
+    """
+    keys = set(keys)
+    if not keys:
+        return set()
+    # One IN list per column selects a superset of the keys; the exact match is done here
+    conditions = [table.c[name].in_(sorted({key[index] for key in keys})) for index, name in enumerate(columns)]
+    statement = select(*(table.c[name] for name in columns)).where(and_(*conditions))
+    return {tuple(row) for row in db.execute(statement)} & keys
+
+# Backends by dialect name; other dialects use the portable `StorageBackend`
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "postgresql": PostgresBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def storage_backend(bind):
+    """
+    Returns the storage backend of an engine or connection.
+
+    The backend is chosen by `Config.STORAGE_BACKEND`, or by the dialect of
+    `bind` when it is "auto", and created once per name.
+
+    Args:
+        bind (sqlalchemy.engine.Engine or Connection): What the session is bound to.
+
+    Returns:
+        StorageBackend: The backend.
+
+    Raises:
+        ValueError: If `Config.STORAGE_BACKEND` names an unknown backend.
+    """
+    name = Config.STORAGE_BACKEND
+    if name == "auto":
+        name = bind.dialect.name if bind.dialect.name in BACKENDS else StorageBackend.name
+    elif name not in BACKENDS and name != StorageBackend.name:
+        raise ValueError(f"Unknown storage backend {name!r}; expected auto, {StorageBackend.name} or {', '.join(BACKENDS)}")
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.setdefault(name, BACKENDS.get(name, StorageBackend)())
+    return backend
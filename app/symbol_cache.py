@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+import time
+import requests
+from app.config import Config
+from app.decoding import decode_json
+from app.fetch_data import API_URL, send_request
+
+class SymbolCache:
+    """
+    TTL cache in front of the /symbols endpoint.
+
+    The symbol list changes rarely and its payload is large, so it is fetched
+    once and kept in memory for `ttl` seconds. Every fetched copy is also saved
+    to `path`, so a cold start serves the last known list without a request.
+
+    Once the copy is older than `ttl`, `get` keeps returning it and starts a
+    single background refresh (stale-while-revalidate). Refreshes send the
+    `ETag` and `Last-Modified` of the cached copy as `If-None-Match` and
+    `If-Modified-Since`; a 304 Not Modified answer only renews the copy's age,
+    without transferring or parsing the payload again.
+
+    Attributes:
+        ttl (float): How long a copy is served without revalidation, in seconds.
+        path (str): The file the latest copy is persisted to, or None to disable it.
+        hits (int): The number of calls served a fresh copy.
+        stale (int): The number of calls served a stale copy while it was refreshed.
+        misses (int): The number of calls that had no copy and waited for a fetch.
+        refreshes (int): The number of requests sent to /symbols.
+        not_modified (int): The number of refreshes answered with 304 Not Modified.
+        errors (int): The number of background refreshes that failed.
+
+    Example:
+        cache = SymbolCache(ttl=3600)
+        symbols = cache.get()
+        print(cache.summary())
+    """
+
+    def __init__(self, ttl=None, path=None, url=None, clock=time.time):
+        self.ttl = Config.SYMBOLS_CACHE_TTL if ttl is None else ttl
+        self.path = Config.SYMBOLS_CACHE_PATH if path is None else path
+        self.url = url or f"{API_URL}symbols"
+        self.clock = clock
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.not_modified = 0
+        self.errors = 0
+        self._data = None
+        self._etag = None
+        self._last_modified = None
+        self._fetched_at = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def get(self):
+        """
+        Returns the symbol list, fetching it only if there is no copy at all.
+
+        Returns:
+            dict: The /symbols payload, as returned by `fetch_symbols`.
+
+        Raises:
+            requests.RequestException: If there is no copy and the fetch fails.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self._load()
+            if self._data is None:
+                self.misses += 1
+                fetch = True
+            elif self.clock() - self._fetched_at < self.ttl:
+                self.hits += 1
+                return self._data
+            else:
+                self.stale += 1
+                fetch = False
+                if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                    self._refresh_thread = threading.Thread(target=self._refresh_in_background, daemon=True)
+                    self._refresh_thread.start()
+                data = self._data
+        if fetch:
+            return self.refresh()
+        return data
+
+    def refresh(self):
+        """
+        Revalidates the cached copy with the server, replacing it if it changed.
+
+        Returns:
+            dict: The current symbol list.
+
+        Raises:
+            requests.RequestException: If the request fails.
+        """
+        headers = {}
+        with self._lock:
+            if self._data is not None:
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+
+        self.refreshes += 1
+        try:
+            response = send_request(self.url, headers=headers)
+            if response.status_code == 304:
+                with self._lock:
+                    self.not_modified += 1
+                    self._fetched_at = self.clock()
+                    data = self._data
+            else:
+                data = decode_json(response.content)
+                with self._lock:
+                    self._data = data
+                    self._etag = response.headers.get("ETag")
+                    self._last_modified = response.headers.get("Last-Modified")
+                    self._fetched_at = self.clock()
+            self._save()
+            return data
+        except requests.RequestException as e:
+            print(f"Error fetching symbols: {e}")
+            raise
+
+    def _refresh_in_background(self):
+        """
+        Runs `refresh` on the background thread, keeping the stale copy on failure.
+        """
+        try:
+            self.refresh()
+        except Exception:
+            self.errors += 1
+
+    def wait(self, timeout=None):
+        """
+        Waits for a background refresh in progress to finish.
+
+        Args:
+            timeout (float, optional): The maximum time to wait, in seconds.
+        """
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _load(self):
+        """
+        Loads the persisted copy, if any. A missing or unreadable file is ignored.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                stored = json.load(file)
+            self._data = stored["data"]
+            self._etag = stored.get("etag")
+            self._last_modified = stored.get("last_modified")
+            self._fetched_at = stored["fetched_at"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable symbols cache {self.path}: {e}")
+
+    def _save(self):
+        """
+        Persists the current copy, replacing the file atomically.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            stored = {
+                "fetched_at": self._fetched_at,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "data": self._data
+            }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(stored, file)
+        os.replace(temporary, self.path)
+
+    def stats(self):
+        """
+        Returns the cache's counters.
+
+        Returns:
+            dict: Hit, stale, miss, refresh, not-modified and error counts, and the
+                  age of the current copy in seconds (None without a copy).
+        """
+        return {
+            "hits": self.hits,
+            "stale": self.stale,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "age": self.clock() - self._fetched_at if self._fetched_at is not None else None
+        }
+
+    def summary(self):
+        """
+        Returns a one-line, human-readable summary of `stats`.
+
+        Returns:
+            str: The summary line.
+        """
+        stats = self.stats()
+        return (
+            f"{stats['hits']} hits, {stats['stale']} stale, {stats['misses']} misses, "
+            f"{stats['refreshes']} refreshes ({stats['not_modified']} not modified), {stats['errors']} errors"
+        )
+
+# Shared cache used by the application
+symbol_cache = SymbolCache()
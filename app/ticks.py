@@ -0,0 +1,197 @@
+def safe_float(value):
+    """
+    Converts a value to float, returning 0.0 if the conversion fails.
+
+    Args:
+        value (str): The value to convert.
+
+    Returns:
+        float: The converted float value, or 0.0 if conversion fails.
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+# Optional; when installed, `Tick` is a msgspec Struct that `decoding.decode_ticks`
+# decodes /tickers bodies straight into
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Fields of a tick, in positional order
+TICK_FIELDS = ("symbol", "buy", "sell", "high", "low", "open", "last", "volume", "date")
+
+class _TickMethods:
+    """
+    Behaviour shared by both definitions of `Tick`.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_payload(cls, item):
+        """
+        Parses one ticker of a /tickers payload.
+
+        Args:
+            item (dict): A ticker as returned by `fetch_market_data`.
+
+        Returns:
+            Tick: The parsed tick. Unparseable prices become 0.0, like `safe_float`.
+        """
+        return cls(
+            item['pair'],
+            safe_float(item['buy']),
+            safe_float(item['sell']),
+            safe_float(item['high']),
+            safe_float(item['low']),
+            safe_float(item['open']),
+            safe_float(item['last']),
+            safe_float(item['vol']),
+            int(item['date'])
+        )
+
+    def key(self):
+        """
+        Returns the fields that identify a new snapshot of the symbol.
+
+        Returns:
+            tuple: The (date, last, buy, sell, volume) of the tick.
+        """
+        return (self.date, self.last, self.buy, self.sell, self.volume)
+
+    def as_row(self):
+        """
+        Returns the tick as a parameter set for the `market_data` table.
+
+        Returns:
+            dict: The tick keyed by `MarketData` column names.
+        """
+        return {
+            'symbol': self.symbol,
+            'buy': self.buy,
+            'sell': self.sell,
+            'high': self.high,
+            'low': self.low,
+            'open': self.open,
+            'last': self.last,
+            'volume': self.volume,
+            'date': self.date
+        }
+
+    def as_payload(self):
+        """
+        Returns the tick in the /tickers payload format, e.g. for JSON serialization.
+
+        Returns:
+            dict: The tick keyed like a /tickers item, so `from_payload` reads it back.
+        """
+        return {
+            'pair': self.symbol,
+            'buy': self.buy,
+            'sell': self.sell,
+            'high': self.high,
+            'low': self.low,
+            'open': self.open,
+            'last': self.last,
+            'vol': self.volume,
+            'date': self.date
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Tick):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in TICK_FIELDS)
+
+    def __repr__(self):
+        return f"Tick({self.symbol!r}, last={self.last!r}, date={self.date!r})"
+
+if msgspec is not None:
+    class Tick(_TickMethods, msgspec.Struct, rename={"symbol": "pair", "volume": "vol"}, gc=False):
+        """
+        One ticker snapshot, parsed once from the /tickers payload.
+
+        Ticks replace the per-stage representations of a polled ticker (the JSON
+        dict, the printed row list and the stored parameter set): the fetch layer
+        parses each ticker into a `Tick`, and printing, deduplication, candle
+        aggregation, the ring buffer and storage all read its attributes. An
+        instance holds its nine fields without a per-instance `__dict__`, and
+        prices are kept as floats rather than strings.
+
+        With msgspec installed, `Tick` is a Struct whose fields are renamed to the
+        payload's keys, so `decoding.decode_ticks` decodes a /tickers body into
+        ticks in one pass, without an intermediate object per ticker. Without
+        it, `Tick` is a plain class with `__slots__` and the same interface.
+
+        Attributes:
+            symbol (str): The trading pair symbol (the payload's `pair`).
+            buy (float): The best buy (bid) price.
+            sell (float): The best sell (ask) price.
+            high (float): The 24h high.
+            low (float): The 24h low.
+            open (float): The 24h opening price.
+            last (float): The last traded price.
+            volume (float): The rolling 24h volume (the payload's `vol`).
+            date (int): The exchange timestamp, in seconds since epoch.
+
+        Example:
+            tick = Tick.from_payload({"pair": "BTC-BRL", "last": "31000.5", ...})
+            print(tick.last)  # Output: 31000.5
+        """
+        symbol: str
+        buy: float
+        sell: float
+        high: float
+        low: float
+        open: float
+        last: float
+        volume: float
+        date: int
+else:
+    class Tick(_TickMethods):
+        """
+        One ticker snapshot, as a plain class with `__slots__`, used when msgspec
+        is not installed. See the Struct variant above for its attributes.
+        """
+
+        __slots__ = TICK_FIELDS
+
+        def __init__(self, symbol, buy, sell, high, low, open, last, volume, date):
+            self.symbol = symbol
+            self.buy = buy
+            self.sell = sell
+            self.high = high
+            self.low = low
+            self.open = open
+            self.last = last
+            self.volume = volume
+            self.date = date
+
+def parse_ticks(market_data):
+    """
+    Parses a /tickers payload into ticks.
+
+    Args:
+        market_data (list of dict): The market data as returned by `fetch_market_data`.
+
+    Returns:
+        list of Tick: One tick per ticker, in payload order.
+    """
+    return [Tick.from_payload(item) for item in market_data]
+
+def as_ticks(items):
+    """
+    Returns `items` as ticks, parsing any /tickers dicts among them.
+
+    This lets the storage functions keep accepting raw payloads (e.g. items read
+    back from a write-behind spill file) as well as parsed ticks.
+
+    Args:
+        items (list): Ticks or /tickers dicts.
+
+    Returns:
+        list of Tick: The ticks.
+    """
+    return [item if isinstance(item, Tick) else Tick.from_payload(item) for item in items]
@@ -1,22 +1,29 @@
-import time
+import asyncio
+import requests
+from sqlalchemy import select, bindparam
+from app.candles import CandleAggregator, store_candles
+from app.config import Config
 from app.database import SessionLocal
-from app.fetch_data import fetch_market_data
+from app.dedup import TickDeduplicator
+from app.fetch_data import fetch_ticks, chunk_symbols, stop_retries_on, CircuitOpenError
+from app.metrics import metrics, stage_histogram, MetricsExporter
 from app.models import Symbol, MarketData
+from app.pipeline import WriteBehindQueue
+from app.queries import stream_market_data
+from app.quotes import quote_book
+from app.ringbuffer import TickRingBuffer
+from app.scheduler import FixedRateScheduler
+from app.storage import storage_backend
+from app.ticks import safe_float, parse_ticks, as_ticks
 
-def safe_float(value):
-    """
-    Converts a value to float, returning 0.0 if the conversion fails.
-
-    Args:
-        value (str): The value to convert.
-
-    Returns:
-        float: The converted float value, or 0.0 if conversion fails.
-    """
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return 0.0
+# Hot-path instrumentation of the subscription loops, see `app.metrics`
+FETCH_SECONDS = stage_histogram("fetch")
+PARSE_SECONDS = stage_histogram("parse")
+RENDER_SECONDS = stage_histogram("render")
+TICK_SECONDS = stage_histogram("tick")
+TICKS = metrics.counter("market_data_ticks_total", "Tickers received from the API.")
+FETCH_ERRORS = metrics.counter("market_data_errors_total", "Errors by stage of a subscription tick.", stage="fetch")
+TICK_ERRORS = metrics.counter("market_data_errors_total", "Errors by stage of a subscription tick.", stage="tick")
 
 def store_symbols(data):
     """
@@ -55,12 +62,149 @@ def store_symbols(data):
         db.commit()
     print(f"Stored {symbols_stored} symbols.")
 
-def store_market_data(data):
+def _symbol_rows(data):
+    """
+    Converts the column-oriented symbol payload into one dictionary per symbol.
+
+    The /symbols endpoint returns a dict of parallel lists (``data['symbol'][i]``,
+    ``data['base-currency'][i]``, ...). This function transposes it into row
+    dictionaries keyed by `Symbol` column names, ready for a Core executemany.
+    When the payload lists a symbol more than once, the last entry wins.
+
+    Args:
+        data (dict): The symbol data as returned by `fetch_symbols`.
+
+    Returns:
+        list of dict: One dictionary per unique symbol.
+    """
+    rows = {}
+    for i in range(len(data['symbol'])):
+        symbol = data['symbol'][i]
+        rows[symbol] = {
+            'base_currency': data['base-currency'][i],
+            'currency': data['currency'][i],
+            'symbol': symbol,
+            'description': data['description'][i],
+            'exchange_listed': data['exchange-listed'][i],
+            'exchange_traded': data['exchange-traded'][i],
+            'min_movement': data['minmovement'][i],
+            'price_scale': safe_float(data['pricescale'][i]),
+            'session_regular': data['session-regular'][i],
+            'timezone': data['timezone'][i],
+            'type': data['type'][i],
+            'deposit_minimum': safe_float(data['deposit-minimum'][i]),
+            'withdraw_minimum': safe_float(data['withdraw-minimum'][i]),
+            'withdrawal_fee': safe_float(data['withdrawal-fee'][i])
+        }
+    return list(rows.values())
+
+def store_symbols_bulk(data):
+    """
+    Stores symbol data in the database using set-based statements.
+
+    Unlike `store_symbols`, which issues one SELECT per symbol and adds ORM objects
+    one at a time, this function loads every known symbol in a single query, then
+    writes all new symbols with one INSERT executemany and all changed symbols
+    (e.g. an updated `withdrawal_fee`) with one UPDATE executemany. Symbols whose
+    stored fields already match the payload are left untouched.
+
+    Args:
+        data (dict): The symbol data to store, in the same column-oriented format
+                     accepted by `store_symbols`.
+
+    Returns:
+        tuple: The number of symbols inserted and the number of symbols updated.
+    """
+    rows = _symbol_rows(data)
+    if not rows:
+        print("Stored 0 symbols, updated 0 symbols.")
+        return 0, 0
+
+    table = Symbol.__table__
+    columns = list(rows[0].keys())
+
+    with SessionLocal() as db:
+        # One round trip for the current state of every symbol
+        existing = {
+            row.symbol: tuple(row)
+            for row in db.execute(select(*[table.c[name] for name in columns]))
+        }
+
+        new_rows = []
+        changed_rows = []
+        for row in rows:
+            current = existing.get(row['symbol'])
+            if current is None:
+                new_rows.append(row)
+            elif current != tuple(row[name] for name in columns):
+                changed_rows.append(dict(row, match_symbol=row['symbol']))
+
+        if new_rows:
+            db.execute(table.insert(), new_rows)
+        if changed_rows:
+            db.execute(
+                table.update().where(table.c.symbol == bindparam('match_symbol')),
+                changed_rows
+            )
+        db.commit()
+
+    print(f"Stored {len(new_rows)} symbols, updated {len(changed_rows)} symbols.")
+    return len(new_rows), len(changed_rows)
+
+def _market_data_rows(data):
     """
-    Stores market data in the database and returns the created MarketData objects.
+    Converts ticks into parameter sets for the `market_data` table.
 
     Args:
-        data (list of dict): The market data to store. 
+        data (list): Ticks, or /tickers dicts as returned by `fetch_market_data`.
+
+    Returns:
+        list of dict: One parameter set per ticker, keyed by `MarketData` column names.
+    """
+    return [tick.as_row() for tick in as_ticks(data)]
+
+def store_market_data(data, return_objects=False):
+    """
+    Stores market data in the database.
+
+    By default the ticks are converted straight into parameter sets and written
+    in one batch by the database's storage backend (see `app.storage`), bypassing
+    the ORM unit of work: an INSERT executemany on SQLite, a COPY on PostgreSQL.
+    Tickers that would violate the unique (symbol, date) index are skipped. Passing
+    `return_objects=True` falls back to building one `MarketData` instance per
+    ticker, which is slower but hands the created objects back to the caller.
+
+    Args:
+        data (list): The market data to store, as `Tick` objects or /tickers dicts.
+        return_objects (bool): Whether to build and return `MarketData` objects.
+
+    Returns:
+        int or list: The number of rows inserted, or, when `return_objects` is True,
+                     a list of the MarketData objects that were created.
+    """
+    if return_objects:
+        return _store_market_data_objects(data)
+
+    with SessionLocal() as db:
+        try:
+            rows = _market_data_rows(data)
+            inserted = 0
+            if rows:
+                inserted = storage_backend(db.get_bind()).insert_market_data(db, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error occurred: {e}")
+            return 0
+
+    return inserted
+
+def _store_market_data_objects(data):
+    """
+    Stores market data through the ORM and returns the created MarketData objects.
+
+    Args:
+        data (list): The market data to store, as `Tick` objects or /tickers dicts.
 
     Returns:
         list: A list of MarketData objects that were created.
@@ -69,19 +213,8 @@ def store_market_data(data):
 
     with SessionLocal() as db:
         try:
-            for item in data:
-                market_data = MarketData(
-                    symbol=item['pair'],
-                    buy=safe_float(item['buy']),
-                    sell=safe_float(item['sell']),
-                    high=safe_float(item['high']),
-                    low=safe_float(item['low']),
-                    open=safe_float(item['open']),
-                    last=safe_float(item['last']),
-                    volume=safe_float(item['vol']),
-                    date=int(item['date'])
-                )
-
+            for row in _market_data_rows(data):
+                market_data = MarketData(**row)
                 db.add(market_data)
                 market_data_objects.append(market_data)
 
@@ -92,16 +225,15 @@ def store_market_data(data):
 
     return market_data_objects
 
-def print_market_data(market_data_list):
+def print_market_data(ticks):
     """
     Prints market data in a tabular format.
 
     Args:
-        market_data_list (list of list): The market data to print. Each inner list contains 
-                                         'symbol', 'buy', 'sell', 'high', 'low', 'open', 'last', 'volume', 'date'.
+        ticks (list of Tick): The ticks to print.
     """
-    for item in market_data_list:
-        print(f"{item[0]:<10} | {item[1]:<10} | {item[2]:<10} | {item[3]:<10} | {item[4]:<10} | {item[5]:<10} | {item[6]:<10} | {item[7]:<10} | {item[8]}")
+    for tick in ticks:
+        print(f"{tick.symbol:<10} | {tick.buy:<10} | {tick.sell:<10} | {tick.high:<10} | {tick.low:<10} | {tick.open:<10} | {tick.last:<10} | {tick.volume:<10} | {tick.date}")
 
 def display_symbols():
     """
@@ -119,58 +251,300 @@ def display_symbols():
         for symbol in symbols:
             print(f"{symbol.symbol:<10} | {symbol.description:<40}")
 
-def display_market_data():
+def display_market_data(symbol=None, limit=None, tail=False, page_size=1000):
     """
     Displays market data stored in the database in a tabular format.
+
+    Rows are streamed from the database and rendered one page at a time, so memory
+    use does not grow with the size of the table.
+
+    Args:
+        symbol (str, optional): Only display market data for this symbol.
+        limit (int, optional): The maximum number of rows to display.
+        tail (bool): Whether to display the newest `limit` rows instead of the oldest.
+        page_size (int): The number of rows fetched and rendered at a time.
     """
-    with SessionLocal() as db:
-        market_data = db.query(MarketData).order_by(MarketData.date).all()
+    displayed = 0
+    for page in stream_market_data(symbol=symbol, limit=limit, tail=tail, page_size=page_size):
+        if not displayed:
+            headers = ["Symbol", "Buy", "Sell", "High", "Low", "Open", "Last", "Volume", "Date"]
+            print(f"{headers[0]:<10} {headers[1]:<10} {headers[2]:<10} {headers[3]:<10} {headers[4]:<10} {headers[5]:<10} {headers[6]:<10} {headers[7]:<10} {headers[8]}")
+            print("-" * 90)
+        print("\n".join(
+            f"{row[1]:<10} {row[2]:<10} {row[3]:<10} {row[4]:<10} {row[5]:<10} {row[6]:<10} {row[7]:<10} {row[8]:<10} {row[9]}"
+            for row in page
+        ))
+        displayed += len(page)
 
-    if not market_data:
+    if not displayed:
         print("No market data available.")
-    else:
-        headers = ["Symbol", "Buy", "Sell", "High", "Low", "Open", "Last", "Volume", "Date"]
-        print(f"{headers[0]:<10} {headers[1]:<10} {headers[2]:<10} {headers[3]:<10} {headers[4]:<10} {headers[5]:<10} {headers[6]:<10} {headers[7]:<10} {headers[8]}")
-        print("-" * 90)
-        for data in market_data:
-            print(f"{data.symbol:<10} {data.buy:<10} {data.sell:<10} {data.high:<10} {data.low:<10} {data.open:<10} {data.last:<10} {data.volume:<10} {data.date}")
 
-def subscribe_market_data(symbol, stop_event):
+def fetch_market_data_chunks(chunks):
     """
-    Subscribes to market data for a specific symbol and continuously fetches and stores the data,
-    stopping when the stop_event is set.
+    Fetches market data for every chunk of a watchlist, one request per chunk.
+
+    A failing chunk is reported and skipped so that the remaining chunks of the
+    watchlist are still fetched during the same tick. Request errors are already
+    reported by the fetch layer, with the chunk's symbols, so only other errors
+    are printed here. Once the fetch policy's circuit breaker is open, the rest
+    of the tick is skipped.
 
     Args:
-        symbol (str): The symbol to subscribe to for market data.
-        stop_event (threading.Event): The event that signals when to stop the subscription.
-    """
-    print("Symbol     | Buy        | Sell       | High       | Low        | Open       | Last       | Volume     | Date")
-    print("-" * 110)
+        chunks (list of list): Symbol chunks, as returned by `chunk_symbols`.
 
-    while not stop_event.is_set():  # Check if the stop event is set before each iteration
+    Returns:
+        list of Tick: The combined market data of every chunk that was fetched.
+    """
+    market_data = []
+    for chunk in chunks:
         try:
-            market_data = fetch_market_data([symbol])
-
-            market_data_list = [
-                [
-                    item['pair'],
-                    item['buy'],
-                    item['sell'],
-                    item['high'],
-                    item['low'],
-                    item['open'],
-                    item['last'],
-                    item['vol'],
-                    item['date']
-                ]
-                for item in market_data
-            ]
-            print_market_data(market_data_list)
-            store_market_data(market_data)
-
-            # Small delay to avoid excessive requests (adjust as needed)
-            time.sleep(1)  
+            market_data.extend(fetch_ticks(chunk))
+        except CircuitOpenError:
+            FETCH_ERRORS.inc()
+            break
+        except requests.RequestException:
+            FETCH_ERRORS.inc()
         except Exception as e:
+            FETCH_ERRORS.inc()
             print(f"An error occurred: {e}")
-            time.sleep(1)
+    return market_data
+
+def aggregate_candles(aggregator, market_data):
+    """
+    Feeds ticks into a candle aggregator.
+
+    Args:
+        aggregator (CandleAggregator): The aggregator holding the open candles.
+        market_data (list of Tick): The ticks, in chronological order per symbol.
+
+    Returns:
+        list of dict: The candles closed by these tickers or by the passage of time.
+    """
+    closed = []
+    for item in market_data:
+        closed.extend(aggregator.add(item.symbol, item.last, item.volume, item.date))
+    closed.extend(aggregator.close_expired())
+    return closed
+
+def create_write_queue(writer=None, spill_path=None, name="market_data"):
+    """
+    Creates and starts a write-behind queue.
+
+    The queue's size, batching and backpressure settings are taken from `Config`.
+    Every batch write is timed in the `store_<name>` stage of
+    `market_data_stage_seconds`, and the queue's depth, dropped and spilled
+    counts are exposed as metrics labelled with `name`.
+
+    Args:
+        writer (callable, optional): The function that persists a batch. Defaults to
+                                     `store_market_data`.
+        spill_path (str, optional): The spill file. Defaults to `Config.WRITE_SPILL_PATH`.
+        name (str): The queue's name in metric labels.
+
+    Returns:
+        WriteBehindQueue: The started queue.
+    """
+    writer = writer or store_market_data
+    store_seconds = stage_histogram(f"store_{name}")
+
+    def timed_writer(batch):
+        with store_seconds.time():
+            return writer(batch)
+
+    write_queue = WriteBehindQueue(
+        timed_writer,
+        max_size=Config.WRITE_QUEUE_SIZE,
+        batch_size=Config.WRITE_BATCH_SIZE,
+        flush_interval=Config.WRITE_FLUSH_INTERVAL,
+        backpressure=Config.WRITE_BACKPRESSURE,
+        spill_path=spill_path or Config.WRITE_SPILL_PATH
+    )
+    metrics.gauge("write_queue_depth", "Items waiting in a write-behind queue.",
+                  function=write_queue.qsize, queue=name)
+    metrics.counter("write_queue_dropped_total", "Items discarded by a full write-behind queue.",
+                    function=lambda: write_queue.dropped, queue=name)
+    metrics.counter("write_queue_spilled_total", "Items spilled to disk by a full write-behind queue.",
+                    function=lambda: write_queue.spilled, queue=name)
+    write_queue.start()
+    return write_queue
+
+def start_metrics_exporter():
+    """
+    Starts exposing the metrics registry as configured.
+
+    Returns:
+        MetricsExporter: The started exporter, or None if neither `Config.METRICS_PORT`
+                         nor `Config.METRICS_PATH` is set.
+    """
+    if Config.METRICS_PORT is None and not Config.METRICS_PATH:
+        return None
+    return MetricsExporter(metrics, port=Config.METRICS_PORT, path=Config.METRICS_PATH or None,
+                           interval=Config.METRICS_DUMP_INTERVAL).start()
+
+def open_ring_buffer():
+    """
+    Opens the ring buffer the subscription publishes its latest ticks to.
+
+    Returns:
+        TickRingBuffer: The buffer opened for writing, or None if `Config.RING_BUFFER_PATH`
+                        is not set.
+    """
+    if not Config.RING_BUFFER_PATH:
+        return None
+    return TickRingBuffer.open_or_create(Config.RING_BUFFER_PATH, capacity=Config.RING_BUFFER_CAPACITY)
+
+def subscribe_market_data(symbols, stop_event, interval=None, display=True):
+    """
+    Subscribes to market data for a watchlist and continuously fetches and stores the data,
+    stopping when the stop_event is set.
+
+    The watchlist is split into URL-length-safe chunks with `chunk_symbols`, so each tick
+    costs one /tickers request per chunk rather than one request per symbol. Each ticker
+    is parsed once into a `Tick`, and the ticks of all chunks are printed together.
+    Tickers identical to the symbol's previous snapshot
+    are dropped by a `TickDeduplicator`, and the rest go to a write-behind queue whose
+    writer thread commits them in batches, so a slow commit never delays the next fetch.
+    The same ticks feed a `CandleAggregator`, whose closed candles are persisted through
+    a second write-behind queue, and are published to the `TickRingBuffer` at
+    `Config.RING_BUFFER_PATH`, if set, for other processes to read. Within this
+    process, the latest tick of every symbol is kept in `quotes.quote_book`.
+    The fetch, parse, render and store stages of every tick are timed into the
+    `app.metrics` registry, which is served on `Config.METRICS_PORT` and/or dumped
+    to `Config.METRICS_PATH` while the subscription runs.
+    Ticks are paced by a `FixedRateScheduler`, so fetch latency does not stretch the
+    polling period. Once `stop_event` is set, retries of failed requests stop waiting
+    (see `stop_retries_on`) and everything still queued is flushed before returning.
+
+    Args:
+        symbols (str or list): The symbol, or list of symbols, to subscribe to for market data.
+        stop_event (threading.Event): The event that signals when to stop the subscription.
+        interval (float, optional): The polling period in seconds. Defaults to `Config.POLL_INTERVAL`.
+        display (bool): Whether to print every tick. Headless runs turn it off.
+    """
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    chunks = chunk_symbols(symbols)
+    scheduler = FixedRateScheduler(interval or Config.POLL_INTERVAL, on_overrun=Config.POLL_OVERRUN)
+
+    if display:
+        print("Symbol     | Buy        | Sell       | High       | Low        | Open       | Last       | Volume     | Date")
+        print("-" * 110)
+
+    deduplicator = TickDeduplicator()
+    aggregator = CandleAggregator(Config.CANDLE_INTERVALS)
+    write_queue = candle_queue = ring = exporter = None
+    try:
+        # Started inside the try, so a failing step (e.g. a metrics port in use)
+        # still stops the writer threads started before it
+        write_queue = create_write_queue()
+        candle_queue = create_write_queue(store_candles, f"{Config.WRITE_SPILL_PATH}.candles", "candles")
+        ring = open_ring_buffer()
+        exporter = start_metrics_exporter()
+        with stop_retries_on(stop_event):
+            for _ in scheduler.run(stop_event):
+                try:
+                    with TICK_SECONDS.time():
+                        market_data = fetch_market_data_chunks(chunks)
+                        TICKS.inc(len(market_data))
+
+                        if display:
+                            with RENDER_SECONDS.time():
+                                print_market_data(market_data)
+                        changed = deduplicator.filter(market_data)
+                        quote_book.update(changed)
+                        write_queue.put(changed)
+                        candle_queue.put(aggregate_candles(aggregator, changed))
+                        if ring is not None:
+                            ring.extend(changed)
+                except Exception as e:
+                    TICK_ERRORS.inc()
+                    print(f"An error occurred: {e}")
+    finally:
+        if write_queue is not None:
+            write_queue.close()
+        if candle_queue is not None:
+            candle_queue.close()
+        if ring is not None:
+            ring.close()
+        if exporter is not None:
+            exporter.close()
+
+    print(f"Scheduler: {scheduler.summary()}")
+    print(f"Deduplicator: {deduplicator.summary()}")
+    print(f"Latency: {metrics.summary()}")
+
+async def subscribe_market_data_async(symbols, stop_event, max_concurrency=10, interval=None, display=True):
+    """
+    Asynchronous variant of `subscribe_market_data`.
+
+    Every tick requests all chunks of the watchlist concurrently through an
+    `AsyncMarketDataClient`, keeping up to `max_concurrency` requests in flight
+    on the running event loop. Tickers are handed to the same write-behind queue as
+    the threaded engine after deduplication; enqueueing runs in the default executor so a blocking
+    backpressure policy never stalls the event loop.
+
+    Args:
+        symbols (str or list): The symbol, or list of symbols, to subscribe to for market data.
+        stop_event (threading.Event): The event that signals when to stop the subscription.
+        max_concurrency (int): The maximum number of /tickers requests in flight at once.
+        interval (float, optional): The polling period in seconds. Defaults to `Config.POLL_INTERVAL`.
+        display (bool): Whether to print every tick. Headless runs turn it off.
+    """
+    # Imported here so that aiohttp is only loaded when the async engine is used
+    from app.async_fetch_data import AsyncMarketDataClient
+
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    chunks = chunk_symbols(symbols)
+    scheduler = FixedRateScheduler(interval or Config.POLL_INTERVAL, on_overrun=Config.POLL_OVERRUN)
+    loop = asyncio.get_running_loop()
+
+    if display:
+        print("Symbol     | Buy        | Sell       | High       | Low        | Open       | Last       | Volume     | Date")
+        print("-" * 110)
+
+    deduplicator = TickDeduplicator()
+    aggregator = CandleAggregator(Config.CANDLE_INTERVALS)
+    write_queue = candle_queue = ring = exporter = None
+    try:
+        # Started inside the try, as in `subscribe_market_data`
+        write_queue = create_write_queue()
+        candle_queue = create_write_queue(store_candles, f"{Config.WRITE_SPILL_PATH}.candles", "candles")
+        ring = open_ring_buffer()
+        exporter = start_metrics_exporter()
+        with stop_retries_on(stop_event):
+            async with AsyncMarketDataClient(max_concurrency=max_concurrency) as client:
+                async for _ in scheduler.run_async(stop_event):
+                    try:
+                        with TICK_SECONDS.time():
+                            with FETCH_SECONDS.time():
+                                market_data = await client.fetch_market_data_chunks(chunks)
+                            with PARSE_SECONDS.time():
+                                market_data = parse_ticks(market_data)
+                            TICKS.inc(len(market_data))
+
+                            if display:
+                                with RENDER_SECONDS.time():
+                                    print_market_data(market_data)
+                            changed = deduplicator.filter(market_data)
+                            quote_book.update(changed)
+                            await loop.run_in_executor(None, write_queue.put, changed)
+                            await loop.run_in_executor(None, candle_queue.put, aggregate_candles(aggregator, changed))
+                            if ring is not None:
+                                ring.extend(changed)
+                    except Exception as e:
+                        TICK_ERRORS.inc()
+                        print(f"An error occurred: {e}")
+    finally:
+        if write_queue is not None:
+            await loop.run_in_executor(None, write_queue.close)
+        if candle_queue is not None:
+            await loop.run_in_executor(None, candle_queue.close)
+        if ring is not None:
+            ring.close()
+        if exporter is not None:
+            exporter.close()
 
+    print(f"Scheduler: {scheduler.summary()}")
+    print(f"Deduplicator: {deduplicator.summary()}")
+    print(f"Latency: {metrics.summary()}")
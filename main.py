@@ -2,16 +2,21 @@ import threading
 import textwrap
 import time
 import signal
-from app.database import engine
-from app.fetch_data import fetch_symbols
-from app.workers import display_symbols, store_symbols, subscribe_market_data, display_market_data
+
+# The application modules are imported by the menu actions that use them, so the
+# menu shows up without waiting for SQLAlchemy, requests, NumPy or pyarrow to load.
 
 def init_db():
     """
-    Initializes the database by creating all the tables defined in the models.
+    Initializes the database by creating all the tables defined in the models,
+    then applies the storage backend's schema changes (see `app.storage`).
     """
+    from app.database import get_engine
     from app.models import Base
+    from app.storage import storage_backend
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    storage_backend(engine).prepare(engine)
 
 # Event to signal stopping the market data subscription
 stop_event = threading.Event()
@@ -24,7 +29,11 @@ def main_menu():
         '1': handle_view_symbols,
         '2': handle_subscribe_market_data,
         '3': handle_view_market_data,
-        '4': exit
+        '4': handle_backfill_candles,
+        '5': handle_archive_market_data,
+        '6': handle_run_collector,
+        '7': handle_view_quotes,
+        '8': exit
     }
 
     while True:
@@ -42,24 +51,33 @@ def print_menu():
         1. Consult and view available symbols
         2. Subscribe to market data. Press CTRL + C to stop the subscription.
         3. View stored market data
-        4. Exit
+        4. Build candles from stored market data
+        5. Archive old market data to Parquet
+        6. Run the sharded collector over all stored symbols. Press CTRL + C to stop it.
+        7. View the latest quotes and top movers of this session
+        8. Exit
     """))
 
 def handle_view_symbols():
     """
     Fetches and stores available symbols, then displays them.
+
+    The symbol list is served from `symbol_cache`, so repeated views do not
+    download it again until its TTL expires.
     """
+    from app.symbol_cache import symbol_cache
+    from app.workers import display_symbols, store_symbols_bulk
     print("\nFetching and storing symbols...")
-    symbols_data = fetch_symbols()
-    store_symbols(symbols_data)
+    symbols_data = symbol_cache.get()
+    store_symbols_bulk(symbols_data)
     display_symbols()
 
 def handle_subscribe_market_data():
     """
-    Handles the user's request to subscribe to market data for a specific symbol.
+    Handles the user's request to subscribe to market data for one or more symbols.
 
     This function does the following:
-    1. Prompts the user to enter the desired symbol.
+    1. Prompts the user to enter the desired symbols, separated by commas.
     2. Clears the global `stop_event` flag, indicating that the subscription should start.
     3. Creates a new daemon thread (`subscription_thread`) to run the `subscribe_market_data` function.
        - Daemon threads are automatically terminated when the main program exits.
@@ -73,16 +91,18 @@ def handle_subscribe_market_data():
     """
 
     global subscription_thread  # Access the global subscription_thread variable
+    from app.workers import subscribe_market_data
 
-    symbol = input("Enter the symbol to subscribe for market data: ")
-    print(textwrap.fill(f"Subscribing to market data for symbol: {symbol}", width=70))
+    entry = input("Enter the symbols to subscribe for market data (comma-separated): ")
+    symbols = [symbol.strip() for symbol in entry.split(",") if symbol.strip()]
+    print(textwrap.fill(f"Subscribing to market data for symbols: {', '.join(symbols)}", width=70))
     print("-" * 110)
 
     # Clear the stop event before starting a new subscription
     stop_event.clear()
 
     # Create and start a new thread for the subscription
-    subscription_thread = threading.Thread(target=subscribe_market_data, args=(symbol, stop_event))
+    subscription_thread = threading.Thread(target=subscribe_market_data, args=(symbols, stop_event))
     subscription_thread.daemon = True  # Set as a daemon thread
     subscription_thread.start()
 
@@ -99,10 +119,79 @@ def handle_subscribe_market_data():
 
 def handle_view_market_data():
     """
-    Displays the stored market data.
+    Displays the stored market data, optionally for one symbol and only the latest ticks.
     """
+    from app.workers import display_market_data
+    symbol = input("Enter the symbol to display (leave blank for all): ").strip() or None
+    last = input("Enter how many of the latest ticks to display (leave blank for all): ").strip()
+    try:
+        limit = parse_count(last)
+    except ValueError:
+        handle_invalid_input("The number of ticks must be a positive whole number.")
+        return
     print("\nDisplaying stored market data...")
-    display_market_data()
+    if limit:
+        display_market_data(symbol=symbol, limit=limit, tail=True)
+    else:
+        display_market_data(symbol=symbol)
+
+def handle_backfill_candles():
+    """
+    Builds the candles of every configured interval from the stored market data.
+    """
+    from app.candles import backfill_candles
+    from app.config import Config
+    print("\nBuilding candles from stored market data...")
+    backfill_candles(Config.CANDLE_INTERVALS)
+
+def handle_archive_market_data():
+    """
+    Moves market data older than the configured age into the Parquet archive.
+    """
+    from app.archive import archive_market_data
+    from app.config import Config
+    print(f"\nArchiving market data older than {Config.ARCHIVE_AFTER_DAYS} days to {Config.ARCHIVE_DIR}...")
+    archive_market_data()
+
+def handle_run_collector():
+    """
+    Runs the multi-process sharded collector over every stored symbol until Ctrl+C.
+
+    The symbol universe is read from the `symbols` table, so view the symbols
+    (option 1) at least once beforehand.
+    """
+    from app.collector import ShardedCollector
+    entry = input("Enter the number of worker processes (leave blank for one per CPU): ").strip()
+    try:
+        workers = parse_count(entry)
+    except ValueError:
+        handle_invalid_input("The number of worker processes must be a positive whole number.")
+        return
+    collector = ShardedCollector(workers=workers)
+
+    # Clear the stop event before starting; Ctrl+C sets it through the SIGINT handler
+    stop_event.clear()
+    collector.run(stop_event)
+    print(f"Collector: {collector.summary()}")
+
+def handle_view_quotes():
+    """
+    Displays the latest quote of every symbol received by this session's
+    subscriptions, with the biggest movers and volumes, without querying the database.
+    """
+    from app.quotes import quote_book, change
+    from app.workers import print_market_data
+    if not len(quote_book):
+        print("\nNo quotes yet; subscribe to market data first (option 2).")
+        return
+    print(f"\nLatest quotes ({quote_book.summary()}):")
+    print_market_data(quote_book.snapshot(sort=True))
+    print("\nTop movers since the 24h open:")
+    for tick in quote_book.top_movers(5):
+        print(f"{tick.symbol:<10} | {change(tick):+.2%} | {tick.last}")
+    print("\nTop 24h volume:")
+    for tick in quote_book.top_volume(5):
+        print(f"{tick.symbol:<10} | {tick.volume}")
 
 def handle_stop_subscription():
     """
@@ -111,6 +200,32 @@ def handle_stop_subscription():
     stop_event.set()
     print("\nMarket data subscription stopped.")
 
+def parse_count(entry):
+    """
+    Parses a count typed at a prompt.
+
+    Args:
+        entry (str): The stripped input.
+
+    Returns:
+        int: The count, or None if the entry is blank.
+
+    Raises:
+        ValueError: If the entry is not a positive whole number.
+    """
+    if not entry:
+        return None
+    count = int(entry)
+    if count <= 0:
+        raise ValueError(f"expected a positive count, got {count}")
+    return count
+
+def handle_invalid_input(message):
+    """
+    Informs the user that an entry is invalid.
+    """
+    print(textwrap.fill(f"Invalid input. {message} Please try again.", width=70))
+
 def handle_invalid_choice():
     """
     Informs the user that the choice is invalid.
@@ -0,0 +1,26 @@
+"""Unique market data per symbol and date
+
+Revision ID: 3a7c52e9d1f4
+Revises: e1919537ddb6
+Create Date: 2024-07-12 10:24:41.518
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3a7c52e9d1f4'
+down_revision = 'e1919537ddb6'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Keep only the first snapshot of every (symbol, date) pair so the unique index can be built
+    op.execute(
+        "DELETE FROM market_data WHERE id NOT IN "
+        "(SELECT MIN(id) FROM market_data GROUP BY symbol, date)"
+    )
+    op.create_index('ix_market_data_symbol_date', 'market_data', ['symbol', 'date'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_market_data_symbol_date', table_name='market_data')
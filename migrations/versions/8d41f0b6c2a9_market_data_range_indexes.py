@@ -0,0 +1,25 @@
+"""Market data range indexes
+
+Revision ID: 8d41f0b6c2a9
+Revises: 3a7c52e9d1f4
+Create Date: 2024-07-15 09:12:03.746
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8d41f0b6c2a9'
+down_revision = '3a7c52e9d1f4'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # The composite (symbol, date) index already serves symbol lookups, so the
+    # single-column symbol index only costs write throughput
+    op.drop_index('ix_market_data_symbol', table_name='market_data')
+    op.create_index('ix_market_data_date', 'market_data', ['date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_market_data_date', table_name='market_data')
+    op.create_index('ix_market_data_symbol', 'market_data', ['symbol'], unique=False)
@@ -0,0 +1,36 @@
+"""Candles
+
+Revision ID: c5e8a3f71b20
+Revises: 8d41f0b6c2a9
+Create Date: 2024-07-18 16:40:27.091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a3f71b20'
+down_revision = '8d41f0b6c2a9'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('candles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('symbol', sa.String(), nullable=False),
+    sa.Column('interval', sa.String(), nullable=False),
+    sa.Column('start', sa.Integer(), nullable=False),
+    sa.Column('open', sa.Float(), nullable=True),
+    sa.Column('high', sa.Float(), nullable=True),
+    sa.Column('low', sa.Float(), nullable=True),
+    sa.Column('close', sa.Float(), nullable=True),
+    sa.Column('volume', sa.Float(), nullable=True),
+    sa.Column('ticks', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_candles_symbol_interval_start', 'candles', ['symbol', 'interval', 'start'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_candles_symbol_interval_start', table_name='candles')
+    op.drop_table('candles')
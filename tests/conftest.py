@@ -0,0 +1,17 @@
+import pytest
+from app.fetch_data import TokenBucket, CircuitBreaker, RetryPolicy
+
+@pytest.fixture(autouse=True)
+def fetch_policy(monkeypatch):
+    """
+    Fixture that gives every test its own fetch policy.
+
+    The rate limiter, circuit breaker and retry policy in `app.fetch_data` are
+    shared by the whole process; this fixture replaces them with an unlimited
+    limiter, a closed breaker and near-instant backoff, so that failures
+    injected by one test neither trip the breaker nor slow down the next one.
+    Tests of the policy itself build their own instances.
+    """
+    monkeypatch.setattr("app.fetch_data.rate_limiter", TokenBucket(rate=None))
+    monkeypatch.setattr("app.fetch_data.circuit_breaker", CircuitBreaker())
+    monkeypatch.setattr("app.fetch_data.retry_policy", RetryPolicy(base=0.001, cap=0.01))
@@ -0,0 +1,93 @@
+"""
+Synthetic API payloads shared by the unit, performance and benchmark tests.
+
+The builders in this module mimic the shape of the Mercado Bitcoin /symbols and
+/tickers responses so that storage code can be exercised at arbitrary sizes
+without touching the network.
+"""
+from app.replay import Recordings, load_recordings
+from app.ticks import parse_ticks
+
+def synthetic_symbols(count, withdrawal_fee=0.0005):
+    """
+    Builds a column-oriented /symbols payload with `count` unique symbols.
+
+    Args:
+        count (int): The number of symbols to generate.
+        withdrawal_fee (float): The withdrawal fee assigned to every symbol.
+
+    Returns:
+        dict: A dictionary of parallel lists, as returned by `fetch_symbols`.
+    """
+    symbols = [f"S{i:05d}-BRL" for i in range(count)]
+    return {
+        'symbol': symbols,
+        'base-currency': [symbol.split('-')[0] for symbol in symbols],
+        'currency': ['BRL'] * count,
+        'description': [f"Synthetic asset {i}" for i in range(count)],
+        'exchange-listed': [True] * count,
+        'exchange-traded': [True] * count,
+        'minmovement': ['1'] * count,
+        'pricescale': [100000000] * count,
+        'session-regular': ['24x7'] * count,
+        'timezone': ['America/Sao_Paulo'] * count,
+        'type': ['CRYPTO'] * count,
+        'deposit-minimum': ['0.0001'] * count,
+        'withdraw-minimum': ['0.001'] * count,
+        'withdrawal-fee': [str(withdrawal_fee)] * count
+    }
+
+def synthetic_tickers(count, date=1720182706):
+    """
+    Builds a /tickers payload with one ticker per synthetic symbol.
+
+    Args:
+        count (int): The number of tickers to generate.
+        date (int): The exchange timestamp assigned to every ticker.
+
+    Returns:
+        list of dict: A list of tickers, as returned by `fetch_market_data`.
+    """
+    return [
+        {
+            'pair': f"S{i:05d}-BRL",
+            'buy': f"{30000 + i}.10",
+            'sell': f"{30001 + i}.90",
+            'high': f"{32000 + i}.00",
+            'low': f"{29000 + i}.00",
+            'open': f"{30500 + i}.00",
+            'last': f"{31000 + i}.50",
+            'vol': f"{10 + i}.12345678",
+            'date': date
+        }
+        for i in range(count)
+    ]
+
+def synthetic_ticks(count, date=1720182706):
+    """
+    Builds the parsed ticks of `synthetic_tickers`.
+
+    Args:
+        count (int): The number of ticks to generate.
+        date (int): The exchange timestamp assigned to every tick.
+
+    Returns:
+        list of Tick: A list of ticks, as returned by `parse_ticks`.
+    """
+    return parse_ticks(synthetic_tickers(count, date=date))
+
+def replay_recordings(count=100):
+    """
+    Returns the recorded API responses to replay, or synthetic ones.
+
+    The fixtures captured with `python -m app.replay record` are used when they
+    exist in `tests/recordings`; otherwise `count` synthetic symbols and tickers
+    stand in for them, so the offline suites run without any recording.
+
+    Args:
+        count (int): The number of synthetic symbols to use without recordings.
+
+    Returns:
+        Recordings: The responses for a `ReplayAdapter`.
+    """
+    return load_recordings() or Recordings(synthetic_symbols(count), {"ETag": '"synthetic"'}, synthetic_tickers(count))
@@ -0,0 +1,102 @@
+import math
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, MarketData
+from app.config import TestConfig
+from app.analytics import (
+    load_market_data_arrays, returns, rolling_mean, rolling_volatility, vwap,
+    traded_volume, spread_stats, summarize_market_data
+)
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope='module')
+def populated_database():
+    """
+    Fixture that stores 50 ticks of BTC-BRL and 50 of ETH-BRL in the test database.
+    """
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.query(MarketData).delete()
+        db.execute(MarketData.__table__.insert(), [
+            {'symbol': symbol, 'buy': 100.0 + i, 'sell': 101.0 + i, 'high': 0.0, 'low': 0.0,
+             'open': 0.0, 'last': 100.5 + i, 'volume': 10.0 + i, 'date': 1000 + i}
+            for i in range(50)
+            for symbol in ("BTC-BRL", "ETH-BRL")
+        ])
+        db.commit()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(autouse=True)
+def test_sessions(populated_database, monkeypatch):
+    """
+    Fixture that points the analytics functions at the test database.
+    """
+    monkeypatch.setattr("app.analytics.SessionLocal", TestingSessionLocal)
+
+def test_load_market_data_arrays_returns_columns():
+    """
+    Test that a symbol's range is loaded as a date-ordered structured array.
+    """
+    data = load_market_data_arrays("BTC-BRL", start=1010, end=1020)
+
+    assert data['date'].tolist() == list(range(1010, 1020))
+    assert data['last'][0] == 110.5
+    assert data.dtype['volume'] == np.float64
+
+def test_load_market_data_arrays_empty_range():
+    """
+    Test that an empty range yields an empty array with the same fields.
+    """
+    data = load_market_data_arrays("LTC-BRL")
+
+    assert len(data) == 0
+    assert 'last' in data.dtype.names
+
+def test_rolling_statistics_match_naive_computation():
+    """
+    Test the vectorized rolling mean and volatility against a direct computation.
+    """
+    prices = np.array([100.0, 101.0, 99.5, 102.0, 103.5, 101.0, 100.0])
+
+    means = rolling_mean(prices, 3)
+    volatility = rolling_volatility(prices, 3)
+
+    assert means == pytest.approx([np.mean(prices[i:i + 3]) for i in range(5)])
+    log_returns = np.diff(np.log(prices))
+    assert volatility == pytest.approx([np.std(log_returns[i:i + 3]) for i in range(4)])
+
+def test_returns_and_vwap():
+    """
+    Test simple returns, VWAP, and the traded volume estimate from the rolling volume.
+    """
+    assert returns([100.0, 110.0, 99.0]) == pytest.approx([0.1, -0.1])
+    assert vwap([10.0, 20.0], [1.0, 3.0]) == pytest.approx(17.5)
+    assert math.isnan(vwap([10.0], [0.0]))
+    assert traded_volume([10.0, 12.0, 11.0, 15.0]).tolist() == [0.0, 2.0, 0.0, 4.0]
+
+def test_spread_stats():
+    """
+    Test the spread statistics of a constant one-unit spread.
+    """
+    stats = spread_stats([99.0, 199.0], [101.0, 201.0])
+
+    assert stats["mean"] == 2.0
+    assert stats["std"] == 0.0
+    assert stats["mean_bps"] == pytest.approx((200.0 + 100.0) / 2)
+
+def test_summarize_market_data():
+    """
+    Test the end-to-end summary of a stored symbol.
+    """
+    summary = summarize_market_data("ETH-BRL", window=10)
+
+    assert summary["ticks"] == 50
+    assert summary["rolling_mean"] == pytest.approx(np.mean(np.arange(40, 50) + 100.5))
+    assert summary["spread"]["mean"] == pytest.approx(1.0)
+    assert summarize_market_data("LTC-BRL") is None
@@ -0,0 +1,175 @@
+import os
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, MarketData
+from app.config import TestConfig
+from app.archive import archive_market_data, read_archived_market_data, read_market_data_range, RANGE_SCHEMA
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+DAY = 86400
+# Midnight UTC of 2024-07-01
+START = 1719792000
+NOW = START + 40 * DAY
+
+@pytest.fixture
+def test_sessions(monkeypatch):
+    """
+    Fixture that stores four days of hourly ticks for two symbols in the test
+    database and points the archive and query functions at it.
+    """
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr("app.archive.SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+    with TestingSessionLocal() as db:
+        db.query(MarketData).delete()
+        db.execute(MarketData.__table__.insert(), [
+            {'symbol': symbol, 'buy': 1.0, 'sell': 2.0, 'high': 3.0, 'low': 0.5,
+             'open': 1.0, 'last': float(date), 'volume': 10.0, 'date': date}
+            for date in range(START, START + 4 * DAY, 3600)
+            for symbol in ("BTC-BRL", "ETH-BRL")
+        ])
+        db.commit()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def hot_dates():
+    """
+    Returns the dates still stored in the test database.
+    """
+    with TestingSessionLocal() as db:
+        return sorted(row[0] for row in db.query(MarketData.date))
+
+def test_archive_moves_old_rows_to_partitions(test_sessions, tmp_path):
+    """
+    Test that rows older than the cutoff are written to symbol and day partitions
+    and deleted from SQLite.
+
+    Asserts:
+        The first two days (2 symbols x 48 ticks) are archived, one directory per
+        symbol and day, and only newer rows remain in the table.
+    """
+    archived = archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+
+    assert archived == 96
+    assert sorted(os.listdir(tmp_path)) == ["symbol=BTC-BRL", "symbol=ETH-BRL"]
+    assert sorted(os.listdir(tmp_path / "symbol=BTC-BRL")) == ["day=2024-07-01", "day=2024-07-02"]
+    assert hot_dates()[0] == START + 2 * DAY
+
+    files = os.listdir(tmp_path / "symbol=BTC-BRL" / "day=2024-07-01")
+    table = pq.read_table(str(tmp_path / "symbol=BTC-BRL" / "day=2024-07-01" / files[0]))
+    assert table.num_rows == 24
+    assert "symbol" not in table.column_names
+
+def test_archive_with_nothing_old_is_a_no_op(test_sessions, tmp_path):
+    """
+    Test that archiving when no row is old enough writes nothing.
+    """
+    assert archive_market_data(max_age_days=60, archive_dir=str(tmp_path), now=NOW) == 0
+    assert os.listdir(tmp_path) == []
+    assert len(hot_dates()) == 192
+
+def test_range_combines_archive_and_hot_rows(test_sessions, tmp_path):
+    """
+    Test that a range spanning the archive cutoff returns every row once, in order.
+
+    Asserts:
+        The range returns the same rows before and after archiving, with
+        dictionary-encoded symbols.
+    """
+    before = read_market_data_range("ETH-BRL", START + DAY, START + 3 * DAY, archive_dir=str(tmp_path))
+    archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+    after = read_market_data_range("ETH-BRL", START + DAY, START + 3 * DAY, archive_dir=str(tmp_path))
+
+    assert after.schema == RANGE_SCHEMA
+    assert after.num_rows == 48
+    assert after.column("date").to_pylist() == list(range(START + DAY, START + 3 * DAY, 3600))
+    assert after.column("id").to_pylist() == before.column("id").to_pylist()
+    assert set(after.column("symbol").to_pylist()) == {"ETH-BRL"}
+
+def test_archive_reads_prune_partitions(test_sessions, tmp_path):
+    """
+    Test that a range read only opens the partitions matching its predicates.
+
+    Asserts:
+        After the other partitions are made unreadable, a range limited to one
+        symbol and day still succeeds.
+    """
+    archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+    for directory, _, files in os.walk(tmp_path):
+        if "symbol=BTC-BRL" in directory and "day=2024-07-02" in directory:
+            continue
+        for name in files:
+            with open(os.path.join(directory, name), "wb") as corrupted:
+                corrupted.write(b"not parquet")
+
+    table = read_archived_market_data("BTC-BRL", START + DAY + 3600, START + DAY + 7200, archive_dir=str(tmp_path))
+
+    assert table.column("date").to_pylist() == [START + DAY + 3600]
+
+def test_range_deduplicates_rows_archived_twice(test_sessions, tmp_path):
+    """
+    Test that rows present in both the archive and SQLite are returned once.
+    """
+    from app.archive import _write_partitions
+    from app.queries import stream_market_data
+
+    rows = [row for page in stream_market_data(symbol="BTC-BRL", end=START + DAY) for row in page]
+    _write_partitions(rows, str(tmp_path))
+
+    table = read_market_data_range("BTC-BRL", end=START + DAY, archive_dir=str(tmp_path))
+
+    assert table.num_rows == 24
+
+def test_rerun_after_interrupted_archive_is_idempotent(test_sessions, tmp_path, monkeypatch):
+    """
+    Test that a run interrupted between writing the partitions and deleting the
+    rows from SQLite can be rerun without duplicating rows.
+
+    Asserts:
+        Each partition holds a single file with its 24 rows, and the range
+        returns every row once, both before and after the rerun.
+    """
+    def interrupt(ids):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patched:
+        patched.setattr("app.archive._delete_rows", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+    interrupted = read_market_data_range("BTC-BRL", end=START + 2 * DAY, archive_dir=str(tmp_path))
+    archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+    rerun = read_market_data_range("BTC-BRL", end=START + 2 * DAY, archive_dir=str(tmp_path))
+
+    partition = tmp_path / "symbol=BTC-BRL" / "day=2024-07-01"
+    assert os.listdir(partition) == ["data.parquet"]
+    assert pq.read_table(str(partition / "data.parquet")).num_rows == 24
+    assert interrupted.num_rows == rerun.num_rows == 48
+    assert rerun.column("date").to_pylist() == list(range(START, START + 2 * DAY, 3600))
+
+def test_range_keeps_archived_rows_whose_ids_are_reused(test_sessions, tmp_path):
+    """
+    Test that archived rows are not hidden by new rows that reuse their ids.
+
+    Asserts:
+        After new ticks are stored with the ids of archived rows, the range
+        returns both the archived and the new rows.
+    """
+    archive_market_data(max_age_days=38, archive_dir=str(tmp_path), now=NOW)
+    archived_ids = read_archived_market_data("BTC-BRL", archive_dir=str(tmp_path)).column("id").to_pylist()
+    with TestingSessionLocal() as db:
+        db.execute(MarketData.__table__.insert(), [
+            {'id': row_id, 'symbol': "BTC-BRL", 'buy': 1.0, 'sell': 2.0, 'high': 3.0, 'low': 0.5,
+             'open': 1.0, 'last': 1.0, 'volume': 10.0, 'date': START + 10 * DAY + index}
+            for index, row_id in enumerate(archived_ids[:5])
+        ])
+        db.commit()
+
+    table = read_market_data_range("BTC-BRL", archive_dir=str(tmp_path))
+
+    assert table.num_rows == 96 + 5
+    assert table.column("date").to_pylist()[:48] == list(range(START, START + 2 * DAY, 3600))
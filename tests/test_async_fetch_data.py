@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.async_fetch_data import AsyncMarketDataClient
+from app.fetch_data import CircuitBreaker, RetryPolicy, stop_retries_on
+from tests.payloads import synthetic_symbols, synthetic_tickers
+
+def run_against_stub(scenario, delay=0.0, status=200):
+    """
+    Runs an async test scenario against a local aiohttp stub of the API.
+
+    The stub serves /symbols and /tickers with synthetic payloads, waiting `delay`
+    seconds before answering, and records the peak number of concurrent requests.
+
+    Args:
+        scenario (coroutine function): Receives the stub's base URL.
+        delay (float): The artificial latency of every response, in seconds.
+        status (int): The HTTP status of every response.
+
+    Returns:
+        tuple: The scenario's result and the peak number of requests in flight.
+    """
+    state = {"in_flight": 0, "peak": 0}
+
+    async def tickers(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(delay)
+        state["in_flight"] -= 1
+        symbols = request.query["symbols"].split(",")
+        return web.json_response(synthetic_tickers(len(symbols)), status=status)
+
+    async def symbols(request):
+        return web.json_response(synthetic_symbols(3), status=status)
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/symbols", symbols)
+        app.router.add_get("/tickers", tickers)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            return await scenario(str(server.make_url("/")))
+        finally:
+            await server.close()
+
+    result = asyncio.run(main())
+    return result, state["peak"]
+
+def test_fetch_symbols_matches_sync_shape():
+    """
+    Test that the async `fetch_symbols` returns the column-oriented symbol payload.
+
+    Asserts:
+        The returned data contains the 'symbol' and 'base-currency' columns.
+    """
+    async def scenario(url):
+        async with AsyncMarketDataClient(api_url=url) as client:
+            return await client.fetch_symbols()
+
+    data, _ = run_against_stub(scenario)
+
+    assert "symbol" in data
+    assert len(data["base-currency"]) == 3
+
+def test_fetch_market_data_chunks_bounds_concurrency():
+    """
+    Test that chunked requests run concurrently, up to the configured bound.
+
+    Asserts:
+        All tickers of all chunks are returned.
+        More than one request was in flight, but never more than `max_concurrency`.
+    """
+    chunks = [[f"S{i:05d}-BRL", f"S{i + 1:05d}-BRL"] for i in range(0, 40, 2)]
+
+    async def scenario(url):
+        async with AsyncMarketDataClient(api_url=url, max_concurrency=4) as client:
+            return await client.fetch_market_data_chunks(chunks)
+
+    data, peak = run_against_stub(scenario, delay=0.05)
+
+    assert len(data) == 40
+    assert 1 < peak <= 4
+
+def test_http_errors_raise_requests_exceptions():
+    """
+    Test that HTTP error statuses surface as `requests.HTTPError`, like the sync API.
+
+    Asserts:
+        A 500 response raises `requests.HTTPError`.
+    """
+    async def scenario(url):
+        async with AsyncMarketDataClient(api_url=url) as client:
+            return await client.fetch_market_data(["BTC-BRL"])
+
+    with pytest.raises(requests.HTTPError):
+        run_against_stub(scenario, status=500)
+
+def test_connection_errors_raise_request_exception():
+    """
+    Test that connection failures surface as `requests.RequestException`.
+
+    Asserts:
+        Requesting a closed local port raises `requests.RequestException`.
+    """
+    async def scenario():
+        async with AsyncMarketDataClient(api_url="http://127.0.0.1:9/") as client:
+            return await client.fetch_symbols()
+
+    with pytest.raises(requests.RequestException):
+        asyncio.run(scenario())
+
+def test_transient_errors_are_retried():
+    """
+    Test that the async client retries 503s and honors Retry-After on 429s.
+
+    Asserts:
+        The tickers are returned after two failed attempts.
+    """
+    attempts = []
+
+    async def tickers(request):
+        attempts.append(request.path)
+        if len(attempts) == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0"})
+        if len(attempts) == 2:
+            return web.json_response({}, status=503)
+        return web.json_response(synthetic_tickers(1))
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/tickers", tickers)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with AsyncMarketDataClient(api_url=str(server.make_url("/"))) as client:
+                return await client.fetch_market_data(["BTC-BRL"])
+        finally:
+            await server.close()
+
+    data = asyncio.run(main())
+
+    assert len(data) == 1
+    assert len(attempts) == 3
+
+def test_cancelled_half_open_trial_reopens_the_circuit():
+    """
+    Test that cancelling the half-open trial request, e.g. on a timeout, opens
+    the circuit again instead of leaving it half-open forever.
+    """
+    now = [100.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] += 30
+
+    async def scenario(url):
+        async with AsyncMarketDataClient(api_url=url) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.fetch_market_data(["BTC-BRL"]), timeout=0.05)
+
+    with patch("app.fetch_data.circuit_breaker", breaker):
+        run_against_stub(scenario, delay=0.5)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_stop_event_interrupts_the_backoff():
+    """
+    Test that setting the event given to `stop_retries_on` ends a long backoff
+    of the async client and raises the last error instead of retrying.
+    """
+    async def scenario(url):
+        async with AsyncMarketDataClient(api_url=url) as client:
+            return await client.fetch_market_data(["BTC-BRL"])
+
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+    start = time.monotonic()
+
+    with patch("app.fetch_data.retry_policy", RetryPolicy(base=60.0, cap=60.0, random=lambda: 1.0)), \
+         stop_retries_on(stop_event):
+        with pytest.raises(requests.HTTPError):
+            run_against_stub(scenario, status=503)
+
+    assert time.monotonic() - start < 5.0
@@ -1,10 +1,27 @@
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+import numpy as np
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, func
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, Symbol, MarketData
 from app.config import TestConfig
-from app.fetch_data import fetch_symbols, fetch_market_data
-from app.workers import store_symbols, store_market_data
+from app.database import create_database_engine
+from app.decoding import available_decoders, decode_json, decode_ticks
+from app.analytics import MARKET_DATA_DTYPE, rolling_mean, rolling_volatility, vwap, traded_volume, spread_stats, returns
+from app.fetch_data import fetch_symbols, fetch_market_data, fetch_ticks, chunk_symbols
+from app.replay import ReplayAdapter, replay
+from app.quotes import QuoteBook, change
+from app.scheduler import FixedRateScheduler
+from app.ticks import parse_ticks
+from app.workers import store_symbols, store_symbols_bulk, store_market_data, fetch_market_data_chunks, subscribe_market_data
+from tests.payloads import synthetic_symbols, synthetic_tickers, replay_recordings
 
 # Database configuration for tests
 engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
@@ -30,8 +47,33 @@ def db_session(setup_database):
     session.rollback()
     session.close()
 
+@pytest.fixture(scope='function')
+def test_sessions(setup_database, monkeypatch):
+    """
+    Fixture that points the worker functions at the test database.
+    """
+    monkeypatch.setattr("app.workers.SessionLocal", TestingSessionLocal)
+    return TestingSessionLocal
+
+def _clear_table(model):
+    """
+    Deletes every row of the given model's table in the test database.
+    """
+    with TestingSessionLocal() as session:
+        session.query(model).delete()
+        session.commit()
+
+@pytest.fixture
+def replayed_api():
+    """
+    Fixture that serves the API from recorded responses (see `app.replay`), so the
+    benchmarks measure the application rather than the network and run offline.
+    """
+    with replay(ReplayAdapter(replay_recordings())) as adapter:
+        yield adapter
+
 @pytest.mark.benchmark(group="fetch_symbols")
-def test_benchmark_fetch_symbols(benchmark):
+def test_benchmark_fetch_symbols(benchmark, replayed_api):
     """
     Benchmark for fetch_symbols function.
     """
@@ -39,41 +81,371 @@ def test_benchmark_fetch_symbols(benchmark):
     assert result is not None
 
 @pytest.mark.benchmark(group="store_symbols")
-def test_benchmark_store_symbols(benchmark, db_session):
+def test_benchmark_store_symbols(benchmark, test_sessions, replayed_api):
     """
     Benchmark for store_symbols function.
     """
-    db_session.query(Symbol).delete()
-    db_session.commit()
+    _clear_table(Symbol)
     symbols_data = fetch_symbols()
-
-    def store():
-        store_symbols(symbols_data)
-        db_session.commit()
-
-    benchmark(store)
+    benchmark(store_symbols, symbols_data)
 
 @pytest.mark.benchmark(group="fetch_market_data")
-def test_benchmark_fetch_market_data(benchmark):
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_benchmark_fetch_market_data(benchmark, replayed_api, count):
     """
-    Benchmark for fetch_market_data function.
+    Benchmark for fetching and decoding the tickers of a `count` symbol watchlist,
+    one /tickers request per URL-length-safe chunk.
     """
-    symbols = ["BTC-BRL"]
-    result = benchmark(lambda: fetch_market_data(symbols))
-    assert result is not None
+    chunks = chunk_symbols([f"S{i:05d}-BRL" for i in range(count)])
+    result = benchmark(fetch_market_data_chunks, chunks)
+    assert len(result) == count
 
 @pytest.mark.benchmark(group="store_market_data")
-def test_benchmark_store_market_data(benchmark, db_session):
+def test_benchmark_store_market_data(benchmark, test_sessions, replayed_api):
     """
     Benchmark for store_market_data function.
+
+    Every round stores the replayed tickers under a new date so that no ticker
+    collides with the unique (symbol, date) index.
+    """
+    _clear_table(MarketData)
+    market_data = fetch_market_data(["BTC-BRL"])
+    dates = itertools.count(1720182706)
+    benchmark.pedantic(
+        store_market_data,
+        setup=lambda: (([dict(item, date=next(dates)) for item in market_data],), {}),
+        rounds=50, iterations=1
+    )
+
+@pytest.mark.benchmark(group="subscribe_tick_rate")
+@pytest.mark.parametrize("count", [10, 1000])
+@pytest.mark.parametrize("rate", [10, 50])
+def test_benchmark_subscribe_tick_rate(benchmark, test_sessions, monkeypatch, count, rate):
+    """
+    Benchmark for a subscription polling a `count` symbol watchlist at `rate` ticks
+    per second against the replayed API with 5 ms of latency per request.
+
+    A run stops after 20 ticks, so a subscription that keeps up takes 20 / rate
+    seconds; the scheduler's overruns and jitter are reported in the extra info.
+    """
+    monkeypatch.setattr("app.workers.store_candles", lambda candles: len(candles))
+    symbols = [f"S{i:05d}-BRL" for i in range(count)]
+    stats = []
+
+    def subscribe():
+        stop_event = threading.Event()
+        fetched = itertools.count(1)
+        real_fetch_ticks = fetch_ticks
+
+        def fetch_and_count(chunk):
+            # New dates every poll, so deduplication lets every tick through
+            ticks = real_fetch_ticks(chunk)
+            for tick in ticks:
+                tick.date += next(dates)
+            if next(fetched) >= 20 * len(chunks):
+                stop_event.set()
+            return ticks
+
+        with patch("app.workers.fetch_ticks", side_effect=fetch_and_count), \
+             patch("app.workers.FixedRateScheduler", side_effect=recording_scheduler):
+            subscribe_market_data(symbols, stop_event, interval=1 / rate)
+
+    def recording_scheduler(*args, **kwargs):
+        scheduler = FixedRateScheduler(*args, **kwargs)
+        stats.append(scheduler)
+        return scheduler
+
+    chunks = chunk_symbols(symbols)
+    dates = itertools.count(1)
+    _clear_table(MarketData)
+    with replay(ReplayAdapter(replay_recordings(), latency=0.005)):
+        benchmark.pedantic(subscribe, rounds=3, iterations=1)
+
+    benchmark.extra_info["overruns"] = sum(scheduler.overruns for scheduler in stats)
+    benchmark.extra_info["max_jitter_ms"] = max(scheduler.max_jitter for scheduler in stats) * 1000
+
+@pytest.mark.benchmark(group="store_symbols_synthetic")
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_benchmark_store_symbols_per_row(benchmark, test_sessions, count):
+    """
+    Benchmark for the per-symbol SELECT path of store_symbols on synthetic data.
+    """
+    symbols_data = synthetic_symbols(count)
+    benchmark.pedantic(
+        store_symbols, args=(symbols_data,),
+        setup=lambda: _clear_table(Symbol), rounds=3, iterations=1
+    )
+
+@pytest.mark.benchmark(group="store_symbols_synthetic")
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_benchmark_store_symbols_bulk(benchmark, test_sessions, count):
+    """
+    Benchmark for the bulk executemany path of store_symbols_bulk on synthetic data.
+    """
+    symbols_data = synthetic_symbols(count)
+    benchmark.pedantic(
+        store_symbols_bulk, args=(symbols_data,),
+        setup=lambda: _clear_table(Symbol), rounds=3, iterations=1
+    )
+
+@pytest.mark.benchmark(group="refresh_symbols_synthetic")
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_benchmark_refresh_symbols_bulk(benchmark, test_sessions, count):
+    """
+    Benchmark for store_symbols_bulk refreshing a fully populated table in which
+    every symbol's withdrawal fee changed.
+    """
+    _clear_table(Symbol)
+    store_symbols_bulk(synthetic_symbols(count))
+    fees = iter(range(1, 1000))
+
+    def refresh():
+        store_symbols_bulk(synthetic_symbols(count, withdrawal_fee=next(fees) / 1000))
+
+    benchmark.pedantic(refresh, rounds=3, iterations=1)
+
+@pytest.mark.benchmark(group="store_market_data_synthetic")
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_benchmark_store_market_data_orm(benchmark, test_sessions, count):
+    """
+    Benchmark for store_market_data building ORM objects on a fake /tickers payload.
+
+    Every round uses a new date so that no ticker collides with the unique
+    (symbol, date) index.
+    """
+    _clear_table(MarketData)
+    dates = itertools.count(1720182706)
+    benchmark.pedantic(
+        lambda market_data: store_market_data(market_data, return_objects=True),
+        setup=lambda: ((synthetic_tickers(count, date=next(dates)),), {}),
+        rounds=50, iterations=1
+    )
+
+@pytest.mark.benchmark(group="store_market_data_synthetic")
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_benchmark_store_market_data_core(benchmark, test_sessions, count):
+    """
+    Benchmark for the Core executemany path of store_market_data on a fake /tickers payload.
+
+    Every round uses a new date so that no ticker collides with the unique
+    (symbol, date) index.
+    """
+    _clear_table(MarketData)
+    dates = itertools.count(1720182706)
+    benchmark.pedantic(
+        store_market_data,
+        setup=lambda: ((synthetic_tickers(count, date=next(dates)),), {}),
+        rounds=50, iterations=1
+    )
+
+@pytest.mark.benchmark(group="decode_tickers")
+@pytest.mark.parametrize("decoder", available_decoders())
+@pytest.mark.parametrize("count", [100, 1000])
+def test_benchmark_decode_ticks(benchmark, decoder, count):
     """
-    db_session.query(MarketData).delete()
-    db_session.commit()
-    symbols = ["BTC-BRL"]
-    market_data = fetch_market_data(symbols)
+    Benchmark for decoding a /tickers response body into ticks with each decoder.
+    """
+    content = json.dumps(synthetic_tickers(count)).encode()
+    ticks = benchmark(decode_ticks, content, decoder)
+    assert ticks == parse_ticks(synthetic_tickers(count))
+
+@pytest.mark.benchmark(group="decode_symbols")
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_benchmark_decode_symbols(benchmark, decoder):
+    """
+    Benchmark for decoding a 1000 symbol /symbols response body with each decoder.
+    """
+    content = json.dumps(synthetic_symbols(1000)).encode()
+    benchmark(decode_json, content, decoder)
+
+@pytest.mark.benchmark(group="sqlite_profiles")
+@pytest.mark.parametrize("profile", ["default", "safe", "fast"])
+def test_benchmark_sqlite_profile_writes(benchmark, tmp_path, monkeypatch, profile):
+    """
+    Benchmark for committing one 10-ticker batch per tick under each SQLite profile,
+    while a concurrent reader keeps querying the latest date.
 
-    def store():
-        store_market_data(market_data)
-        db_session.commit()
+    The number of reads the reader completed during the benchmark is reported as
+    `reads` in the benchmark's extra info.
+    """
+    profile_engine = create_database_engine(f"sqlite:///{tmp_path / 'profile.db'}", profile=profile, overrides={})
+    Base.metadata.create_all(bind=profile_engine)
+    monkeypatch.setattr("app.workers.SessionLocal", sessionmaker(bind=profile_engine))
+    dates = itertools.count(1720182706)
+    stop_reading = threading.Event()
+    reads = []
+
+    def reader():
+        while not stop_reading.is_set():
+            with profile_engine.connect() as connection:
+                connection.execute(select(func.max(MarketData.date))).scalar()
+            reads.append(1)
+
+    def write_ticks():
+        for _ in range(20):
+            store_market_data(synthetic_tickers(10, date=next(dates)))
 
-    benchmark(store)
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    reader_thread.start()
+    try:
+        benchmark.pedantic(write_ticks, rounds=5, iterations=1)
+    finally:
+        stop_reading.set()
+        reader_thread.join()
+        profile_engine.dispose()
+    benchmark.extra_info["reads"] = len(reads)
+
+@pytest.mark.benchmark(group="storage_backends")
+@pytest.mark.parametrize("backend", ["sqlite", "postgresql"])
+def test_benchmark_storage_backend_writes(benchmark, tmp_path, monkeypatch, backend):
+    """
+    Benchmark for storing 1000-ticker batches through each storage backend: an
+    INSERT OR IGNORE executemany on SQLite, a COPY through a staging table on
+    PostgreSQL. PostgreSQL runs against POSTGRES_TEST_URL and is skipped without it.
+    """
+    if backend == "sqlite":
+        url = f"sqlite:///{tmp_path / 'backend.db'}"
+    elif os.getenv("POSTGRES_TEST_URL"):
+        url = os.getenv("POSTGRES_TEST_URL")
+    else:
+        pytest.skip("POSTGRES_TEST_URL is not set")
+    backend_engine = create_database_engine(url)
+    Base.metadata.drop_all(bind=backend_engine)
+    Base.metadata.create_all(bind=backend_engine)
+    monkeypatch.setattr("app.workers.SessionLocal", sessionmaker(bind=backend_engine))
+    dates = itertools.count(1720182706)
+
+    try:
+        inserted = benchmark.pedantic(lambda: store_market_data(synthetic_tickers(1000, date=next(dates))),
+                                      rounds=10, iterations=1)
+    finally:
+        Base.metadata.drop_all(bind=backend_engine)
+        backend_engine.dispose()
+    assert inserted == 1000
+
+@pytest.fixture(scope='module')
+def quote_book_10k():
+    """
+    Fixture providing a quote book of 10k synthetic symbols, each updated 5 times.
+    """
+    book = QuoteBook()
+    for date in range(1720182706, 1720182711):
+        book.update(parse_ticks(synthetic_tickers(10_000, date=date)))
+    return book
+
+@pytest.mark.benchmark(group="quote_book_top10")
+def test_benchmark_quote_book_top_heap(benchmark, quote_book_10k):
+    """
+    Benchmark for the top 10 movers of 10k quotes from the incremental heap.
+    """
+    result = benchmark(quote_book_10k.top_movers, 10)
+    assert len(result) == 10
+
+@pytest.mark.benchmark(group="quote_book_top10")
+def test_benchmark_quote_book_top_sort(benchmark, quote_book_10k):
+    """
+    Benchmark for the same top 10 computed by sorting a snapshot of the book.
+    """
+    result = benchmark(lambda: sorted(quote_book_10k.snapshot(), key=lambda tick: -abs(change(tick)))[:10])
+    assert len(result) == 10
+
+def _synthetic_market_data_arrays(count):
+    """
+    Builds a random-walk market data array with `count` rows, as returned by
+    `load_market_data_arrays`.
+    """
+    rng = np.random.default_rng(42)
+    data = np.zeros(count, dtype=MARKET_DATA_DTYPE)
+    data['date'] = np.arange(1720182706, 1720182706 + count)
+    data['last'] = 300000.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, count)))
+    data['buy'] = data['last'] - rng.uniform(1, 50, count)
+    data['sell'] = data['last'] + rng.uniform(1, 50, count)
+    data['volume'] = np.cumsum(rng.uniform(0, 0.01, count))
+    return data
+
+def _analytics_vectorized(data, window=60):
+    """
+    Computes VWAP, rolling mean and volatility, returns and spread statistics with NumPy.
+    """
+    last = data['last']
+    return (
+        vwap(last, traded_volume(data['volume'])),
+        rolling_mean(last, window)[-1],
+        rolling_volatility(last, window)[-1],
+        returns(last)[-1],
+        spread_stats(data['buy'], data['sell'])["mean"],
+    )
+
+def _analytics_per_row(rows, window=60):
+    """
+    Computes the same statistics as `_analytics_vectorized` with a per-row Python loop
+    over (last, buy, sell, volume) tuples, using running sums for the rolling windows.
+    """
+    weighted = traded_total = spread_total = 0.0
+    window_sum = 0.0
+    window_prices = []
+    window_returns = []
+    return_sum = return_square_sum = 0.0
+    previous_price = previous_volume = None
+    last_return = mean = volatility = 0.0
+    for last, buy, sell, volume in rows:
+        traded = max(volume - previous_volume, 0.0) if previous_volume is not None else 0.0
+        weighted += last * traded
+        traded_total += traded
+        spread_total += sell - buy
+        window_prices.append(last)
+        window_sum += last
+        if len(window_prices) > window:
+            window_sum -= window_prices.pop(0)
+        mean = window_sum / len(window_prices)
+        if previous_price is not None:
+            last_return = last / previous_price - 1.0
+            log_return = math.log(last / previous_price)
+            window_returns.append(log_return)
+            return_sum += log_return
+            return_square_sum += log_return * log_return
+            if len(window_returns) > window:
+                dropped = window_returns.pop(0)
+                return_sum -= dropped
+                return_square_sum -= dropped * dropped
+            count = len(window_returns)
+            volatility = math.sqrt(max(return_square_sum / count - (return_sum / count) ** 2, 0.0))
+        previous_price = last
+        previous_volume = volume
+    return weighted / traded_total, mean, volatility, last_return, spread_total / len(rows)
+
+@pytest.fixture(scope='module')
+def million_rows():
+    """
+    Fixture providing 1M synthetic market data rows as an array and as row tuples.
+    """
+    data = _synthetic_market_data_arrays(1_000_000)
+    rows = list(zip(data['last'].tolist(), data['buy'].tolist(), data['sell'].tolist(), data['volume'].tolist()))
+    return data, rows
+
+@pytest.mark.benchmark(group="analytics_1m_rows")
+def test_benchmark_analytics_vectorized(benchmark, million_rows):
+    """
+    Benchmark for the vectorized NumPy analytics on 1M synthetic rows.
+    """
+    data, rows = million_rows
+    result = benchmark.pedantic(_analytics_vectorized, args=(data,), rounds=5, iterations=1)
+    assert result == pytest.approx(_analytics_per_row(rows), rel=1e-6)
+
+@pytest.mark.benchmark(group="analytics_1m_rows")
+def test_benchmark_analytics_per_row(benchmark, million_rows):
+    """
+    Benchmark for the equivalent per-row Python loop on 1M synthetic rows.
+    """
+    _, rows = million_rows
+    benchmark.pedantic(_analytics_per_row, args=(rows,), rounds=3, iterations=1)
+
+@pytest.mark.benchmark(group="cold_start")
+@pytest.mark.parametrize("module", ["main", "app.cli", "app.database", "app.workers"])
+def test_benchmark_cold_start(benchmark, module):
+    """
+    Benchmark for the startup time of a fresh interpreter importing `module`.
+    """
+    command = [sys.executable, "-c", f"import {module}"]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    benchmark.pedantic(subprocess.run, args=(command,), kwargs={"cwd": root, "check": True}, rounds=5, iterations=1)
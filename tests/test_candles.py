@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, Candle, MarketData
+from app.config import TestConfig
+from app.candles import CandleAggregator, backfill_candles, store_candles
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope='module')
+def setup_database():
+    """
+    Fixture to set up the database schema before any tests run, and tear it down afterwards.
+    """
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope='function')
+def test_sessions(setup_database, monkeypatch):
+    """
+    Fixture that points the candle and query functions at an empty test database.
+    """
+    monkeypatch.setattr("app.candles.SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+    with TestingSessionLocal() as session:
+        session.query(Candle).delete()
+        session.query(MarketData).delete()
+        session.commit()
+    return TestingSessionLocal
+
+def test_candle_closes_when_next_interval_starts():
+    """
+    Test that a candle accumulates OHLC within its interval and closes on rollover.
+
+    Asserts:
+        No candle is closed while ticks stay in the same minute.
+        The first tick of the next minute closes the candle with the expected values.
+    """
+    aggregator = CandleAggregator(["1m"])
+
+    assert aggregator.add("BTC-BRL", 100.0, 10.0, 120) == []
+    assert aggregator.add("BTC-BRL", 105.0, 12.0, 130) == []
+    assert aggregator.add("BTC-BRL", 95.0, 11.0, 150) == []
+    closed = aggregator.add("BTC-BRL", 101.0, 13.5, 185)
+
+    assert closed == [{
+        'symbol': "BTC-BRL", 'interval': "1m", 'start': 120,
+        'open': 100.0, 'high': 105.0, 'low': 95.0, 'close': 95.0,
+        'volume': 2.0, 'ticks': 3
+    }]
+    assert aggregator.open_candles()[0]['volume'] == 2.5
+
+def test_intervals_close_independently():
+    """
+    Test that each interval closes on its own boundary.
+    """
+    aggregator = CandleAggregator(["1m", "5m"])
+    aggregator.add("ETH-BRL", 10.0, 1.0, 0)
+
+    closed = aggregator.add("ETH-BRL", 11.0, 1.0, 60)
+    assert [candle['interval'] for candle in closed] == ["1m"]
+
+    closed = aggregator.add("ETH-BRL", 12.0, 1.0, 300)
+    assert sorted(candle['interval'] for candle in closed) == ["1m", "5m"]
+
+def test_close_expired_closes_idle_symbols():
+    """
+    Test that candles of symbols without new ticks are closed once their interval ends.
+    """
+    aggregator = CandleAggregator(["1m", "1h"])
+    aggregator.add("LTC-BRL", 10.0, 1.0, 3600)
+
+    closed = aggregator.close_expired(now=3660)
+
+    assert [candle['interval'] for candle in closed] == ["1m"]
+    assert [candle['interval'] for candle in aggregator.open_candles()] == ["1h"]
+
+def test_backfill_builds_closed_candles(test_sessions):
+    """
+    Test that the backfill streams stored market data into closed candles.
+
+    Two symbols get one tick every 10 seconds for three minutes.
+
+    Asserts:
+        Three 1m candles per symbol are stored, with prices from the stored ticks.
+        Running the backfill twice replaces rather than duplicates candles.
+    """
+    with test_sessions() as db:
+        db.execute(MarketData.__table__.insert(), [
+            {'symbol': symbol, 'buy': 0.0, 'sell': 0.0, 'high': 0.0, 'low': 0.0, 'open': 0.0,
+             'last': float(date), 'volume': float(date), 'date': date}
+            for date in range(600, 780, 10)
+            for symbol in ("BTC-BRL", "ETH-BRL")
+        ])
+        db.commit()
+
+    assert backfill_candles(["1m"], page_size=7) == 6
+    backfill_candles(["1m"])
+
+    with test_sessions() as db:
+        candles = db.query(Candle).filter_by(symbol="BTC-BRL").order_by(Candle.start).all()
+        assert db.query(Candle).count() == 6
+    assert [candle.start for candle in candles] == [600, 660, 720]
+    assert (candles[0].open, candles[0].high, candles[0].low, candles[0].close) == (600.0, 650.0, 600.0, 650.0)
+    assert candles[1].volume == 60.0
+    assert candles[0].ticks == 6
+
+def test_late_partial_candle_completes_the_stored_one(test_sessions):
+    """
+    Test that a candle reopened by a late tick after `close_expired` is merged
+    into the stored candle of its interval instead of overwriting it.
+    """
+    aggregator = CandleAggregator(["1m"])
+    aggregator.add("BTC-BRL", 100.0, 10.0, 120)
+    aggregator.add("BTC-BRL", 110.0, 12.0, 130)
+    aggregator.add("BTC-BRL", 90.0, 13.0, 140)
+    store_candles(aggregator.close_expired(now=180))
+    aggregator.add("BTC-BRL", 95.0, 14.0, 170)
+    store_candles(aggregator.close_expired(now=240))
+
+    with test_sessions() as db:
+        candles = db.query(Candle).all()
+    assert [(candle.start, candle.open, candle.high, candle.low, candle.close, candle.volume, candle.ticks)
+            for candle in candles] == [(120, 100.0, 110.0, 90.0, 95.0, 4.0, 4)]
@@ -0,0 +1,228 @@
+import argparse
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.cli import build_parser, main, parse_date, parse_symbols
+from app.config import Config, TestConfig
+from app.models import Base, MarketData
+from app.workers import store_market_data
+from tests.payloads import synthetic_tickers
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Root of the repository, the working directory of the CLI subprocesses
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_command(args):
+    """
+    Parses and runs a command in-process, without installing signal handlers.
+
+    Returns:
+        int: The command's exit status.
+    """
+    parsed = build_parser().parse_args(args)
+    return parsed.handler(parsed, threading.Event())
+
+def cli_environment(tmp_path, **overrides):
+    """
+    Returns the environment of a CLI subprocess: a throwaway database and an
+    unreachable API that fails fast.
+    """
+    environment = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'cli.db'}", API_URL="http://127.0.0.1:9/",
+                       FETCH_MAX_RETRIES="0", SYMBOLS_CACHE_PATH="", WRITE_SPILL_PATH=str(tmp_path / "spill.jsonl"))
+    environment.update(overrides)
+    return environment
+
+@pytest.fixture
+def stored_market_data(monkeypatch):
+    """
+    Fixture that stores two dates of three synthetic tickers in the test database.
+    """
+    monkeypatch.setattr("app.workers.SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as session:
+        session.query(MarketData).delete()
+        session.commit()
+    store_market_data(synthetic_tickers(3, date=1720182706))
+    store_market_data(synthetic_tickers(3, date=1720182707))
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_argument_parsing():
+    """
+    Test the parsing of watchlists, dates and pacing options.
+    """
+    args = build_parser().parse_args(["collect", "--symbols", "BTC-BRL, ETH-BRL,", "--rate", "4"])
+
+    assert args.symbols == ["BTC-BRL", "ETH-BRL"]
+    assert args.rate == 4.0
+    assert build_parser().parse_args(["collect", "--workers", "3"]).workers == 3
+    assert parse_symbols("A") == ["A"]
+    assert parse_date("1720182706") == 1720182706
+    assert parse_date("2024-07-05") == 1720137600
+    assert parse_date("2024-07-05T12:00:00-03:00") == 1720191600
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_date("yesterday")
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["collect", "--rate", "4", "--interval", "1"])
+    for invalid in (["collect", "--rate", "0"], ["collect", "--interval", "-1"], ["bench", "--rate", "0"],
+                    ["bench", "--rate", "fast"], ["collect", "--workers", "0"], ["collect", "--concurrency", "0"],
+                    ["collect", "--workers", "2.5"], ["export", "--limit", "-1"], ["bench", "--count", "-5"]):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(invalid)
+
+def test_cli_imports_application_modules_lazily():
+    """
+    Test that importing the CLI and printing its help loads none of the heavy
+    dependencies, so the entry point starts fast.
+    """
+    code = ("import sys, app.cli; "
+            "print(sorted(name for name in ('sqlalchemy', 'requests', 'numpy', 'pyarrow', 'aiohttp', 'app.workers') "
+            "if name in sys.modules))")
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    help_result = subprocess.run([sys.executable, "-m", "app", "--help"], cwd=ROOT, capture_output=True, text=True)
+
+    assert result.stdout.strip() == "[]"
+    assert help_result.returncode == 0
+    assert "sync-symbols" in help_result.stdout
+
+def test_export_csv_and_jsonl(stored_market_data, tmp_path):
+    """
+    Test that stored rows are exported in order, filtered by symbol and date.
+    """
+    csv_path = tmp_path / "export.csv"
+    jsonl_path = tmp_path / "export.jsonl"
+
+    assert run_command(["export", "--output", str(csv_path)]) == 0
+    assert run_command(["export", "--format", "jsonl", "--symbol", "S00001-BRL", "--start", "1720182707",
+                        "--output", str(jsonl_path)]) == 0
+
+    with open(csv_path, newline="") as exported:
+        rows = list(csv.DictReader(exported))
+    assert len(rows) == 6
+    assert rows[0]["symbol"] == "S00000-BRL" and rows[-1]["date"] == "1720182707"
+    records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    assert [(record["symbol"], record["date"]) for record in records] == [("S00001-BRL", 1720182707)]
+
+def test_export_parquet(stored_market_data, tmp_path):
+    """
+    Test that the Parquet export writes every row with typed columns.
+    """
+    import pyarrow.parquet as pq
+    path = tmp_path / "export.parquet"
+
+    assert run_command(["export", "--format", "parquet", "--limit", "4", "--output", str(path)]) == 0
+
+    table = pq.read_table(path)
+    assert table.num_rows == 4
+    assert str(table.schema.field("date").type) == "int64"
+
+def test_collect_drains_on_sigterm(tmp_path):
+    """
+    Test that SIGTERM stops a headless collection gracefully.
+
+    Asserts:
+        The process exits with status 0 after printing its end-of-run summaries.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app", "collect", "--symbols", "BTC-BRL", "--rate", "10"],
+        cwd=ROOT, env=cli_environment(tmp_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    time.sleep(2)
+    process.send_signal(signal.SIGTERM)
+    stdout, stderr = process.communicate(timeout=30)
+
+    assert process.returncode == 0
+    assert "draining" in stderr
+    assert "Scheduler:" in stdout
+
+def test_bench_reports_throughput(tmp_path):
+    """
+    Test that the benchmark runs offline against replayed responses.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "app", "bench", "--count", "50", "--rate", "10", "--duration", "1",
+         "--recordings", str(tmp_path / "none"), "--metrics-path", str(tmp_path / "bench.prom")],
+        cwd=ROOT, env=cli_environment(tmp_path), capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Bench: 50 symbols at 10 Hz" in result.stdout
+    assert 'market_data_stage_seconds_count{stage="fetch"}' in (tmp_path / "bench.prom").read_text()
+
+def test_database_url_option_overrides_loaded_config(monkeypatch, tmp_path):
+    """
+    Test that --database-url takes effect although `app.config` is already
+    imported, and that the previous URL is restored afterwards.
+    """
+    monkeypatch.setattr("app.cli.install_signal_handlers", lambda stop_event: None)
+    url = f"sqlite:///{tmp_path / 'other.db'}"
+    other = create_engine(url)
+    Base.metadata.create_all(bind=other)
+    with other.begin() as connection:
+        connection.execute(MarketData.__table__.insert(), [
+            {"symbol": "BTC-BRL", "buy": 1.0, "sell": 2.0, "high": 3.0, "low": 0.5, "open": 1.0, "last": 1.5,
+             "volume": 10.0, "date": 1720182706}
+        ])
+    other.dispose()
+    previous = Config.DATABASE_URL
+    path = tmp_path / "export.jsonl"
+
+    assert main(["--database-url", url, "export", "--format", "jsonl", "--output", str(path)]) == 0
+
+    assert [json.loads(line)["symbol"] for line in path.read_text().splitlines()] == ["BTC-BRL"]
+    assert Config.DATABASE_URL == previous
+
+def test_bench_in_process_uses_a_throwaway_database(monkeypatch, tmp_path):
+    """
+    Test that the benchmark never writes to the configured database, even when
+    run from Python with `app.config` already imported.
+    """
+    monkeypatch.setattr("app.cli.install_signal_handlers", lambda stop_event: None)
+    configured = tmp_path / "configured.db"
+    monkeypatch.setattr(Config, "DATABASE_URL", f"sqlite:///{configured}")
+
+    assert main(["bench", "--count", "5", "--rate", "10", "--duration", "0.3",
+                 "--recordings", str(tmp_path / "none")]) == 0
+
+    assert not configured.exists()
+    assert Config.DATABASE_URL == f"sqlite:///{configured}"
+
+def test_collector_exports_metrics(monkeypatch, tmp_path):
+    """
+    Test that --metrics-path is honored with --workers, where the supervisor
+    exports the collector's metrics.
+    """
+    monkeypatch.setattr("app.cli.install_signal_handlers", lambda stop_event: None)
+    monkeypatch.setattr("app.cli.init_db", lambda: None)
+    monkeypatch.setattr(Config, "METRICS_PATH", Config.METRICS_PATH)
+    monkeypatch.setattr(Config, "METRICS_PORT", Config.METRICS_PORT)
+
+    class FakeCollector:
+        def __init__(self, workers, symbols, interval):
+            pass
+
+        def run(self, stop_event):
+            pass
+
+        def summary(self):
+            return "stopped"
+
+    monkeypatch.setattr("app.collector.ShardedCollector", FakeCollector)
+    path = tmp_path / "collector.prom"
+
+    assert main(["collect", "--workers", "2", "--metrics-path", str(path)]) == 0
+
+    assert "# TYPE" in path.read_text()
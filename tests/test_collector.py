@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.collector import ShardedCollector, pack_ticks, unpack_ticks, shard_symbols
+from app.config import TestConfig
+from app.models import Base, MarketData
+from app.ticks import Tick
+from tests.payloads import synthetic_ticks
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Symbols collected by the multi-process tests
+SYMBOLS = [f"S{i:05d}-BRL" for i in range(6)]
+
+def fetch_synthetic(chunks):
+    """
+    Worker fetch function returning one synthetic tick per requested symbol.
+    """
+    symbols = [symbol for chunk in chunks for symbol in chunk]
+    return [Tick(symbol, *tick_fields) for symbol, tick_fields in
+            zip(symbols, ((tick.buy, tick.sell, tick.high, tick.low, tick.open, tick.last, tick.volume, tick.date)
+                          for tick in synthetic_ticks(len(symbols))))]
+
+def fetch_crashing_once(chunks):
+    """
+    Worker fetch function that kills the process polling S00000-BRL the first
+    time it runs, leaving a marker file so that later workers fetch normally.
+    """
+    marker = os.environ["COLLECTOR_TEST_MARKER"]
+    if any("S00000-BRL" in chunk for chunk in chunks) and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return fetch_synthetic(chunks)
+
+@pytest.fixture
+def collector_database(monkeypatch, tmp_path):
+    """
+    Fixture that points the collector's writer process at an empty test database.
+
+    The writer runs in a spawned process, which reads its database URL from the
+    environment, and the crash marker of `fetch_crashing_once` lives in `tmp_path`.
+    """
+    monkeypatch.setenv("DATABASE_URL", TestConfig.DATABASE_URL)
+    monkeypatch.setenv("WRITE_SPILL_PATH", str(tmp_path / "spill.jsonl"))
+    monkeypatch.setenv("COLLECTOR_TEST_MARKER", str(tmp_path / "crashed"))
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as session:
+        session.query(MarketData).delete()
+        session.commit()
+    yield TestingSessionLocal
+    Base.metadata.drop_all(bind=engine)
+
+def run_until_stored(collector, symbols, timeout=60):
+    """
+    Runs a collector in a thread until every symbol has a stored tick, then stops it.
+
+    Returns:
+        set: The symbols stored when the collector stopped.
+    """
+    stop_event = threading.Event()
+    thread = threading.Thread(target=collector.run, args=(stop_event,))
+    thread.start()
+    stored = set()
+    deadline = time.monotonic() + timeout
+    try:
+        while stored != set(symbols) and time.monotonic() < deadline:
+            time.sleep(0.2)
+            with TestingSessionLocal() as session:
+                stored = {row.symbol for row in session.query(MarketData.symbol).distinct()}
+    finally:
+        stop_event.set()
+        thread.join()
+    return stored
+
+def test_shard_symbols_is_balanced_and_disjoint():
+    """
+    Test that shards cover the universe once, with sizes differing by at most one.
+    """
+    symbols = [f"S{i:05d}-BRL" for i in range(10)] + ["S00003-BRL"]
+
+    shards = shard_symbols(symbols, 3)
+
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+    assert sorted(symbol for shard in shards for symbol in shard) == sorted(set(symbols))
+    assert shard_symbols(symbols[:2], 3)[2] == []
+
+def test_packed_batches_round_trip():
+    """
+    Test that ticks survive packing into a binary batch, including long symbols.
+    """
+    ticks = synthetic_ticks(3) + [Tick("A-VERY-LONG-SYMBOL-NAME-BRL", 1.5, 2.5, 3.0, 1.0, 1.2, 2.0, 10.0, 1720182706)]
+
+    data = pack_ticks(ticks)
+
+    assert isinstance(data, bytes)
+    assert unpack_ticks(data) == ticks
+
+def test_collector_restarts_crashed_worker(collector_database):
+    """
+    Test that a worker killed mid-poll is restarted on its shard and that every
+    shard reaches the database through the writer process.
+    """
+    collector = ShardedCollector(workers=2, symbols=SYMBOLS, interval=0.1, fetch=fetch_crashing_once,
+                                 check_interval=0.1)
+
+    stored = run_until_stored(collector, SYMBOLS)
+
+    assert stored == set(SYMBOLS)
+    assert collector.stats()["restarts"] == 1
+    assert collector.stats()["retired"] == 0
+
+def test_collector_rebalances_retired_worker(collector_database):
+    """
+    Test that a slot crashing past `max_restarts` is retired and its symbols are
+    taken over by the remaining workers.
+    """
+    collector = ShardedCollector(workers=3, symbols=SYMBOLS, interval=0.1, fetch=fetch_crashing_once,
+                                 max_restarts=0, check_interval=0.1)
+
+    stored = run_until_stored(collector, SYMBOLS)
+
+    assert stored == set(SYMBOLS)
+    assert collector.stats()["workers"] == 2
+    assert (collector.retired, collector.rebalances) == (1, 1)
+    assert sorted(symbol for slot in collector.slots for symbol in slot.shard) == SYMBOLS
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 from app.config import Config
 
@@ -28,5 +31,19 @@ class TestConfig(unittest.TestCase):
         """
         self.assertIsNotNone(Config.API_URL, "API_URL should not be None")
 
+    def test_sqlite_profile_defaults_to_sqlite_defaults(self):
+        """
+        Ensure SQLite keeps its rollback journal and full fsync unless a faster,
+        less durable profile is configured.
+
+        Asserts:
+            Without SQLITE_PROFILE in the environment, the "default" profile is used.
+        """
+        environment = {name: value for name, value in os.environ.items() if name != "SQLITE_PROFILE"}
+        result = subprocess.run([sys.executable, "-c", "from app.config import Config; print(Config.SQLITE_PROFILE)"],
+                                env=environment, capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), "default")
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,15 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest.mock import patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, Symbol, MarketData
 from app.config import TestConfig
+from app.config import Config
+from app.database import create_database_engine, sqlite_pragmas, get_engine, dispose_engines, LazySessionMaker
 
 class TestDatabase(unittest.TestCase):
 
@@ -93,5 +100,124 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNotNone(retrieved)
         self.assertEqual(retrieved.symbol, 'BTC-BRL')
 
+class TestSQLiteProfiles(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Create a temporary directory for the database files of each test.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Remove the temporary database files.
+        """
+        self.directory.cleanup()
+
+    def pragma(self, engine, name):
+        """
+        Returns the current value of a PRAGMA on a new connection of `engine`.
+        """
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    def test_fast_profile_is_applied_on_connect(self):
+        """
+        Test that the "fast" profile's PRAGMAs are set on every new connection.
+
+        Asserts:
+            The journal is in WAL mode, synchronous is NORMAL (1), temporary
+            tables live in memory (2) and the cache and busy timeout match the profile.
+        """
+        url = f"sqlite:///{os.path.join(self.directory.name, 'fast.db')}"
+        engine = create_database_engine(url, profile="fast", overrides={})
+
+        self.assertEqual(self.pragma(engine, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(engine, "synchronous"), 1)
+        self.assertEqual(self.pragma(engine, "temp_store"), 2)
+        self.assertEqual(self.pragma(engine, "cache_size"), -64000)
+        self.assertEqual(self.pragma(engine, "busy_timeout"), 5000)
+        engine.dispose()
+
+    def test_overrides_replace_profile_values(self):
+        """
+        Test that per-pragma overrides take precedence over the profile.
+        """
+        url = f"sqlite:///{os.path.join(self.directory.name, 'override.db')}"
+        engine = create_database_engine(url, profile="fast", overrides={"synchronous": "OFF"})
+
+        self.assertEqual(self.pragma(engine, "synchronous"), 0)
+        engine.dispose()
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        """
+        Test that the "default" profile leaves the rollback journal in place.
+        """
+        url = f"sqlite:///{os.path.join(self.directory.name, 'default.db')}"
+        engine = create_database_engine(url, profile="default", overrides={})
+
+        self.assertEqual(self.pragma(engine, "journal_mode"), "delete")
+        engine.dispose()
+
+    def test_unknown_profile_is_rejected(self):
+        """
+        Test that an unknown profile name raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            sqlite_pragmas("turbo")
+
+class TestLazyEngines(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Create a temporary directory for the database files of each test.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.directory.name, 'lazy.db')}"
+
+    def tearDown(self):
+        """
+        Dispose of the engines created by the test and remove the database files.
+        """
+        dispose_engines()
+        self.directory.cleanup()
+
+    def test_import_creates_no_engine(self):
+        """
+        Test that importing the database module creates no engine until one is used.
+        """
+        code = ("import app.database as database; created = len(database._engines); "
+                "database.SessionLocal().close(); print(created, len(database._engines))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        self.assertEqual(result.stdout.split(), ["0", "1"])
+
+    def test_one_engine_per_url(self):
+        """
+        Test that every caller of a URL shares one engine, and that the default
+        URL is read from `Config` at call time.
+        """
+        other = f"sqlite:///{os.path.join(self.directory.name, 'other.db')}"
+
+        with patch.object(Config, "DATABASE_URL", self.url):
+            self.assertIs(get_engine(), get_engine(self.url))
+        self.assertIsNot(get_engine(other), get_engine(self.url))
+        self.assertEqual(str(get_engine(self.url).url), self.url)
+
+    def test_session_maker_binds_on_first_use(self):
+        """
+        Test that a lazy session factory binds its sessions to the URL's engine,
+        unless a bind is given explicitly.
+        """
+        Session = LazySessionMaker(lambda: self.url, autocommit=False, autoflush=False)
+        explicit = create_database_engine(f"sqlite:///{os.path.join(self.directory.name, 'explicit.db')}")
+
+        with Session() as session:
+            self.assertIs(session.get_bind(), get_engine(self.url))
+        with Session(bind=explicit) as session:
+            self.assertIs(session.get_bind(), explicit)
+        explicit.dispose()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import json
+import pytest
+from app.decoding import available_decoders, resolve_decoder, decode_json, decode_ticks
+from app.ticks import Tick, parse_ticks
+from tests.payloads import synthetic_symbols, synthetic_tickers
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_decoders_agree_on_tickers(decoder):
+    """
+    Test that every available decoder produces the same ticks as the stdlib path.
+    """
+    tickers = synthetic_tickers(50)
+
+    ticks = decode_ticks(json.dumps(tickers).encode(), decoder)
+
+    assert ticks == parse_ticks(tickers)
+    assert all(type(tick) is Tick for tick in ticks)
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_decoders_agree_on_symbols(decoder):
+    """
+    Test that every available decoder returns the same /symbols document.
+    """
+    symbols = synthetic_symbols(20)
+
+    assert decode_json(json.dumps(symbols).encode(), decoder) == symbols
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_unparseable_prices_fall_back_to_zero(decoder):
+    """
+    Test that a ticker outside the typed schema is still decoded, with its
+    unparseable price converted to 0.0 like `safe_float`.
+    """
+    tickers = synthetic_tickers(2)
+    tickers[1]['buy'] = ""
+    tickers[1]['date'] = str(tickers[1]['date'])
+
+    ticks = decode_ticks(json.dumps(tickers).encode(), decoder)
+
+    assert ticks[1].buy == 0.0
+    assert ticks[1].date == tickers[0]['date']
+    assert ticks[0] == parse_ticks(tickers)[0]
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_invalid_json_raises_value_error(decoder):
+    """
+    Test that every decoder reports malformed documents as ValueError.
+    """
+    with pytest.raises(ValueError):
+        decode_json(b'[{"pair": ', decoder)
+
+def test_auto_picks_the_fastest_available_decoder():
+    """
+    Test that "auto" resolves to the first available decoder and unknown names fail.
+    """
+    assert resolve_decoder("auto") == available_decoders()[0]
+    assert resolve_decoder("json") == "json"
+    with pytest.raises(ValueError):
+        resolve_decoder("yaml")
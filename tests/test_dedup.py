@@ -0,0 +1,50 @@
+from app.dedup import TickDeduplicator
+from app.ticks import parse_ticks
+from tests.payloads import synthetic_tickers, synthetic_ticks
+
+def test_repeated_snapshots_are_suppressed():
+    """
+    Test that a poll identical to the previous one is dropped entirely.
+
+    Asserts:
+        The first poll passes through, the repeated poll is suppressed, and the
+        counters reflect both polls.
+    """
+    deduplicator = TickDeduplicator()
+
+    first = deduplicator.filter(synthetic_ticks(5))
+    second = deduplicator.filter(synthetic_ticks(5))
+
+    assert len(first) == 5
+    assert second == []
+    assert (deduplicator.seen, deduplicator.suppressed) == (10, 5)
+
+def test_changed_fields_pass_through():
+    """
+    Test that a new date or a changed price lets a ticker through.
+
+    Asserts:
+        Only the tickers whose key changed are returned.
+    """
+    deduplicator = TickDeduplicator()
+    deduplicator.filter(synthetic_ticks(3))
+
+    tickers = synthetic_tickers(3)
+    tickers[0]['date'] += 1
+    tickers[1]['last'] = "1.00"
+
+    changed = deduplicator.filter(parse_ticks(tickers))
+
+    assert [tick.symbol for tick in changed] == ["S00000-BRL", "S00001-BRL"]
+
+def test_fields_outside_the_key_are_ignored():
+    """
+    Test that changes to fields outside (date, last, buy, sell, vol) do not count.
+    """
+    deduplicator = TickDeduplicator()
+    deduplicator.filter(synthetic_ticks(1))
+
+    tickers = synthetic_tickers(1)
+    tickers[0]['high'] = "99999.00"
+
+    assert deduplicator.filter(parse_ticks(tickers)) == []
@@ -1,7 +1,14 @@
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from datetime import datetime, timezone
+from unittest.mock import patch, Mock
+import requests
 import urllib3
-from app.fetch_data import fetch_symbols, fetch_market_data
+from app import fetch_data
+from app.fetch_data import (fetch_symbols, fetch_market_data, chunk_symbols, send_request, API_URL,
+                            TokenBucket, CircuitBreaker, CircuitOpenError, RetryPolicy, retry_after_seconds,
+                            stop_retries_on)
 
 class TestFetchData(unittest.TestCase):
     """
@@ -82,5 +89,281 @@ class TestFetchData(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["pair"], "BTC-BRL")
 
+    def test_chunk_symbols_respects_url_length(self):
+        """
+        Test that `chunk_symbols` keeps every /tickers URL under the limit.
+
+        A watchlist of 500 synthetic symbols is split with a 300 character limit,
+        and the percent-encoded URL of each chunk is rebuilt and measured.
+
+        Asserts:
+            Every chunk URL is at most 300 characters long.
+            Every symbol appears exactly once, in the original order.
+        """
+        symbols = [f"S{i:05d}-BRL" for i in range(500)]
+
+        chunks = chunk_symbols(symbols, max_url_length=300)
+
+        for chunk in chunks:
+            url = f"{API_URL}tickers?symbols=" + "%2C".join(chunk)
+            self.assertLessEqual(len(url), 300)
+        self.assertEqual([symbol for chunk in chunks for symbol in chunk], symbols)
+        self.assertGreater(len(chunks), 1)
+
+    def test_chunk_symbols_drops_duplicates(self):
+        """
+        Test that duplicate symbols are only requested once.
+
+        Asserts:
+            The single chunk contains each symbol once, in first-seen order.
+        """
+        chunks = chunk_symbols(["BTC-BRL", "ETH-BRL", "BTC-BRL"])
+
+        self.assertEqual(chunks, [["BTC-BRL", "ETH-BRL"]])
+
+class FakeClock:
+    """
+    Manually advanced monotonic clock.
+    """
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def response(status_code=200, headers=None):
+    """
+    Builds a mocked API response.
+    """
+    mocked = Mock(status_code=status_code, headers=headers or {}, content=b"[]")
+    if status_code >= 400:
+        mocked.raise_for_status.side_effect = requests.HTTPError(f"{status_code} error")
+    return mocked
+
+class TestFetchPolicy(unittest.TestCase):
+    """
+    Unit tests for the retry, rate-limit and circuit-breaker policy of `fetch_data.py`.
+    """
+
+    def test_token_bucket_allows_burst_then_paces(self):
+        """
+        Test that the bucket lets `burst` requests through, then spaces them at `rate`.
+
+        Asserts:
+            The first two reservations wait nothing, the next ones queue up one
+            second apart, and the bucket refills while the clock advances.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=2, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0.0, 0.0, 1.0, 2.0])
+        clock.now += 10
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_token_bucket_pause_holds_back_unlimited_callers(self):
+        """
+        Test that a Retry-After pause applies even without a rate limit.
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=None, clock=clock)
+
+        bucket.pause(5)
+        clock.now += 2
+
+        self.assertEqual(bucket.reserve(), 3.0)
+
+    def test_circuit_breaker_opens_and_recovers(self):
+        """
+        Test the closed, open and half-open transitions of the circuit breaker.
+
+        Asserts:
+            The circuit opens after the threshold and refuses requests until the
+            timeout; a single trial is then allowed, and its success closes it.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.allow()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()
+
+        clock.now += 30
+        breaker.allow()
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()  # Only one trial request while half-open
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.opened, 1)
+
+    def test_circuit_breaker_reopens_on_failed_trial(self):
+        """
+        Test that a failed half-open trial opens the circuit again.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        breaker.allow()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.opened, 2)
+
+    def test_retry_policy_backs_off_exponentially_with_cap(self):
+        """
+        Test the backoff ceilings, and that Retry-After takes precedence when
+        longer but never beyond the cap.
+        """
+        policy = RetryPolicy(base=0.5, cap=3.0, random=lambda: 1.0)
+
+        self.assertEqual([policy.delay(attempt) for attempt in range(1, 6)], [0.5, 1.0, 2.0, 3.0, 3.0])
+        self.assertEqual(policy.delay(1, retry_after=2.5), 2.5)
+        self.assertEqual(policy.delay(1, retry_after=3600.0), 3.0)
+        self.assertEqual(RetryPolicy(random=lambda: 0.0).delay(3), 0.0)
+
+    def test_retry_after_seconds_parses_both_formats(self):
+        """
+        Test that Retry-After is understood in seconds and as an HTTP date.
+        """
+        now = datetime(2024, 7, 5, 12, 0, 0, tzinfo=timezone.utc)
+
+        self.assertEqual(retry_after_seconds("7"), 7.0)
+        self.assertEqual(retry_after_seconds("Fri, 05 Jul 2024 12:00:30 GMT", now=now), 30.0)
+        self.assertEqual(retry_after_seconds("Fri, 05 Jul 2024 11:00:00 GMT", now=now), 0.0)
+        self.assertIsNone(retry_after_seconds("soon"))
+        self.assertIsNone(retry_after_seconds(None))
+
+    @patch('app.fetch_data.session.get')
+    def test_send_request_retries_transient_failures(self, mock_get):
+        """
+        Test that 429s, 5xx and connection errors are retried until a response succeeds.
+
+        Asserts:
+            The successful response is returned after three retries, the 429's
+            Retry-After paused the shared limiter, and the retries were counted.
+        """
+        mock_get.side_effect = [
+            response(429, {"Retry-After": "0.01"}),
+            response(503),
+            requests.ConnectionError("reset"),
+            response(200)
+        ]
+        retries = fetch_data.RETRIES.value()
+
+        result = send_request(f"{API_URL}tickers")
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(fetch_data.RETRIES.value(), retries + 3)
+        self.assertEqual(fetch_data.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    @patch('app.fetch_data.session.get')
+    def test_send_request_gives_up_after_max_retries(self, mock_get):
+        """
+        Test that the last error is raised once the retries are exhausted.
+        """
+        mock_get.return_value = response(503)
+
+        with self.assertRaises(requests.HTTPError):
+            send_request(f"{API_URL}tickers")
+
+        self.assertEqual(mock_get.call_count, fetch_data.retry_policy.max_retries + 1)
+
+    @patch('app.fetch_data.session.get')
+    def test_send_request_does_not_retry_client_errors(self, mock_get):
+        """
+        Test that a 404 is raised at once and does not count against the circuit.
+        """
+        mock_get.return_value = response(404)
+
+        with self.assertRaises(requests.HTTPError):
+            send_request(f"{API_URL}tickers")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(fetch_data.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    @patch('app.fetch_data.session.get')
+    def test_half_open_trial_failing_otherwise_reopens_the_circuit(self, mock_get):
+        """
+        Test that a half-open trial failing with an error that is not retried,
+        such as a truncated body, opens the circuit again instead of leaving it
+        half-open forever.
+
+        Asserts:
+            The error is raised and the circuit is open; once the timeout has
+            passed again, a new trial is let through and closes it.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        mock_get.side_effect = [requests.exceptions.ChunkedEncodingError("truncated"), response(200)]
+
+        with patch("app.fetch_data.circuit_breaker", breaker):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                send_request(f"{API_URL}tickers")
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            clock.now += 30
+            self.assertEqual(send_request(f"{API_URL}tickers").status_code, 200)
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.opened, 2)
+
+    @patch('app.fetch_data.session.get')
+    def test_send_request_gives_up_on_retry_after_beyond_the_cap(self, mock_get):
+        """
+        Test that a Retry-After longer than the backoff cap is not waited for.
+
+        Asserts:
+            The 429 is raised without a retry, and the shared limiter is paused
+            for the cap rather than the server's hour.
+        """
+        mock_get.return_value = response(429, {"Retry-After": "3600"})
+
+        with self.assertRaises(requests.HTTPError):
+            send_request(f"{API_URL}tickers")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertLessEqual(fetch_data.rate_limiter.reserve(), fetch_data.retry_policy.cap)
+
+    @patch('app.fetch_data.session.get')
+    def test_stop_event_interrupts_the_backoff(self, mock_get):
+        """
+        Test that setting the event given to `stop_retries_on` ends a long
+        backoff at once and gives up retrying.
+        """
+        mock_get.return_value = response(503)
+        stop_event = threading.Event()
+        threading.Timer(0.1, stop_event.set).start()
+        start = time.monotonic()
+
+        with patch("app.fetch_data.retry_policy", RetryPolicy(base=60.0, cap=60.0, random=lambda: 1.0)), \
+             stop_retries_on(stop_event):
+            with self.assertRaises(requests.HTTPError):
+                send_request(f"{API_URL}tickers")
+
+        self.assertLess(time.monotonic() - start, 5.0)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('app.fetch_data.session.get')
+    def test_open_circuit_fails_fast(self, mock_get):
+        """
+        Test that once the circuit opens, retries stop and later requests fail
+        without reaching the API.
+        """
+        mock_get.side_effect = requests.ConnectionError("refused")
+        with patch("app.fetch_data.circuit_breaker", CircuitBreaker(failure_threshold=2)):
+            with self.assertRaises(CircuitOpenError):
+                send_request(f"{API_URL}tickers")
+            with self.assertRaises(CircuitOpenError):
+                send_request(f"{API_URL}tickers")
+
+        self.assertEqual(mock_get.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,40 @@
+from unittest.mock import patch
+import pytest
+import main
+
+@pytest.mark.parametrize("entry", ["ten", "-5", "0", "2.5"])
+def test_view_market_data_rejects_invalid_counts(entry, capsys):
+    """
+    Test that an invalid number of ticks is reported instead of ending the menu.
+    """
+    with patch("builtins.input", side_effect=["BTC-BRL", entry]), \
+         patch("app.workers.display_market_data") as display:
+        main.handle_view_market_data()
+
+    display.assert_not_called()
+    assert "Invalid input." in capsys.readouterr().out
+
+def test_view_market_data_passes_valid_counts():
+    """
+    Test that a valid number of ticks shows only the latest ticks, and a blank
+    entry shows all of them.
+    """
+    with patch("builtins.input", side_effect=["BTC-BRL", " 20 ", "", ""]), \
+         patch("app.workers.display_market_data") as display:
+        main.handle_view_market_data()
+        main.handle_view_market_data()
+
+    assert display.call_args_list[0].kwargs == {"symbol": "BTC-BRL", "limit": 20, "tail": True}
+    assert display.call_args_list[1].kwargs == {"symbol": None}
+
+@pytest.mark.parametrize("entry", ["four", "-1"])
+def test_run_collector_rejects_invalid_worker_counts(entry, capsys):
+    """
+    Test that an invalid number of worker processes starts no collector.
+    """
+    with patch("builtins.input", return_value=entry), \
+         patch("app.collector.ShardedCollector") as collector:
+        main.handle_run_collector()
+
+    collector.assert_not_called()
+    assert "Invalid input." in capsys.readouterr().out
@@ -0,0 +1,137 @@
+import threading
+import urllib.request
+from unittest.mock import patch
+import pytest
+from app.config import Config
+from app.metrics import MetricsRegistry, MetricsExporter, Histogram, CONTENT_TYPE, metrics, stage_histogram
+from app.workers import subscribe_market_data
+from tests.payloads import synthetic_ticks
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    """
+    Test that quantiles are estimated from the bucket counts.
+
+    Asserts:
+        With 99 fast and 1 slow observation, p50 falls in the fast bucket and
+        p99 is not dragged to the slow one, while p100 reports the maximum.
+    """
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for _ in range(99):
+        histogram.observe(0.005)
+    histogram.observe(0.5)
+
+    assert 0.0 < histogram.quantile(0.5) <= 0.01
+    assert histogram.quantile(0.99) <= 0.01
+    assert histogram.quantile(1.0) == pytest.approx(0.5)
+    assert (histogram.count, histogram.max) == (100, 0.5)
+
+def test_histogram_quantile_beyond_last_bucket_reports_maximum():
+    """
+    Test that observations past the last bucket are reported as the largest one.
+    """
+    histogram = Histogram(buckets=(0.01,))
+    histogram.observe(3.0)
+
+    assert histogram.quantile(0.99) == 3.0
+    assert Histogram().quantile(0.5) == 0.0
+
+def test_render_prometheus_text_format():
+    """
+    Test the exposition of counters, callback gauges and histograms.
+
+    Asserts:
+        Every family has HELP and TYPE lines, histogram buckets are cumulative
+        and end with +Inf, and label values are escaped.
+    """
+    registry = MetricsRegistry()
+    registry.counter("ticks_total", "Ticks.").inc(3)
+    registry.gauge("queue_depth", "Depth.", function=lambda: 7, queue='a"b')
+    histogram = registry.histogram("stage_seconds", "Latency.", buckets=(0.1, 1.0), stage="fetch")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    lines = registry.render().splitlines()
+
+    assert "# HELP ticks_total Ticks." in lines
+    assert "# TYPE ticks_total counter" in lines
+    assert "ticks_total 3" in lines
+    assert 'queue_depth{queue="a\\"b"} 7' in lines
+    assert "# TYPE stage_seconds histogram" in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 2' in lines
+    assert 'stage_seconds_count{stage="fetch"} 2' in lines
+
+def test_registry_returns_existing_series():
+    """
+    Test that a name and label set always resolve to the same series, and that a
+    name cannot change type.
+    """
+    registry = MetricsRegistry()
+
+    assert registry.counter("errors_total", "Errors.", stage="fetch") is registry.counter("errors_total", "Errors.", stage="fetch")
+    assert registry.counter("errors_total", "Errors.", stage="fetch") is not registry.counter("errors_total", "Errors.", stage="tick")
+    with pytest.raises(ValueError):
+        registry.gauge("errors_total", "Errors.")
+
+def test_serve_exposes_metrics_over_http():
+    """
+    Test that the HTTP endpoint answers scrapes with the rendered registry.
+    """
+    registry = MetricsRegistry()
+    registry.counter("ticks_total", "Ticks.").inc()
+    server = registry.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type == CONTENT_TYPE
+    assert "ticks_total 1" in body.splitlines()
+
+def test_exporter_writes_final_dump(tmp_path):
+    """
+    Test that the file exporter leaves a complete dump behind when closed.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("ticks_total", "Ticks.")
+    path = tmp_path / "metrics.prom"
+
+    with MetricsExporter(registry, path=str(path), interval=60):
+        counter.inc(5)
+
+    assert "ticks_total 5" in path.read_text().splitlines()
+    assert not (tmp_path / "metrics.prom.tmp").exists()
+
+def test_subscription_records_stage_latencies(monkeypatch, tmp_path):
+    """
+    Test that a subscription tick is timed stage by stage and dumped to the
+    configured metrics file.
+
+    Asserts:
+        The render, tick and store stages observed the tick, the ticks counter
+        grew by the number of tickers, and the dump lists the write queue depth.
+    """
+    path = tmp_path / "metrics.prom"
+    monkeypatch.setattr(Config, "METRICS_PATH", str(path))
+    stop_event = threading.Event()
+    before = {stage: stage_histogram(stage).count for stage in ("render", "tick", "store_market_data")}
+    ticks = metrics.counter("market_data_ticks_total", "Tickers received from the API.")
+    ticks_before = ticks.value()
+
+    def fetch(chunk):
+        stop_event.set()
+        return synthetic_ticks(len(chunk))
+
+    with patch("app.workers.fetch_ticks", side_effect=fetch), \
+         patch("app.workers.store_market_data"), \
+         patch("app.workers.store_candles"):
+        subscribe_market_data(["S00000-BRL", "S00001-BRL"], stop_event)
+
+    for stage, count in before.items():
+        assert stage_histogram(stage).count == count + 1
+    assert ticks.value() == ticks_before + 2
+    assert 'write_queue_depth{queue="market_data"} 0' in path.read_text().splitlines()
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 import timeit
 from sqlalchemy import create_engine
@@ -6,6 +9,8 @@ from app.models import Base, Symbol, MarketData  # Importing database models
 from app.config import TestConfig  # Importing test configuration
 from app.fetch_data import fetch_symbols, fetch_market_data  # Importing data fetching functions
 from app.workers import store_symbols, store_market_data  # Importing data storing functions
+from app.replay import ReplayAdapter, replay  # Importing the offline API replay harness
+from tests.payloads import replay_recordings
 
 # Database configuration for tests
 engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
@@ -24,15 +29,26 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope='function')
-def db_session(setup_database):
+def db_session(setup_database, monkeypatch):
     """
-    Fixture to provide a new database session for each test function.
+    Fixture to provide a new database session for each test function, and to
+    point the storage functions at the test database.
     """
+    monkeypatch.setattr("app.workers.SessionLocal", TestingSessionLocal)
     session = TestingSessionLocal()
     yield session
     session.rollback()  # Rollback any changes after the test
     session.close()  # Close the session
 
+@pytest.fixture(autouse=True)
+def replayed_api():
+    """
+    Fixture that serves the API from recorded responses, so the measurements
+    exclude the network and the tests run offline.
+    """
+    with replay(ReplayAdapter(replay_recordings())) as adapter:
+        yield adapter
+
 def test_fetch_symbols_performance():
     """
     Performance test for the fetch_symbols function.
@@ -96,3 +112,43 @@ def test_store_market_data_performance(db_session):
     print(f"Execution time for store_market_data: {execution_time:.4f} seconds")
     # Adjust the time limit as necessary
     assert execution_time < 2, "store_market_data test is taking longer than expected."
+
+def import_times(statement):
+    """
+    Runs `statement` in a fresh interpreter under `python -X importtime`.
+
+    Returns:
+        dict: The cumulative import time of every imported module, in seconds.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+@pytest.mark.parametrize("statement, module", [("import main", "main"), ("import app.cli", "app.cli")])
+def test_cold_start_import_time(statement, module):
+    """
+    Startup test for the interactive menu and the command-line entry point.
+
+    Asserts:
+        Neither loads SQLAlchemy, requests or NumPy before a command needs them,
+        and their own imports stay well below the cost of those libraries.
+    """
+    times = import_times(statement)
+    print(f"Import time of {module}: {times[module] * 1000:.1f} ms")
+    assert not {"sqlalchemy", "requests", "numpy", "pyarrow"} & times.keys()
+    assert times[module] < 0.1, f"importing {module} is taking longer than expected."
+
+def test_database_import_creates_no_engine():
+    """
+    Startup test for `app.database`: importing it pays for SQLAlchemy alone,
+    not for creating an engine or connecting.
+    """
+    times = import_times("import app.database as database; assert not database._engines")
+    print(f"Import time of app.database: {times['app.database'] * 1000:.1f} ms")
+    assert times["app.database"] < 1, "importing app.database is taking longer than expected."
@@ -0,0 +1,202 @@
+import os
+import threading
+import pytest
+from app.pipeline import WriteBehindQueue
+from app.ticks import as_ticks
+from tests.payloads import synthetic_tickers, synthetic_ticks
+
+class RecordingWriter:
+    """
+    Writer stub that records every batch and can be paused to simulate a slow commit.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait()
+        self.batches.append(list(batch))
+
+    @property
+    def items(self):
+        return [item for batch in self.batches for item in batch]
+
+def test_batches_are_bounded_by_size():
+    """
+    Test that queued items are written in batches of at most `batch_size`.
+
+    Asserts:
+        Every item is written exactly once, in order, after `close`.
+        No batch exceeds the configured size.
+    """
+    writer = RecordingWriter()
+    write_queue = WriteBehindQueue(writer, batch_size=10, flush_interval=5)
+    write_queue.start()
+
+    tickers = synthetic_tickers(35)
+    write_queue.put(tickers)
+    write_queue.close()
+
+    assert writer.items == tickers
+    assert max(len(batch) for batch in writer.batches) <= 10
+    assert write_queue.stats()["written"] == 35
+
+def test_partial_batch_is_flushed_after_interval():
+    """
+    Test that a batch smaller than `batch_size` is written once `flush_interval` elapses.
+
+    Asserts:
+        The items reach the writer without closing the queue.
+    """
+    written = threading.Event()
+    write_queue = WriteBehindQueue(lambda batch: written.set(), batch_size=100, flush_interval=0.05)
+    write_queue.start()
+
+    write_queue.put(synthetic_tickers(3))
+
+    assert written.wait(2)
+    write_queue.close()
+
+def test_drop_oldest_discards_oldest_items():
+    """
+    Test that a full queue in "drop-oldest" mode keeps the newest items.
+
+    The writer is paused after taking its first batch, so later items pile up.
+
+    Asserts:
+        The dropped counter matches the overflow and the newest items survive.
+    """
+    writer = RecordingWriter()
+    write_queue = WriteBehindQueue(writer, max_size=5, batch_size=1, flush_interval=0.01,
+                                   backpressure="drop-oldest")
+    writer.release.clear()
+    write_queue.start()
+    tickers = synthetic_tickers(20)
+
+    write_queue.put(tickers[:1])
+    while write_queue.qsize():
+        pass
+    write_queue.put(tickers[1:])
+    writer.release.set()
+    write_queue.close()
+
+    assert write_queue.dropped == 14
+    assert writer.items == tickers[:1] + tickers[15:]
+
+def test_spill_writes_overflow_back_on_close(tmp_path):
+    """
+    Test that overflow in "spill" mode goes to disk and is written back on close.
+
+    Asserts:
+        Every tick reaches the writer, spilled ones as /tickers dicts, and the spill
+        file is removed afterwards.
+    """
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = RecordingWriter()
+    write_queue = WriteBehindQueue(writer, max_size=5, batch_size=5, flush_interval=0.01,
+                                   backpressure="spill", spill_path=spill_path)
+    writer.release.clear()
+    write_queue.start()
+    ticks = synthetic_ticks(20)
+
+    write_queue.put(ticks)
+    assert write_queue.spilled > 0
+    writer.release.set()
+    write_queue.close()
+
+    assert sorted(as_ticks(writer.items), key=lambda tick: tick.symbol) == ticks
+    assert not os.path.exists(spill_path)
+
+def test_writer_errors_do_not_stop_the_queue():
+    """
+    Test that a failing batch is reported and later batches are still written.
+    """
+    calls = []
+
+    def flaky_writer(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+
+    write_queue = WriteBehindQueue(flaky_writer, batch_size=2, flush_interval=5)
+    write_queue.start()
+    write_queue.put(synthetic_tickers(4))
+    write_queue.close()
+
+    assert calls == [2, 2]
+    assert (write_queue.written, write_queue.failed) == (2, 2)
+
+def test_spill_survives_a_failing_writer(tmp_path):
+    """
+    Test that spilled items are kept on disk while the writer fails, and written
+    by the next queue on the same spill file once it recovers.
+
+    Asserts:
+        Nothing is counted as written during the outage and the spill file
+        still holds every item; the next run writes each of them once and
+        removes the file.
+    """
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = RecordingWriter()
+    writer.release.clear()
+
+    def failing_writer(batch):
+        writer.release.wait()
+        raise RuntimeError("database is down")
+
+    write_queue = WriteBehindQueue(failing_writer, max_size=5, batch_size=5, flush_interval=0.01,
+                                   backpressure="spill", spill_path=spill_path)
+    write_queue.start()
+    tickers = synthetic_tickers(20)
+    write_queue.put(tickers)
+    writer.release.set()
+    write_queue.close()
+
+    assert write_queue.written == 0
+    with open(spill_path) as spill_file:
+        assert len(spill_file.readlines()) == 20
+    assert not os.path.exists(f"{spill_path}.draining")
+
+    next_queue = WriteBehindQueue(writer, batch_size=5, flush_interval=0.01, backpressure="spill",
+                                  spill_path=spill_path)
+    next_queue.start()
+    next_queue.close()
+
+    assert sorted(writer.items, key=lambda item: item["pair"]) == tickers
+    assert next_queue.written == 20
+    assert not os.path.exists(spill_path)
+
+def test_failed_batch_is_spilled_and_retried(tmp_path):
+    """
+    Test that in "spill" mode a batch whose write fails is spilled and written
+    by a later drain instead of being discarded.
+    """
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = RecordingWriter()
+    calls = []
+
+    def flaky_writer(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        writer(batch)
+
+    write_queue = WriteBehindQueue(flaky_writer, batch_size=10, flush_interval=0.01, backpressure="spill",
+                                   spill_path=spill_path)
+    write_queue.start()
+    tickers = synthetic_tickers(3)
+    write_queue.put(tickers)
+    write_queue.close()
+
+    assert writer.items == tickers
+    assert (write_queue.written, write_queue.failed) == (3, 3)
+    assert not os.path.exists(spill_path)
+
+def test_unknown_backpressure_is_rejected():
+    """
+    Test that an unknown backpressure mode raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        WriteBehindQueue(print, backpressure="ignore")
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, MarketData
+from app.config import TestConfig
+from app.queries import market_data_range_query, query_market_data, iter_market_data, stream_market_data
+
+# Set up the test database engine and session
+engine = create_engine(TestConfig.DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope='module')
+def populated_database():
+    """
+    Fixture that creates the schema and stores 100 ticks for each of three symbols,
+    with interleaved dates so that every symbol's range is spread across the table.
+    """
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.query(MarketData).delete()
+        db.execute(MarketData.__table__.insert(), [
+            {'symbol': symbol, 'buy': 1.0, 'sell': 2.0, 'high': 3.0, 'low': 0.5,
+             'open': 1.0, 'last': float(date), 'volume': 10.0, 'date': date}
+            for date in range(1000, 1100)
+            for symbol in ("BTC-BRL", "ETH-BRL", "LTC-BRL")
+        ])
+        db.commit()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(autouse=True)
+def test_sessions(populated_database, monkeypatch):
+    """
+    Fixture that points the query functions at the test database.
+    """
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+
+def test_pages_cover_the_range_without_gaps():
+    """
+    Test that following cursors returns every row of a symbol's range exactly once.
+
+    Asserts:
+        Pages hold at most `limit` rows, dates ascend, and the last page has no cursor.
+    """
+    pages = []
+    cursor = None
+    while True:
+        page = query_market_data("ETH-BRL", start=1010, end=1060, cursor=cursor, limit=15)
+        pages.append(page)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    dates = [row[-1] for page in pages for row in page.rows]
+    assert dates == list(range(1010, 1060))
+    assert all(len(page.rows) <= 15 for page in pages)
+    assert {row[1] for page in pages for row in page.rows} == {"ETH-BRL"}
+
+def test_descending_pages_start_from_the_newest_row():
+    """
+    Test that descending pagination returns the most recent ticks first.
+    """
+    page = query_market_data("BTC-BRL", limit=5, descending=True)
+    older = query_market_data("BTC-BRL", cursor=page.next_cursor, limit=5, descending=True)
+
+    assert [row[-1] for row in page.rows] == [1099, 1098, 1097, 1096, 1095]
+    assert [row[-1] for row in older.rows] == [1094, 1093, 1092, 1091, 1090]
+
+def test_iteration_across_symbols_breaks_date_ties_by_id():
+    """
+    Test that a range across all symbols pages correctly through rows sharing a date.
+    """
+    rows = list(iter_market_data(start=1000, end=1010, page_size=4))
+
+    assert len(rows) == 30
+    assert [(row[-1], row[0]) for row in rows] == sorted((row[-1], row[0]) for row in rows)
+
+@pytest.mark.parametrize("symbol, index", [
+    ("BTC-BRL", "ix_market_data_symbol_date"),
+    (None, "ix_market_data_date"),
+])
+def test_range_queries_are_index_range_scans(symbol, index):
+    """
+    Test that SQLite plans a page as an index range scan without a sort step.
+
+    Asserts:
+        The query plan searches the expected index and never builds a temporary
+        B-tree for the ORDER BY.
+    """
+    query = market_data_range_query(symbol, start=1010, end=1060, cursor=(1020, 5), limit=10)
+    compiled = query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+
+    with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_stream_pages_are_bounded_by_page_size():
+    """
+    Test that streaming returns the whole range in pages of at most `page_size` rows.
+    """
+    pages = list(stream_market_data(page_size=64))
+
+    assert sum(len(page) for page in pages) == 300
+    assert max(len(page) for page in pages) == 64
+
+def test_stream_tail_returns_latest_rows_oldest_first():
+    """
+    Test that `tail=True` yields only the newest `limit` rows, in ascending order.
+    """
+    pages = list(stream_market_data(symbol="LTC-BRL", limit=7, tail=True, page_size=3))
+
+    assert [row[-1] for page in pages for row in page] == list(range(1093, 1100))
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+def test_stream_tail_larger_than_range_returns_everything():
+    """
+    Test that a tail longer than the range returns the whole range.
+    """
+    rows = [row for page in stream_market_data(symbol="LTC-BRL", start=1095, limit=50, tail=True) for row in page]
+
+    assert [row[-1] for row in rows] == list(range(1095, 1100))
+
+def test_stream_head_limit():
+    """
+    Test that a limit without `tail` returns the oldest rows.
+    """
+    rows = [row for page in stream_market_data(symbol="BTC-BRL", limit=3) for row in page]
+
+    assert [row[-1] for row in rows] == [1000, 1001, 1002]
+
+def test_stream_tail_requires_limit():
+    """
+    Test that `tail=True` without a limit raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        list(stream_market_data(tail=True))
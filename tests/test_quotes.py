@@ -0,0 +1,106 @@
+import random
+import threading
+from unittest.mock import patch
+import pytest
+from app.analytics import summarize_quotes
+from app.quotes import QuoteBook, change, quote_book
+from app.ticks import Tick
+from app.workers import subscribe_market_data
+from tests.payloads import synthetic_ticks
+
+def make_tick(symbol, last, open=100.0, volume=1.0, date=1720182706):
+    """
+    Returns a tick with the given price, opening price, volume and date.
+    """
+    return Tick(symbol, last - 0.5, last + 0.5, max(last, open), min(last, open), open, last, volume, date)
+
+def test_get_returns_the_latest_tick():
+    """
+    Test that a symbol's quote is its newest tick, and that late ticks are ignored.
+    """
+    book = QuoteBook()
+
+    assert book.update([make_tick("BTC-BRL", 101.0), make_tick("ETH-BRL", 99.0)]) == 2
+    assert book.update([make_tick("BTC-BRL", 102.0, date=1720182707), make_tick("BTC-BRL", 90.0, date=1720182705)]) == 1
+
+    assert book.get("BTC-BRL").last == 102.0
+    assert book.get("XRP-BRL") is None
+    assert "ETH-BRL" in book and len(book) == 2
+    assert book.last_prices() == {"BTC-BRL": 102.0, "ETH-BRL": 99.0}
+    assert [tick.symbol for tick in book.snapshot(sort=True)] == ["BTC-BRL", "ETH-BRL"]
+    assert book.summary() == "2 symbols quoted, 3 updates"
+
+def test_rankings_follow_updates():
+    """
+    Test that the top-N queries reflect the latest quote of every symbol.
+
+    Asserts:
+        A symbol whose move reverses leaves the gainers and joins the losers,
+        and no symbol is listed twice despite its stale heap entries.
+    """
+    book = QuoteBook()
+    book.update([make_tick("A", 110.0, volume=5.0), make_tick("B", 95.0, volume=50.0), make_tick("C", 101.0, volume=1.0)])
+    book.update([make_tick("A", 80.0, volume=6.0, date=1720182707)])
+
+    assert [tick.symbol for tick in book.top_movers(2)] == ["A", "B"]
+    assert [tick.symbol for tick in book.top("gainers", 3)] == ["C", "B", "A"]
+    assert [tick.symbol for tick in book.top("losers", 1)] == ["A"]
+    assert [tick.symbol for tick in book.top_volume(5)] == ["B", "A", "C"]
+    assert change(book.get("A")) == pytest.approx(-0.2)
+    with pytest.raises(KeyError):
+        book.top("spread")
+
+def test_rankings_match_a_full_sort():
+    """
+    Test the incremental heaps against sorting the whole book, over many updates
+    of the same symbols.
+
+    Asserts:
+        The top 10 of every ranking matches the sort, and the heaps stay bounded
+        by their rebuilds.
+    """
+    rng = random.Random(7)
+    book = QuoteBook()
+    symbols = [f"S{index:03d}-BRL" for index in range(200)]
+    for date in range(1720182706, 1720182756):
+        book.update([make_tick(symbol, rng.uniform(50, 150), volume=rng.uniform(0, 1000), date=date)
+                     for symbol in rng.sample(symbols, 40)])
+
+    quotes = book.snapshot()
+    assert [tick.symbol for tick in book.top_movers(10)] == \
+        [tick.symbol for tick in sorted(quotes, key=lambda tick: -abs(change(tick)))[:10]]
+    assert [tick.symbol for tick in book.top_volume(10)] == \
+        [tick.symbol for tick in sorted(quotes, key=lambda tick: -tick.volume)[:10]]
+    assert all(len(heap) <= 2 * len(book) + 64 for heap in book._heaps.values())
+
+def test_summarize_quotes():
+    """
+    Test the cross-sectional statistics computed from the quote book.
+    """
+    quotes = [make_tick("A", 110.0), make_tick("B", 95.0), make_tick("C", 100.0), make_tick("D", 5.0, open=0.0)]
+
+    summary = summarize_quotes(quotes)
+
+    assert (summary["symbols"], summary["advancers"], summary["decliners"]) == (4, 1, 1)
+    assert summary["median_change"] == 0.0
+    assert summary["spread"]["mean"] == pytest.approx(1.0)
+    assert summarize_quotes([]) is None
+
+def test_subscription_updates_the_quote_book():
+    """
+    Test that a subscription tick records its ticks in the shared quote book.
+    """
+    stop_event = threading.Event()
+    quote_book.clear()
+
+    def fetch(chunk):
+        stop_event.set()
+        return synthetic_ticks(len(chunk))
+
+    with patch("app.workers.fetch_ticks", side_effect=fetch), \
+         patch("app.workers.store_market_data"), \
+         patch("app.workers.store_candles"):
+        subscribe_market_data(["S00000-BRL", "S00001-BRL"], stop_event, display=False)
+
+    assert sorted(quote_book.last_prices()) == ["S00000-BRL", "S00001-BRL"]
+    assert quote_book.top_volume(1)[0].symbol == "S00001-BRL"
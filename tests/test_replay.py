@@ -0,0 +1,100 @@
+import time
+import pytest
+import requests
+from app.fetch_data import API_URL, fetch_symbols, fetch_market_data, session, RetryPolicy, CircuitBreaker
+from app.replay import ReplayAdapter, Recordings, replay, load_recordings, _write_fixture
+from tests.payloads import synthetic_symbols, synthetic_tickers
+
+@pytest.fixture
+def recordings():
+    return Recordings(synthetic_symbols(3), {"ETag": '"v1"'}, synthetic_tickers(3))
+
+def test_replays_recorded_responses(recordings):
+    """
+    Test that /symbols and /tickers are served from the recordings without the network.
+    """
+    with replay(ReplayAdapter(recordings)) as adapter:
+        assert fetch_symbols() == recordings.symbols
+        assert fetch_market_data(["S00001-BRL"]) == [recordings.tickers[1]]
+
+    assert adapter.requests == 2
+
+def test_unrecorded_symbols_are_cloned(recordings):
+    """
+    Test that a watchlist larger than the recording is served in full.
+    """
+    symbols = [f"X{i:04d}-BRL" for i in range(50)]
+
+    with replay(ReplayAdapter(recordings)):
+        market_data = fetch_market_data(symbols)
+
+    assert [item['pair'] for item in market_data] == symbols
+    assert market_data[4]['last'] == recordings.tickers[1]['last']
+
+def test_conditional_symbols_request_is_not_modified(recordings):
+    """
+    Test that a /symbols request carrying the recorded ETag gets 304.
+    """
+    with replay(ReplayAdapter(recordings)):
+        response = session.get(f"{API_URL}symbols", headers={"If-None-Match": '"v1"'})
+
+    assert response.status_code == 304
+
+def test_latency_and_error_rate_are_injected(recordings, monkeypatch):
+    """
+    Test that the configured latency delays every request and that failures are
+    injected at roughly the configured rate. Retries are disabled so that every
+    injected failure reaches the caller.
+    """
+    monkeypatch.setattr("app.fetch_data.retry_policy", RetryPolicy(max_retries=0))
+    monkeypatch.setattr("app.fetch_data.circuit_breaker", CircuitBreaker(failure_threshold=100))
+    adapter = ReplayAdapter(recordings, latency=0.01, error_rate=0.5, seed=1)
+    failures = 0
+    start = time.perf_counter()
+    with replay(adapter):
+        for _ in range(20):
+            try:
+                fetch_market_data(["S00000-BRL"])
+            except requests.HTTPError:
+                failures += 1
+
+    assert time.perf_counter() - start >= 0.2
+    assert failures == adapter.errors
+    assert 3 < failures < 17
+
+def test_replay_restores_the_session(recordings):
+    """
+    Test that leaving the block unmounts the adapter.
+    """
+    adapters = dict(session.adapters)
+    with replay(ReplayAdapter(recordings)):
+        pass
+
+    assert dict(session.adapters) == adapters
+
+def test_recordings_round_trip(recordings, tmp_path):
+    """
+    Test that fixture files written in the recording format load back.
+    """
+    _write_fixture(str(tmp_path / "symbols.json"), "url", 200, recordings.symbols_headers, recordings.symbols)
+    _write_fixture(str(tmp_path / "tickers.json"), "url", 200, {}, recordings.tickers)
+
+    assert load_recordings(str(tmp_path)) == recordings
+    assert load_recordings(str(tmp_path / "missing")) is None
+
+def test_record_command_writes_fixtures(recordings, tmp_path):
+    """
+    Test that `python -m app.replay record <directory>` records into the given
+    directory, here from a replayed API.
+    """
+    from app.replay import main
+    directory = tmp_path / "recordings"
+
+    with replay(ReplayAdapter(recordings)):
+        assert main(["record", str(directory), "--symbols", "S00000-BRL,S00002-BRL"]) == 0
+
+    recorded = load_recordings(str(directory))
+    assert recorded.symbols == recordings.symbols
+    assert [ticker["pair"] for ticker in recorded.tickers] == ["S00000-BRL", "S00002-BRL"]
+    with pytest.raises(SystemExit):
+        main([str(directory)])
@@ -0,0 +1,155 @@
+import multiprocessing
+import numpy as np
+import pytest
+from app.ringbuffer import TickRingBuffer, RECORD_DTYPE
+from tests.payloads import synthetic_ticks
+
+def append_ticks(ring, symbol, dates):
+    """
+    Appends one tick per date, with the date as the last price.
+    """
+    for date in dates:
+        ring.append(symbol, 1.0, 2.0, 3.0, 0.5, 1.0, float(date), 10.0, date)
+
+def test_latest_returns_newest_ticks_per_symbol(tmp_path):
+    """
+    Test that `latest` selects the newest ticks of one symbol, oldest first.
+    """
+    with TickRingBuffer.create(str(tmp_path / "ticks.ring"), capacity=64) as ring:
+        for date in range(100, 110):
+            append_ticks(ring, "BTC-BRL", [date])
+            append_ticks(ring, "ETH-BRL", [date + 1000])
+
+        latest = ring.latest("BTC-BRL", 3)
+
+        assert latest.dtype == RECORD_DTYPE
+        assert latest['date'].tolist() == [107, 108, 109]
+        assert latest['last'].tolist() == [107.0, 108.0, 109.0]
+        assert ring.latest("LTC-BRL", 3).size == 0
+        assert ring.symbols() == ["BTC-BRL", "ETH-BRL"]
+
+def test_buffer_wraps_and_keeps_only_capacity_ticks(tmp_path):
+    """
+    Test that once full, the buffer overwrites its oldest records.
+
+    Asserts:
+        After 25 appends to an 8 record buffer, only the last 8 ticks remain,
+        in order, and sequence numbers keep counting.
+    """
+    with TickRingBuffer.create(str(tmp_path / "ticks.ring"), capacity=8) as ring:
+        append_ticks(ring, "BTC-BRL", range(25))
+
+        assert ring.head() == 25
+        assert ring.latest("BTC-BRL", 100)['date'].tolist() == list(range(17, 25))
+        assert ring.latest(n=2)['seq'].tolist() == [23, 24]
+
+def test_window_is_a_read_only_view(tmp_path):
+    """
+    Test that `window` shares memory with the mapping instead of copying it, and
+    cannot be used to modify the buffer, while `latest` returns a copy.
+    """
+    with TickRingBuffer.create(str(tmp_path / "ticks.ring"), capacity=8) as ring:
+        append_ticks(ring, "BTC-BRL", range(5))
+        window, first = ring.window()
+        latest = ring.latest("BTC-BRL", 5)
+
+        assert (first, window['date'].tolist()) == (0, list(range(5)))
+        assert np.shares_memory(window, ring.records)
+        assert not window.flags.writeable
+        assert not np.shares_memory(latest, ring.records)
+        del window, latest
+
+def test_torn_record_is_never_returned(tmp_path):
+    """
+    Test that a record whose slot is being rewritten is never returned.
+
+    Asserts:
+        A slot marked as in progress (seq -1) makes `latest` give up after its
+        retries instead of returning the partially written record, while older
+        records remain readable.
+    """
+    with TickRingBuffer.create(str(tmp_path / "ticks.ring"), capacity=8) as ring:
+        append_ticks(ring, "BTC-BRL", range(4))
+        ring.records[3]['seq'] = -1
+
+        with pytest.raises(RuntimeError):
+            ring.latest("BTC-BRL", 2, retries=3)
+
+        ring.header['head'] = 3
+        assert ring.latest("BTC-BRL", 2)['date'].tolist() == [1, 2]
+
+def test_extend_publishes_tickers_payload(tmp_path):
+    """
+    Test that a batch of ticks is appended and readable per symbol.
+    """
+    with TickRingBuffer.create(str(tmp_path / "ticks.ring"), capacity=16) as ring:
+        assert ring.extend(synthetic_ticks(3, date=1720182706)) == 3
+
+        prices = ring.last_prices()
+
+        assert sorted(prices) == ["S00000-BRL", "S00001-BRL", "S00002-BRL"]
+        assert int(prices["S00001-BRL"]['date']) == 1720182706
+
+def test_reopened_writer_keeps_published_ticks(tmp_path):
+    """
+    Test that `open_or_create` resumes an existing buffer with the same layout.
+    """
+    path = str(tmp_path / "ticks.ring")
+    with TickRingBuffer.create(path, capacity=16) as ring:
+        append_ticks(ring, "BTC-BRL", range(5))
+
+    with TickRingBuffer.open_or_create(path, capacity=16) as ring:
+        append_ticks(ring, "BTC-BRL", [5])
+        assert ring.latest("BTC-BRL", 10)['date'].tolist() == list(range(6))
+
+def test_reader_views_are_read_only(tmp_path):
+    """
+    Test that a reader maps the file read-only and sees the writer's appends
+    without reopening it.
+    """
+    path = str(tmp_path / "ticks.ring")
+    with TickRingBuffer.create(path, capacity=16) as writer, TickRingBuffer.open(path) as reader:
+        append_ticks(writer, "BTC-BRL", [1, 2])
+        assert reader.latest("BTC-BRL", 5)['date'].tolist() == [1, 2]
+
+        append_ticks(writer, "BTC-BRL", [3])
+        assert reader.latest("BTC-BRL", 1)['date'].tolist() == [3]
+
+        with pytest.raises(ValueError):
+            reader.records['last'][0] = 0.0
+
+def read_latest(path, symbol, n, ready, results):
+    """
+    Reads the latest ticks of a symbol in a child process until the writer is done.
+    """
+    with TickRingBuffer.open(path) as ring:
+        ready.set()
+        while True:
+            latest = ring.latest(symbol, n, retries=1000)
+            # Every copy must be a consistent, contiguous tail of the stream
+            dates = latest['date']
+            if len(dates) and not (np.array_equal(dates, latest['last'].astype(np.int64))
+                                   and np.all(np.diff(dates) == 1)):
+                results.put("torn")
+                return
+            if len(dates) and dates[-1] == 19999:
+                results.put("ok")
+                return
+
+def test_concurrent_reader_in_another_process(tmp_path):
+    """
+    Test that a reader process never observes a torn or out-of-order record while
+    the writer laps a small buffer many times.
+    """
+    path = str(tmp_path / "ticks.ring")
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    results = context.Queue()
+    with TickRingBuffer.create(path, capacity=64) as ring:
+        reader = context.Process(target=read_latest, args=(path, "BTC-BRL", 16, ready, results))
+        reader.start()
+        assert ready.wait(timeout=30)
+        append_ticks(ring, "BTC-BRL", range(20000))
+        reader.join(timeout=60)
+
+    assert results.get(timeout=5) == "ok"
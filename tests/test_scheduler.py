@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+from app.scheduler import FixedRateScheduler
+
+class FakeClock:
+    """
+    Manually advanced monotonic clock paired with a stop event whose `wait`
+    advances the clock instead of blocking.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+        self.waits = []
+
+    def __call__(self):
+        return self.now
+
+    def make_event(self):
+        clock = self
+        event = threading.Event()
+
+        def wait(timeout=None):
+            clock.waits.append(timeout)
+            clock.now += timeout
+            return event.is_set()
+
+        event.wait = wait
+        return event
+
+def run_ticks(scheduler, stop_event, durations):
+    """
+    Runs one tick per duration, advancing the clock by that duration inside each tick.
+
+    Returns:
+        list: The ScheduledTick of every tick that ran.
+    """
+    ticks = []
+    for tick in scheduler.run(stop_event):
+        ticks.append(tick)
+        scheduler.clock.now += durations[len(ticks) - 1]
+        if len(ticks) == len(durations):
+            stop_event.set()
+    return ticks
+
+def test_ticks_stay_on_grid_despite_work_time():
+    """
+    Test that work time inside a tick does not stretch the period.
+
+    Asserts:
+        Ticks are scheduled exactly one interval apart.
+        The scheduler only waits for the remainder of each interval.
+    """
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(interval=1.0, clock=clock)
+
+    ticks = run_ticks(scheduler, clock.make_event(), [0.3, 0.3, 0.3])
+
+    assert [tick.scheduled for tick in ticks] == [100.0, 101.0, 102.0]
+    assert clock.waits == pytest.approx([0.7, 0.7])
+    assert scheduler.stats()["overruns"] == 0
+
+def test_overrun_skips_missed_ticks():
+    """
+    Test that an iteration spanning several grid points drops the missed ticks.
+
+    Asserts:
+        The next tick lands on the next grid point after the overrun.
+        One overrun and two skipped ticks are reported.
+    """
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(interval=0.5, clock=clock)
+
+    ticks = run_ticks(scheduler, clock.make_event(), [1.2, 0.1])
+
+    assert [tick.scheduled for tick in ticks] == [100.0, 101.5]
+    assert scheduler.stats()["overruns"] == 1
+    assert scheduler.stats()["skipped"] == 2
+
+def test_overrun_coalesces_missed_ticks():
+    """
+    Test that the coalesce policy runs a single catch-up tick after an overrun.
+
+    Asserts:
+        The catch-up tick starts immediately, with its lateness reported as jitter.
+        Ticks after it return to the original grid.
+    """
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(interval=0.5, on_overrun="coalesce", clock=clock)
+
+    ticks = run_ticks(scheduler, clock.make_event(), [1.2, 0.1, 0.1])
+
+    assert [tick.scheduled for tick in ticks] == [100.0, 101.0, 101.5]
+    assert ticks[1].jitter == pytest.approx(0.2)
+    assert scheduler.stats()["skipped"] == 1
+    assert scheduler.max_jitter == pytest.approx(0.2)
+
+def test_stop_event_interrupts_wait():
+    """
+    Test that setting the stop event ends the schedule without another tick.
+
+    Asserts:
+        The scheduler stops promptly when the event is set from another thread.
+    """
+    scheduler = FixedRateScheduler(interval=10.0)
+    stop_event = threading.Event()
+    threading.Timer(0.05, stop_event.set).start()
+
+    start = time.monotonic()
+    ticks = list(scheduler.run(stop_event))
+
+    assert len(ticks) == 1
+    assert time.monotonic() - start < 5
+
+def test_invalid_arguments_are_rejected():
+    """
+    Test that non-positive intervals and unknown overrun policies raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        FixedRateScheduler(interval=0)
+    with pytest.raises(ValueError):
+        FixedRateScheduler(on_overrun="queue")
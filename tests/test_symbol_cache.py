@@ -0,0 +1,131 @@
+import json
+from unittest.mock import patch, Mock
+import pytest
+import requests
+from app.symbol_cache import SymbolCache
+from tests.payloads import synthetic_symbols
+
+class FakeClock:
+    """
+    Manually advanced wall clock.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def response(status_code=200, payload=None, headers=None):
+    """
+    Builds a mocked /symbols response.
+    """
+    mocked = Mock(status_code=status_code, headers=headers or {}, content=json.dumps(payload).encode())
+    if status_code >= 400:
+        mocked.raise_for_status.side_effect = requests.HTTPError(f"{status_code} error")
+    return mocked
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "symbols_cache.json")
+
+def test_fresh_copy_is_served_without_requests(clock, cache_path):
+    """
+    Test that only the first call within the TTL requests the symbols.
+    """
+    payload = synthetic_symbols(3)
+    cache = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get", return_value=response(payload=payload)) as mock_get:
+        assert cache.get() == payload
+        clock.now += 59
+        assert cache.get() == payload
+
+    assert mock_get.call_count == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+def test_stale_copy_is_served_while_revalidated(clock, cache_path):
+    """
+    Test that an expired copy is returned immediately and revalidated in the background.
+
+    Asserts:
+        The refresh sends the cached ETag and Last-Modified, and a 304 answer renews
+        the copy so the next call is a hit.
+    """
+    payload = synthetic_symbols(3)
+    headers = {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    cache = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get", return_value=response(payload=payload, headers=headers)):
+        cache.get()
+
+    clock.now += 61
+    with patch("app.fetch_data.session.get", return_value=response(status_code=304)) as mock_get:
+        assert cache.get() == payload
+        cache.wait(timeout=5)
+        assert cache.get() == payload
+
+    sent = mock_get.call_args.kwargs["headers"]
+    assert sent == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    stats = cache.stats()
+    assert (stats["stale"], stats["hits"], stats["not_modified"], stats["refreshes"]) == (1, 1, 1, 2)
+
+def test_changed_list_replaces_the_copy(clock, cache_path):
+    """
+    Test that a 200 answer to a revalidation replaces the cached list.
+    """
+    cache = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get", return_value=response(payload=synthetic_symbols(3))):
+        cache.get()
+
+    clock.now += 61
+    with patch("app.fetch_data.session.get", return_value=response(payload=synthetic_symbols(5))):
+        cache.get()
+        cache.wait(timeout=5)
+
+    assert len(cache.get()["symbol"]) == 5
+
+def test_failed_background_refresh_keeps_stale_copy(clock, cache_path):
+    """
+    Test that a failing refresh is counted and the stale copy is still served.
+    """
+    payload = synthetic_symbols(3)
+    cache = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get", return_value=response(payload=payload)):
+        cache.get()
+
+    clock.now += 61
+    with patch("app.fetch_data.session.get", return_value=response(status_code=503)):
+        assert cache.get() == payload
+        cache.wait(timeout=5)
+        assert cache.get() == payload
+        cache.wait(timeout=5)
+
+    assert cache.stats()["errors"] == 2
+
+def test_cold_start_serves_persisted_copy(clock, cache_path):
+    """
+    Test that a new cache serves the copy persisted by a previous one without a request.
+    """
+    payload = synthetic_symbols(3)
+    with patch("app.fetch_data.session.get", return_value=response(payload=payload)):
+        SymbolCache(ttl=60, path=cache_path, clock=clock).get()
+
+    restarted = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get") as mock_get:
+        assert restarted.get() == payload
+
+    mock_get.assert_not_called()
+    assert restarted.stats()["hits"] == 1
+
+def test_miss_propagates_request_errors(clock, cache_path):
+    """
+    Test that a failed fetch without any copy raises like `fetch_symbols`.
+    """
+    cache = SymbolCache(ttl=60, path=cache_path, clock=clock)
+    with patch("app.fetch_data.session.get", side_effect=requests.ConnectionError("offline")):
+        with pytest.raises(requests.RequestException):
+            cache.get()
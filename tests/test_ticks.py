@@ -0,0 +1,91 @@
+import json
+import tracemalloc
+from app.models import MarketData
+from app.ticks import Tick, parse_ticks, as_ticks
+from tests.payloads import synthetic_tickers
+
+def traced_size(build):
+    """
+    Returns the memory retained by the object `build()` returns, in bytes.
+
+    Args:
+        build (callable): Builds the objects to measure.
+
+    Returns:
+        int: The traced memory still allocated once `build` returned.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+def legacy_representations(market_data):
+    """
+    Builds the per-tick representations the subscription used before ticks: the
+    printed row lists, the stored parameter sets and the ORM objects.
+    """
+    rows = [[item['pair'], item['buy'], item['sell'], item['high'], item['low'],
+             item['open'], item['last'], item['vol'], item['date']] for item in market_data]
+    parameters = [
+        {'symbol': item['pair'], 'buy': float(item['buy']), 'sell': float(item['sell']),
+         'high': float(item['high']), 'low': float(item['low']), 'open': float(item['open']),
+         'last': float(item['last']), 'volume': float(item['vol']), 'date': int(item['date'])}
+        for item in market_data
+    ]
+    objects = [MarketData(**row) for row in parameters]
+    return rows, parameters, objects
+
+def test_tick_parses_payload_fields():
+    """
+    Test that a /tickers item is parsed into typed tick fields.
+    """
+    tick = Tick.from_payload(synthetic_tickers(1)[0])
+
+    assert tick.symbol == "S00000-BRL"
+    assert (tick.buy, tick.last, tick.volume) == (30000.1, 31000.5, 10.12345678)
+    assert tick.date == 1720182706
+    assert not hasattr(tick, "__dict__")
+
+def test_payload_round_trip():
+    """
+    Test that `as_payload` survives JSON and parses back to an equal tick, which
+    is how ticks pass through a write-behind spill file.
+    """
+    ticks = parse_ticks(synthetic_tickers(3))
+
+    restored = as_ticks([json.loads(json.dumps(tick.as_payload())) for tick in ticks])
+
+    assert restored == ticks
+
+def test_tick_uses_less_memory_than_payload_dict():
+    """
+    Test that a parsed tick retains less memory than the JSON dict it replaces.
+
+    Asserts:
+        1000 ticks retain well under the memory of the 1000 payload dicts.
+    """
+    dicts = traced_size(lambda: synthetic_tickers(1000))
+    ticks = traced_size(lambda: parse_ticks(synthetic_tickers(1000)))
+
+    assert ticks < dicts * 0.6
+
+def test_tick_allocates_less_than_legacy_representations():
+    """
+    Test that parsing a poll into ticks allocates less than the representations it
+    replaces on the subscription's hot path.
+
+    Asserts:
+        Parsing 1000 tickers once retains less than a quarter of the memory of the
+        row lists, parameter sets and ORM objects built from the same payload.
+    """
+    market_data = synthetic_tickers(1000)
+
+    legacy = traced_size(lambda: legacy_representations(market_data))
+    ticks = traced_size(lambda: parse_ticks(market_data))
+
+    assert ticks < legacy / 4
@@ -1,8 +1,15 @@
+import threading
+from unittest.mock import Mock, patch
 import pytest
+import requests
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, MarketData, Symbol
-from app.config import TestConfig
+from app.config import Config, TestConfig
+from app.workers import store_symbols_bulk, store_market_data, subscribe_market_data, display_market_data, fetch_market_data_chunks
+from app.ringbuffer import TickRingBuffer
+from app.ticks import parse_ticks
+from tests.payloads import synthetic_symbols, synthetic_tickers, synthetic_ticks
 
 # Set up the test database engine and session
 engine = create_engine(TestConfig.DATABASE_URL)
@@ -34,6 +41,22 @@ def db_session(setup_database):
     yield session
     session.close()
 
+@pytest.fixture(scope='function')
+def test_sessions(setup_database, monkeypatch):
+    """
+    Fixture that points the worker functions at the test database.
+
+    The functions in `app.workers` open their own sessions through `SessionLocal`;
+    this fixture swaps it for the test session factory and empties the tables
+    touched by the storage tests before each test.
+    """
+    monkeypatch.setattr("app.workers.SessionLocal", TestingSessionLocal)
+    with TestingSessionLocal() as session:
+        session.query(Symbol).delete()
+        session.query(MarketData).delete()
+        session.commit()
+    yield TestingSessionLocal
+
 def test_market_data_creation(db_session):
     """
     Test the creation and retrieval of a MarketData entry.
@@ -124,5 +147,202 @@ def test_symbol_creation(db_session):
     assert retrieved.withdraw_minimum == 5.0
     assert retrieved.withdrawal_fee == 0.1
 
+def test_store_symbols_bulk_inserts_new_symbols(test_sessions):
+    """
+    Test that the bulk path inserts every symbol of an empty table.
+
+    Asserts:
+        The function reports all symbols as inserted and none as updated.
+        The table contains one row per symbol with converted numeric fields.
+    """
+    inserted, updated = store_symbols_bulk(synthetic_symbols(50))
+
+    assert (inserted, updated) == (50, 0)
+    with test_sessions() as db:
+        assert db.query(Symbol).count() == 50
+        stored = db.query(Symbol).filter_by(symbol="S00007-BRL").one()
+        assert stored.withdrawal_fee == 0.0005
+        assert stored.price_scale == 100000000.0
+
+def test_store_symbols_bulk_updates_changed_fields(test_sessions):
+    """
+    Test that the bulk path updates known symbols whose fields changed.
+
+    The same payload is stored twice, the second time with a different
+    withdrawal fee and one extra symbol.
+
+    Asserts:
+        Unchanged re-runs write nothing.
+        Changed symbols are updated in place and new ones are inserted.
+    """
+    store_symbols_bulk(synthetic_symbols(10))
+    assert store_symbols_bulk(synthetic_symbols(10)) == (0, 0)
+
+    inserted, updated = store_symbols_bulk(synthetic_symbols(11, withdrawal_fee=0.001))
+
+    assert (inserted, updated) == (1, 10)
+    with test_sessions() as db:
+        assert db.query(Symbol).count() == 11
+        fees = {row.withdrawal_fee for row in db.query(Symbol)}
+        assert fees == {0.001}
+
+def test_store_market_data_core_path(test_sessions):
+    """
+    Test that the default Core path writes every ticker and returns the row count.
+
+    Asserts:
+        The return value is the number of tickers written.
+        Numeric strings are converted and the ticker volume lands in `volume`.
+    """
+    written = store_market_data(synthetic_tickers(25))
+
+    assert written == 25
+    with test_sessions() as db:
+        assert db.query(MarketData).count() == 25
+        stored = db.query(MarketData).filter_by(symbol="S00003-BRL").one()
+        assert stored.buy == 30003.1
+        assert stored.volume == 13.12345678
+        assert stored.date == 1720182706
+
+def test_store_market_data_skips_duplicate_symbol_dates(test_sessions):
+    """
+    Test that tickers repeating a stored (symbol, date) pair are skipped.
+
+    Asserts:
+        Re-storing the same payload inserts nothing, while a new date is inserted.
+    """
+    store_market_data(synthetic_tickers(5))
+
+    assert store_market_data(synthetic_tickers(5)) == 0
+    assert store_market_data(synthetic_tickers(5, date=1720182707)) == 5
+    with test_sessions() as db:
+        assert db.query(MarketData).count() == 10
+
+def test_store_market_data_returns_objects_when_requested(test_sessions):
+    """
+    Test that ORM objects are only built when explicitly requested.
+
+    Asserts:
+        `return_objects=True` returns one MarketData instance per ticker.
+    """
+    objects = store_market_data(synthetic_tickers(3), return_objects=True)
+
+    assert len(objects) == 3
+    assert all(isinstance(obj, MarketData) for obj in objects)
+    with test_sessions() as db:
+        assert db.query(MarketData).count() == 3
+
+def test_subscribe_market_data_batches_watchlist():
+    """
+    Test that a watchlist subscription issues one request per chunk per tick.
+
+    `fetch_ticks` and the storage functions are mocked, and the fetch mock sets
+    the stop event so that exactly one tick runs; the write-behind queue is flushed
+    when the subscription stops.
+
+    Asserts:
+        A 300 symbol watchlist is fetched in fewer requests than symbols.
+        Every requested symbol is covered and the tick is stored in one batch.
+        The tick's candles, long expired, are closed and stored for every interval.
+    """
+    symbols = [f"S{i:05d}-BRL" for i in range(300)]
+    stop_event = threading.Event()
+
+    def fetch(chunk):
+        stop_event.set()
+        return parse_ticks([dict(item, pair=symbol) for item, symbol in zip(synthetic_tickers(len(chunk)), chunk)])
+
+    with patch("app.workers.fetch_ticks", side_effect=fetch) as mock_fetch, \
+         patch("app.workers.store_market_data") as mock_store, \
+         patch("app.workers.store_candles") as mock_store_candles:
+        subscribe_market_data(symbols, stop_event)
+
+    requested = [symbol for call in mock_fetch.call_args_list for symbol in call.args[0]]
+    assert 1 < mock_fetch.call_count < len(symbols)
+    assert requested == symbols
+    mock_store.assert_called_once()
+    assert len(mock_store.call_args.args[0]) == len(symbols)
+    assert sum(len(call.args[0]) for call in mock_store_candles.call_args_list) == len(symbols) * 3
+
+def test_subscribe_market_data_publishes_to_ring_buffer(monkeypatch, tmp_path):
+    """
+    Test that a subscription publishes its ticks to the configured ring buffer.
+    """
+    path = str(tmp_path / "ticks.ring")
+    monkeypatch.setattr(Config, "RING_BUFFER_PATH", path)
+    stop_event = threading.Event()
+
+    def fetch(chunk):
+        stop_event.set()
+        return synthetic_ticks(len(chunk))
+
+    with patch("app.workers.fetch_ticks", side_effect=fetch), \
+         patch("app.workers.store_market_data"), \
+         patch("app.workers.store_candles"):
+        subscribe_market_data(["S00000-BRL", "S00001-BRL"], stop_event)
+
+    with TickRingBuffer.open(path) as ring:
+        assert ring.symbols() == ["S00000-BRL", "S00001-BRL"]
+        assert ring.latest("S00001-BRL", 5)['date'].tolist() == [1720182706]
+
+def test_display_market_data_tail(test_sessions, monkeypatch, capsys):
+    """
+    Test that the streaming display renders only the latest ticks of a symbol.
+
+    Asserts:
+        The header is printed once, followed by the newest `limit` rows, oldest first.
+    """
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+    for date in range(1720182706, 1720182716):
+        store_market_data(synthetic_tickers(2, date=date))
+
+    display_market_data(symbol="S00001-BRL", limit=3, tail=True, page_size=2)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("Symbol")
+    assert [line.split()[-1] for line in lines[2:]] == ["1720182713", "1720182714", "1720182715"]
+    assert all(line.startswith("S00001-BRL") for line in lines[2:])
+
+def test_display_market_data_empty(test_sessions, monkeypatch, capsys):
+    """
+    Test that an empty table is reported instead of rendering a header.
+    """
+    monkeypatch.setattr("app.queries.SessionLocal", TestingSessionLocal)
+
+    display_market_data()
+
+    assert capsys.readouterr().out.strip() == "No market data available."
+
+def test_failing_chunk_is_reported_once(capsys):
+    """
+    Test that a chunk whose request fails is reported once, by the fetch layer
+    with its symbols, while the other chunks of the tick are still fetched.
+    """
+    def send_request(url, params=None, headers=None):
+        if params["symbols"] == "BAD-BRL":
+            raise requests.ConnectionError("connection refused")
+        return type("Response", (), {"content": b'[]'})()
+
+    with patch("app.fetch_data.send_request", side_effect=send_request):
+        market_data = fetch_market_data_chunks([["BAD-BRL"], ["S00000-BRL"]])
+
+    output = capsys.readouterr().out.splitlines()
+    assert market_data == []
+    assert output == ["Error fetching market data for symbols ['BAD-BRL']: connection refused"]
+
+def test_subscription_setup_failure_stops_started_queues():
+    """
+    Test that when the metrics exporter cannot start, e.g. because its port is
+    in use, the write-behind queues started before it are still closed.
+    """
+    queues = [Mock(), Mock()]
+
+    with patch("app.workers.create_write_queue", side_effect=queues), \
+         patch("app.workers.start_metrics_exporter", side_effect=OSError("Address already in use")):
+        with pytest.raises(OSError):
+            subscribe_market_data(["S00000-BRL"], threading.Event(), display=False)
+
+    assert all(write_queue.close.called for write_queue in queues)
+
 if __name__ == "__main__":
     pytest.main()